@@ -1,8 +1,9 @@
 """Python Package for interacting with Ring devices."""
 
-from importlib.metadata import version
+from __future__ import annotations
 
-__version__ = version("ring_doorbell")
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
 from ring_doorbell.auth import Auth
 from ring_doorbell.chime import RingChime
@@ -17,11 +18,52 @@ from ring_doorbell.exceptions import (
 )
 from ring_doorbell.generic import RingGeneric
 from ring_doorbell.group import RingLightGroup
-from ring_doorbell.listen import RingEventListener, RingEventListenerConfig
 from ring_doorbell.other import RingOther
 from ring_doorbell.ring import Ring, RingDevices
+from ring_doorbell.session import RingSessionFileStore, RingSessionStore
 from ring_doorbell.stickup_cam import RingStickUpCam
 
+if TYPE_CHECKING:
+    from ring_doorbell.listen import (
+        RingEventListener,
+        RingEventListenerConfig,
+        RingEventOverflowPolicy,
+        RingEventSubscriberStats,
+    )
+    from ring_doorbell.webrtcstream import RingWebRtcStream
+
+# The listener and webrtc modules import firebase_messaging and websockets
+# which are slow to import and not needed by most scripts, so they are only
+# imported when first accessed.
+_LAZY_IMPORTS = {
+    "RingEventListener": "ring_doorbell.listen",
+    "RingEventListenerConfig": "ring_doorbell.listen",
+    "RingEventOverflowPolicy": "ring_doorbell.listen",
+    "RingEventSubscriberStats": "ring_doorbell.listen",
+    "RingWebRtcStream": "ring_doorbell.webrtcstream",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import lazily loaded attributes on first access."""
+    if name == "__version__":
+        from importlib.metadata import version  # noqa: PLC0415
+
+        value: Any = version("ring_doorbell")
+    elif module_name := _LAZY_IMPORTS.get(name):
+        value = getattr(import_module(module_name), name)
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Return the module attributes including the lazily loaded ones."""
+    return sorted([*globals(), *_LAZY_IMPORTS, "__version__"])
+
+
 __all__ = [
     "Ring",
     "Auth",
@@ -34,8 +76,13 @@ __all__ = [
     "RingDoorBell",
     "RingOther",
     "RingEvent",
+    "RingSessionStore",
+    "RingSessionFileStore",
     "RingEventListener",
     "RingEventListenerConfig",
+    "RingEventOverflowPolicy",
+    "RingEventSubscriberStats",
+    "RingWebRtcStream",
     "RingError",
     "AuthenticationError",
     "Requires2FAError",
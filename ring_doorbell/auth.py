@@ -3,13 +3,22 @@
 
 from __future__ import annotations
 
+import hashlib
+import time
 import uuid
 from asyncio import TimeoutError
+from collections import deque
 from functools import cached_property
 from json import loads as json_loads
 from typing import TYPE_CHECKING, Any, Callable, ClassVar
 
-from aiohttp import BasicAuth, ClientError, ClientResponseError, ClientSession
+from aiohttp import (
+    BasicAuth,
+    ClientError,
+    ClientResponse,
+    ClientResponseError,
+    ClientSession,
+)
 from oauthlib.common import urldecode
 from oauthlib.oauth2 import (
     LegacyApplicationClient,
@@ -18,7 +27,12 @@ from oauthlib.oauth2 import (
     TokenExpiredError,
 )
 
-from ring_doorbell.const import NAMESPACE_UUID, TIMEOUT, OAuth
+from ring_doorbell.const import (
+    DEFAULT_STREAM_CHUNK_SIZE,
+    NAMESPACE_UUID,
+    TIMEOUT,
+    OAuth,
+)
 from ring_doorbell.exceptions import (
     AuthenticationError,
     Requires2FAError,
@@ -27,6 +41,12 @@ from ring_doorbell.exceptions import (
 )
 from ring_doorbell.util import _DeprecatedSyncApiHandler
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+# How long the times of api requests are kept for request budgets
+REQUEST_LOG_WINDOW = 60 * 60
+
 
 class Auth:
     """A Python Auth class for Ring."""
@@ -66,11 +86,25 @@ class Auth:
             client_id=OAuth.CLIENT_ID, token=token
         )
         self._auth = BasicAuth(OAuth.CLIENT_ID, "")
+        # time.monotonic times of the api requests in the last REQUEST_LOG_WINDOW
+        self.request_times: deque[float] = deque()
+
+    def _log_request(self) -> None:
+        now = time.monotonic()
+        request_times = self.request_times
+        while request_times and request_times[0] <= now - REQUEST_LOG_WINDOW:
+            request_times.popleft()
+        request_times.append(now)
 
     @property
     def _session(self) -> ClientSession:
         if self.http_client_session:
             return self.http_client_session
+        # Sync calls run on a separate loop which has its own session
+        if "_dep_handler" in self.__dict__ and (
+            session := self._dep_handler.loop_session()
+        ):
+            return session
         if self._local_session is None:
             self._local_session = ClientSession()
         return self._local_session
@@ -148,6 +182,15 @@ class Auth:
         """Get hardware ID."""
         return self.hardware_id
 
+    def get_account_id(self) -> str:
+        """Get an id of the account the token is for, without revealing it.
+
+        The id is derived from the refresh token so it changes when the
+        token is refreshed.
+        """
+        refresh_token = str(self._token.get("refresh_token", ""))
+        return hashlib.sha256(refresh_token.encode()).hexdigest()[:16]
+
     def get_device_model(self) -> str:
         """Get device model."""
         return self.device_model
@@ -176,18 +219,16 @@ class Auth:
             """Response as loaded json."""
             return json_loads(self.text)
 
-    async def async_query(  # noqa: C901, PLR0913
+    async def _async_request(  # noqa: PLR0913
         self,
         url: str,
-        method: str = "GET",
+        method: str,
+        *,
         extra_params: dict[str, Any] | None = None,
         data: bytes | None = None,
         json: dict[Any, Any] | None = None,
         timeout: float | None = None,
-        *,
-        raise_for_status: bool = True,
-    ) -> Auth.Response:
-        """Query data from Ring API."""
+    ) -> ClientResponse:
         if timeout is None:
             timeout = TIMEOUT
 
@@ -214,6 +255,7 @@ class Auth:
                     headers=headers,
                 )
 
+                self._log_request()
                 resp = await self._session.request(
                     method, url, headers=headers, data=data, **kwargs
                 )
@@ -225,6 +267,7 @@ class Auth:
                     body=data,
                     headers=headers,
                 )
+                self._log_request()
                 resp = await self._session.request(
                     method, url, headers=headers, data=data, **kwargs
                 )
@@ -239,25 +282,70 @@ class Auth:
         except Exception as ex:
             msg = f"Unknown error during query of url {url}: {ex}"
             raise RingError(msg) from ex
+        return resp
 
-        async with resp:
-            if resp.status == 401:
-                # Check whether there's an issue with the token grant
-                self._token = await self.async_refresh_tokens()
+    async def _async_check_response(
+        self, resp: ClientResponse, url: str, *, raise_for_status: bool
+    ) -> None:
+        if resp.status == 401:
+            # Check whether there's an issue with the token grant
+            self._token = await self.async_refresh_tokens()
 
-            if raise_for_status:
-                try:
-                    resp.raise_for_status()
-                except ClientResponseError as ex:
-                    msg = (
-                        f"HTTP error with status code {resp.status} "
-                        f"during query of url {url}: {ex}"
-                    )
-                    raise RingError(msg) from ex
+        if raise_for_status:
+            try:
+                resp.raise_for_status()
+            except ClientResponseError as ex:
+                msg = (
+                    f"HTTP error with status code {resp.status} "
+                    f"during query of url {url}: {ex}"
+                )
+                raise RingError(msg) from ex
 
+    async def async_query(  # noqa: PLR0913
+        self,
+        url: str,
+        method: str = "GET",
+        extra_params: dict[str, Any] | None = None,
+        data: bytes | None = None,
+        json: dict[Any, Any] | None = None,
+        timeout: float | None = None,
+        *,
+        raise_for_status: bool = True,
+    ) -> Auth.Response:
+        """Query data from Ring API."""
+        resp = await self._async_request(
+            url,
+            method,
+            extra_params=extra_params,
+            data=data,
+            json=json,
+            timeout=timeout,
+        )
+        async with resp:
+            await self._async_check_response(
+                resp, url, raise_for_status=raise_for_status
+            )
             response_data = await resp.read()
         return Auth.Response(response_data, resp.status)
 
+    async def async_query_stream(
+        self,
+        url: str,
+        *,
+        timeout: float | None = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Query the Ring API and yield the response body in chunks."""
+        resp = await self._async_request(url, "GET", timeout=timeout)
+        async with resp:
+            await self._async_check_response(resp, url, raise_for_status=True)
+            try:
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    yield chunk
+            except (ClientError, TimeoutError) as ex:
+                msg = f"Error streaming response of url {url}: {ex}"
+                raise RingError(msg) from ex
+
     @cached_property
     def _dep_handler(self) -> _DeprecatedSyncApiHandler:
         return _DeprecatedSyncApiHandler(self)
@@ -21,6 +21,7 @@ from ring_doorbell.const import (
     RingEventKind,
 )
 from ring_doorbell.exceptions import RingError
+from ring_doorbell.freshness import health_source
 from ring_doorbell.generic import RingGeneric
 
 _LOGGER = logging.getLogger(__name__)
@@ -29,6 +30,8 @@ _LOGGER = logging.getLogger(__name__)
 class RingChime(RingGeneric):
     """Implementation for Ring Chime."""
 
+    DEVICE_ENDPOINT = CHIMES_ENDPOINT
+
     @property
     def family(self) -> str:
         """Return Ring device family type."""
@@ -40,6 +43,7 @@ class RingChime(RingGeneric):
             HEALTH_CHIMES_ENDPOINT.format(self.device_api_id)
         )
         self._health_attrs = resp.json().get("device_health", {})
+        self._ring.freshness.updated(health_source(self))
 
     @property
     def model(self) -> str:
@@ -74,7 +78,9 @@ class RingChime(RingGeneric):
             "chime[settings][volume]": str(value),
         }
         url = CHIMES_ENDPOINT.format(self.device_api_id)
-        await self._ring.async_query(url, extra_params=params, method="PUT")
+        await self._async_query_optimistic(
+            {("settings", "volume"): value}, url, extra_params=params, method="PUT"
+        )
 
     async def async_get_linked_tree(self) -> dict[str, Any]:
         """Return doorbell data linked to chime."""
@@ -5,11 +5,16 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import functools
 import getpass
+import io
 import json
 import logging
+import os
 import select
+import signal
+import socket
 import sys
 from contextlib import asynccontextmanager
 from datetime import datetime
@@ -29,14 +34,19 @@ from ring_doorbell import (
     RingStickUpCam,
     RingOther,
     RingCapability,
+    RingSessionFileStore,
 )
 from ring_doorbell.const import (
+    CLI_DAEMON_SOCKET_FILE,
+    CLI_SESSION_FILE,
     CLI_TOKEN_FILE,
     GCM_TOKEN_FILE,
     PACKAGE_NAME,
     USER_AGENT,
     DOORBELL_EXISTING_TYPE,
 )
+from ring_doorbell.export import HISTORY_WRITERS, async_export_history
+from ring_doorbell.stats import RingEventStatistics
 
 
 def _header() -> None:
@@ -61,6 +71,7 @@ pass_doorbell = click.make_pass_decorator(RingDoorBell)
 
 cache_file = Path(CLI_TOKEN_FILE)
 gcm_cache_file = Path(GCM_TOKEN_FILE)
+session_cache_file = Path(CLI_SESSION_FILE)
 
 
 def CatchAllExceptions(cls):
@@ -89,10 +100,14 @@ def CatchAllExceptions(cls):
             self._debug = any(
                 [arg for arg in args if arg in ["--debug", "-d", "--verbose", "-v"]]
             )
+            cli_args = list(args)
             try:
-                return await super().make_context(
+                ctx = await super().make_context(
                     info_name, args, parent=parent, **extra
                 )
+                # Kept to pass the command on to a daemon
+                ctx.meta["cli_args"] = cli_args
+                return ctx
             except Exception as exc:
                 _handle_exception(self._debug, exc)
 
@@ -171,38 +186,72 @@ async def _do_auth(username, password, user_agent=USER_AGENT):
         return auth
 
 
-async def _get_ring(username, password, do_update_data, user_agent=USER_AGENT):
+# The data each command reads, loaded before the command runs.  Commands
+# not listed load devices, dings and groups.
+COMMAND_DATA: dict[str | None, frozenset[str]] = {
+    None: frozenset({"devices", "health"}),
+    "list": frozenset({"devices"}),
+    "motion-detection": frozenset({"devices"}),
+    "light": frozenset({"devices"}),
+    "show": frozenset({"devices"}),
+    "devices": frozenset({"devices"}),
+    "dings": frozenset({"dings"}),
+    "groups": frozenset({"devices", "groups"}),
+    "raw-query": frozenset(),
+    "history": frozenset({"devices"}),
+    "export": frozenset({"devices"}),
+    "videos": frozenset({"devices"}),
+    "in-home-chime": frozenset({"devices"}),
+    "open-door": frozenset({"devices"}),
+    "listen": frozenset(),
+    "daemon": frozenset({"devices", "dings", "groups", "health"}),
+}
+DEFAULT_COMMAND_DATA = frozenset({"devices", "dings", "groups"})
+
+
+async def _async_load_data(ring: Ring, data: frozenset[str]) -> None:
+    """Load the data concurrently, groups and health are loaded after devices."""
+    await ring.async_ensure_session()
+    first = []
+    if data & {"devices", "groups", "health"}:
+        first.append(ring.async_update_devices())
+    if "dings" in data:
+        first.append(ring.async_update_dings())
+    await asyncio.gather(*first)
+    second = []
+    if "groups" in data:
+        second.append(ring.async_update_groups())
+    if "health" in data:
+        second.extend(dev.async_update_health_data() for dev in ring.get_device_list())
+    await asyncio.gather(*second)
+
+
+async def _get_ring(username, password, data, user_agent=USER_AGENT):
     # connect to Ring account
-    global cache_file, gcm_cache_file
+    global cache_file, gcm_cache_file, session_cache_file
     if user_agent != USER_AGENT:
         cache_file = Path(user_agent + ".token.cache")
         gcm_cache_file = Path(user_agent + ".gcm_token.cache")
+        session_cache_file = Path(user_agent + ".session.cache")
+    # Reuse the session of earlier commands instead of creating one each time
+    session_store = RingSessionFileStore(session_cache_file)
     if cache_file.is_file():
         auth = Auth(
             user_agent,
             json.loads(cache_file.read_text(encoding="utf-8")),
             token_updated,
         )
-        ring = Ring(auth)
-        do_method = (
-            ring.async_update_data if do_update_data else ring.async_create_session
-        )
+        ring = Ring(auth, session_store=session_store)
         try:
-            await do_method()
+            await _async_load_data(ring, data)
         except AuthenticationError:
             auth = await _do_auth(username, password)
-            ring = Ring(auth)
-            do_method = (
-                ring.async_update_data if do_update_data else ring.async_create_session
-            )
-            await do_method()
+            ring = Ring(auth, session_store=session_store)
+            await _async_load_data(ring, data)
     else:
         auth = await _do_auth(username, password, user_agent=user_agent)
-        ring = Ring(auth)
-        do_method = (
-            ring.async_update_data if do_update_data else ring.async_create_session
-        )
-        await do_method()
+        ring = Ring(auth, session_store=session_store)
+        await _async_load_data(ring, data)
 
     return ring
 
@@ -273,14 +322,44 @@ def _get_device(
     envvar="RING_USER_AGENT",
     help="User agent to send to ring",
 )
+@click.option(
+    "--daemon-socket",
+    default=CLI_DAEMON_SOCKET_FILE,
+    required=False,
+    envvar="RING_DAEMON_SOCKET",
+    help="Socket of a running ring-doorbell daemon to send commands to",
+)
+@click.option(
+    "--no-daemon",
+    default=False,
+    is_flag=True,
+    help="Run the command in this process even if a daemon is running",
+)
 @click.pass_context
-async def cli(ctx, username, password, debug, user_agent):
+async def cli(ctx, username, password, debug, user_agent, daemon_socket, no_daemon):
     """Command line function."""
     # no need to perform any checks if we are just displaying the help
     if "--help" in sys.argv:
         # Context object is required to avoid crashing on sub-groups
         ctx.obj = Ring(None)
         return
+    if isinstance(ctx.obj, _CliDaemon):
+        # Running a command for a client of the daemon
+        _header()
+        ctx.obj = ctx.obj.ring
+        if refresh := DAEMON_REFRESH_DATA.get(ctx.invoked_subcommand):
+            await _async_load_data(ctx.obj, refresh)
+        if ctx.invoked_subcommand is None:
+            return await ctx.invoke(show)
+        return None
+    ctx.meta["daemon_socket"] = daemon_socket
+    if (
+        not no_daemon
+        and ctx.invoked_subcommand not in DAEMON_LOCAL_COMMANDS
+        and (exit_code := await _run_in_daemon(daemon_socket, ctx.meta["cli_args"]))
+        is not None
+    ):
+        ctx.exit(exit_code)
     _header()
 
     logging.basicConfig()
@@ -291,8 +370,7 @@ async def cli(ctx, username, password, debug, user_agent):
     logger = logging.getLogger("firebase_messaging")
     logger.setLevel(log_level)
 
-    no_update_commands = ["listen"]
-    no_update = ctx.invoked_subcommand in no_update_commands
+    data = COMMAND_DATA.get(ctx.invoked_subcommand, DEFAULT_COMMAND_DATA)
 
     @asynccontextmanager
     async def async_wrapped_ring(ring: Ring):
@@ -301,7 +379,7 @@ async def cli(ctx, username, password, debug, user_agent):
         finally:
             await ring.auth.async_close()
 
-    ring = await _get_ring(username, password, not no_update, user_agent)
+    ring = await _get_ring(username, password, data, user_agent)
     # wrapped ring will ensure async_close is called when cli is finished
     ctx.obj = await ctx.with_async_resource(async_wrapped_ring(ring))
 
@@ -380,7 +458,7 @@ async def motion_detection(ctx, ring: Ring, device_name, turn_on, turn_off):
         return None
 
     await device.async_set_motion_detection(turn_on if turn_on else False)
-    await ring.async_update_devices()
+    await device.async_update_device_data()
     state = "on" if device.motion_detection else "off"
     echo(f"{device!s} motion detection set to {state}")
     return None
@@ -452,8 +530,11 @@ async def show(ctx, ring: Ring, device_name):
     else:
         devices = ring.get_device_list()
 
+    # Only the health of the printed devices is loaded
+    await asyncio.gather(
+        *(dev.async_update_health_data() for dev in devices if not dev._health_attrs)
+    )
     for dev in devices:
-        await dev.async_update_health_data()
         echo("Name:       %s" % dev.name)
         echo("Family:     %s" % dev.family)
         echo("ID:         %s" % dev.id)
@@ -619,6 +700,87 @@ async def history_command(ctx, ring: Ring, device_name, kind, limit, json_flag):
     return None
 
 
+@cli.command(name="export")
+@click.option(
+    "--device-name",
+    "-dn",
+    required=False,
+    default=None,
+    help="Name of device, if ommited exports all video devices",
+)
+@click.option(
+    "--format",
+    "export_format",
+    required=False,
+    default="ndjson",
+    type=click.Choice(list(HISTORY_WRITERS), case_sensitive=False),
+    help="Output format, parquet requires pyarrow",
+)
+@click.option(
+    "--output",
+    "-o",
+    required=False,
+    default="-",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="File to write to, defaults to stdout",
+)
+@click.option(
+    "--kind",
+    required=False,
+    default=None,
+    type=click.Choice(["ding", "motion", "on_demand"], case_sensitive=False),
+    help="Only export events of this kind",
+)
+@click.option(
+    "--limit",
+    required=False,
+    default=None,
+    type=int,
+    help="Maximum number of events to export",
+)
+@click.option(
+    "--fields",
+    required=False,
+    default=None,
+    help="Comma separated fields for csv and parquet, e.g. id,recording.status",
+)
+@pass_ring
+@click.pass_context
+async def export_command(
+    ctx, ring: Ring, device_name, export_format, output, kind, limit, fields
+):
+    """Export history newest first without loading it all into memory."""
+    devices = None
+    if device_name:
+        if not (device := ring.get_video_device_by_name(device_name)):
+            echo(
+                f"No device with name {device_name} found. "
+                + "List of found device names (kind) is:"
+            )
+            return await ctx.invoke(list_command)
+        devices = [device]
+
+    writer_cls = HISTORY_WRITERS[export_format.lower()]
+    field_list = fields.split(",") if fields else None
+    if output == "-":
+        file = sys.stdout.buffer if writer_cls.binary else sys.stdout
+        with writer_cls(file, field_list) as writer:
+            await async_export_history(
+                ring, writer, devices, kind=kind, limit=limit, page_size=100
+            )
+        return None
+
+    mode = "wb" if writer_cls.binary else "w"
+    newline = None if writer_cls.binary else ""
+    with Path(output).open(mode, newline=newline) as file:
+        with writer_cls(file, field_list) as writer:
+            rows = await async_export_history(
+                ring, writer, devices, kind=kind, limit=limit, page_size=100
+            )
+    echo(f"Exported {rows} events to {output}")
+    return None
+
+
 @cli.command()
 @click.option(
     "--count",
@@ -699,7 +861,7 @@ async def videos(
         echo("Last recording url is: " + url)
         return None
 
-    events = None
+    events: list[dict] | None = None
     if download_all:
         download = True
         max_count = -1
@@ -723,13 +885,24 @@ async def videos(
             + "\tThis may take some time....\n"
         )
 
-        events = await _get_events(device, max_count)
-
-        motion = len([m["kind"] for m in events if m["kind"] == "motion"])
-        ding = len([m["kind"] for m in events if m["kind"] == "ding"])
-        on_demand = len([m["kind"] for m in events if m["kind"] == "on_demand"])
+        stats = RingEventStatistics()
+        if download:
+            # The events are needed to download so count them as they are
+            events = await _get_events(device, max_count)
+            total = stats.add_history(device.device_api_id, events)
+        else:
+            total = await stats.async_update(
+                ring,
+                [device],
+                page_size=100 if max_count == -1 else min(100, max_count),
+                limit=None if max_count == -1 else max_count,
+            )
+        kinds = stats.kinds(device.device_api_id)
+        motion = kinds.get("motion", 0)
+        ding = kinds.get("ding", 0)
+        on_demand = kinds.get("on_demand", 0)
 
-        echo(f"\tTotal videos: {len(events)}")
+        echo(f"\tTotal videos: {total}")
         echo(f"\tDing triggered: {ding}")
         echo(f"\tMotion triggered: {motion}")
         echo(f"\tOn-Demand triggered: {on_demand}")
@@ -885,6 +1058,40 @@ class _event_handler:  # pylint:disable=invalid-name
         echo(msg)
 
 
+def _create_event_listener(
+    ring: Ring,
+    credentials_file,
+    *,
+    store_credentials: bool = True,
+    show_credentials: bool = False,
+):
+    from ring_doorbell.listen import (  # pylint:disable=import-outside-toplevel
+        RingEventListener,
+    )
+
+    def credentials_updated_callback(credentials) -> None:
+        if store_credentials:
+            with open(credentials_file, "w", encoding="utf-8") as f:
+                json.dump(credentials, f)
+        else:
+            echo("New push credentials created:")
+            if show_credentials:
+                echo(credentials)
+
+    if not credentials_file:
+        credentials_file = gcm_cache_file
+    else:
+        credentials_file = Path(credentials_file)
+
+    credentials = None
+    if store_credentials and credentials_file.is_file():
+        # already registered, load previous credentials
+        with open(credentials_file, encoding="utf-8") as f:
+            credentials = json.load(f)
+
+    return RingEventListener(ring, credentials, credentials_updated_callback)
+
+
 @cli.command
 @click.option(
     "--credentials-file",
@@ -917,31 +1124,12 @@ async def listen(
 ) -> None:
     """Listen to push notification like the ones sent to your phone."""
 
-    from ring_doorbell.listen import (  # pylint:disable=import-outside-toplevel
-        RingEventListener,
+    event_listener = _create_event_listener(
+        ring,
+        credentials_file,
+        store_credentials=store_credentials,
+        show_credentials=show_credentials,
     )
-
-    def credentials_updated_callback(credentials) -> None:
-        if store_credentials:
-            with open(credentials_file, "w", encoding="utf-8") as f:
-                json.dump(credentials, f)
-        else:
-            echo("New push credentials created:")
-            if show_credentials:
-                echo(credentials)
-
-    if not credentials_file:
-        credentials_file = gcm_cache_file
-    else:
-        credentials_file = Path(credentials_file)
-
-    credentials = None
-    if store_credentials and credentials_file.is_file():
-        # already registered, load previous credentials
-        with open(credentials_file, encoding="utf-8") as f:
-            credentials = json.load(f)
-
-    event_listener = RingEventListener(ring, credentials, credentials_updated_callback)
     await event_listener.start()
     event_listener.add_notification_callback(_event_handler(ring).on_event)
 
@@ -950,6 +1138,184 @@ async def listen(
     await event_listener.stop()
 
 
+# Commands that are long running or interactive, or that write files relative
+# to the working directory or binary output, are not sent to the daemon
+DAEMON_LOCAL_COMMANDS = {"daemon", "listen", "export", "videos"}
+DAEMON_REFRESH_INTERVAL = 300
+# Data that changes too often to be answered from the periodic refresh
+DAEMON_REFRESH_DATA = {"dings": frozenset({"dings"})}
+
+
+async def _daemon_running(socket_path: str | Path) -> bool:
+    """Return True if a daemon accepts connections on the socket."""
+    try:
+        _, writer = await asyncio.open_unix_connection(str(socket_path))
+    except OSError:
+        return False
+    writer.close()
+    with contextlib.suppress(OSError):
+        await writer.wait_closed()
+    return True
+
+
+async def _run_in_daemon(socket_path: str, args: list[str]) -> int | None:
+    """Run a command in the daemon, return None if no daemon is running.
+
+    The command is not run locally if the daemon fails to reply as it may
+    already have run it.
+    """
+    try:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    except OSError:
+        return None
+    try:
+        writer.write(json.dumps({"args": args}).encode() + b"\n")
+        await writer.drain()
+        reply = await reader.readline()
+        response = json.loads(reply)
+        output, exit_code = response["output"], response["exit_code"]
+    except (ConnectionError, ValueError, KeyError, TypeError) as ex:
+        msg = (
+            f"The daemon on {socket_path} did not reply to the command, "
+            "it may have stopped while running it"
+        )
+        raise click.ClickException(msg) from ex
+    finally:
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+    echo(output, nl=False)
+    return exit_code
+
+
+class _CliDaemon:
+    """Runs cli commands sent over a unix socket with a shared Ring."""
+
+    def __init__(self, ring: Ring) -> None:
+        self.ring = ring
+        # Commands write to stdout so they are run one at a time
+        self._lock = asyncio.Lock()
+
+    async def start(self, socket_path: str | Path) -> asyncio.AbstractServer:
+        """Start serving commands on a socket only the user can access.
+
+        A socket left behind by a daemon that is no longer running is
+        replaced but one of a running daemon is not.
+        """
+        if await _daemon_running(socket_path):
+            msg = f"A daemon is already running on {socket_path}"
+            raise click.ClickException(msg)
+        Path(socket_path).unlink(missing_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Bind with a umask so the socket is never accessible to other users
+        umask = os.umask(0o177)
+        try:
+            sock.bind(str(socket_path))
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        return await asyncio.start_unix_server(self._handle, sock=sock)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = json.loads(await reader.readline())
+            exit_code, output = await self.run(request["args"])
+            response = {"exit_code": exit_code, "output": output}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+    async def run(self, args: list[str]) -> tuple[int, str]:
+        """Run a command and return the exit code and output."""
+        output = io.StringIO()
+        async with self._lock:
+            with contextlib.redirect_stdout(output):
+                try:
+                    await cli.main(
+                        args,
+                        prog_name="ring-doorbell",
+                        obj=self,
+                        standalone_mode=False,
+                    )
+                    exit_code = 0
+                except click.exceptions.Exit as ex:
+                    exit_code = ex.exit_code
+                except click.ClickException as ex:
+                    ex.show(file=output)
+                    exit_code = ex.exit_code
+                except click.Abort:
+                    exit_code = 1
+                except SystemExit as ex:
+                    if isinstance(ex.code, str):
+                        echo(ex.code)
+                    exit_code = ex.code if isinstance(ex.code, int) else 1
+        return exit_code, output.getvalue()
+
+
+@cli.command
+@click.option(
+    "--credentials-file",
+    required=False,
+    default=None,
+    help="File to store push credentials, defaults to the listen command's file",
+)
+@click.option(
+    "--listen/--no-listen",
+    "listen_flag",
+    default=True,
+    help="Whether to keep the active dings up to date with push notifications",
+)
+@click.option(
+    "--refresh-interval",
+    default=DAEMON_REFRESH_INTERVAL,
+    type=click.IntRange(min=10),
+    help="Seconds between refreshing the device data",
+)
+@pass_ring
+@click.pass_context
+async def daemon(ctx, ring: Ring, credentials_file, listen_flag, refresh_interval):
+    """Serve cli commands over a unix socket to skip auth and loading data."""
+    socket_path = ctx.find_root().meta.get("daemon_socket", CLI_DAEMON_SOCKET_FILE)
+    server = await _CliDaemon(ring).start(socket_path)
+    event_listener = None
+    if listen_flag:
+        event_listener = _create_event_listener(ring, credentials_file)
+        await event_listener.start()
+
+    async def _refresh() -> None:
+        while True:
+            await asyncio.sleep(refresh_interval)
+            try:
+                await _async_load_data(ring, COMMAND_DATA["daemon"])
+            except Exception:
+                logging.getLogger(PACKAGE_NAME).exception("Error refreshing data")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    with contextlib.suppress(NotImplementedError):
+        loop.add_signal_handler(signal.SIGTERM, stop.set)
+    refresh_task = asyncio.create_task(_refresh())
+    echo(f"Daemon listening on {socket_path}, pid {os.getpid()}")
+    try:
+        await stop.wait()
+    finally:
+        with contextlib.suppress(NotImplementedError):
+            loop.remove_signal_handler(signal.SIGTERM)
+        refresh_task.cancel()
+        server.close()
+        await server.wait_closed()
+        Path(socket_path).unlink(missing_ok=True)
+        if event_listener:
+            await event_listener.stop()
+
+
 @cli.command
 @click.option(
     "--device-name",
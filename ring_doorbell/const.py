@@ -61,6 +61,10 @@ TIMEOUT = 10
 # backend; to be safe, we factor in a worst case overhead and set it to 2
 # minutes (this default can be overridden in method call)
 DEFAULT_VIDEO_DOWNLOAD_TIMEOUT = 120
+# chunk size for streamed downloads
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_CONCURRENT_URL_FETCHES = 4
+DEFAULT_TIMELINE_PAGE_SIZE = 30
 
 
 # API endpoints
@@ -81,6 +85,8 @@ FCM_APP_ID = "1:876313859327:android:e10ec6ddb3c81f39"
 
 CLI_TOKEN_FILE = "ring_token.cache"  # noqa: S105
 GCM_TOKEN_FILE = "ring_gcm_token.cache"  # noqa: S105
+CLI_DAEMON_SOCKET_FILE = "ring_doorbell.sock"
+CLI_SESSION_FILE = "ring_session.cache"
 CHIMES_ENDPOINT = "/clients_api/chimes/{0}"
 DEVICES_ENDPOINT = "/clients_api/ring_devices"
 DINGS_ENDPOINT = "/clients_api/dings/active"
@@ -9,9 +9,9 @@ import time
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar
 
-import aiofiles
-
 from ring_doorbell.const import (
+    DEFAULT_MAX_CONCURRENT_URL_FETCHES,
+    DEFAULT_STREAM_CHUNK_SIZE,
     DEFAULT_VIDEO_DOWNLOAD_TIMEOUT,
     DINGS_ENDPOINT,
     DOORBELL_2_KINDS,
@@ -49,8 +49,13 @@ from ring_doorbell.const import (
     RingCapability,
 )
 from ring_doorbell.exceptions import RingError
+from ring_doorbell.freshness import health_source
 from ring_doorbell.generic import RingGeneric
-from ring_doorbell.webrtcstream import RingWebRtcMessageCallback, RingWebRtcStream
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from ring_doorbell.webrtcstream import RingWebRtcMessageCallback, RingWebRtcStream
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -78,6 +83,7 @@ class RingDoorBell(RingGeneric):
             HEALTH_DOORBELL_ENDPOINT.format(self.device_api_id)
         )
         self._health_attrs = resp.json().get("device_health", {})
+        self._ring.freshness.updated(health_source(self))
 
     @property
     def model(self) -> str:  # noqa: C901, PLR0911
@@ -211,9 +217,14 @@ class RingDoorBell(RingGeneric):
             "doorbot[description]": self.name,
             "doorbot[settings][chime_settings][type]": value,
         }
-        if self.existing_doorbell_type:
+        if self._batched("existing_doorbell_type"):
             url = DOORBELLS_ENDPOINT.format(self.device_api_id)
-            await self._ring.async_query(url, extra_params=params, method="PUT")
+            await self._async_query_optimistic(
+                {("settings", "chime_settings", "type"): value},
+                url,
+                extra_params=params,
+                method="PUT",
+            )
 
     @property
     def existing_doorbell_type_enabled(self) -> bool | None:
@@ -226,11 +237,11 @@ class RingDoorBell(RingGeneric):
 
     async def async_set_existing_doorbell_type_enabled(self, value: bool) -> None:  # noqa: FBT001
         """Enable/disable the existing doorbell if Digital/Mechanical."""
-        if self.existing_doorbell_type:
+        if existing_type := self._batched("existing_doorbell_type"):
             if not isinstance(value, bool):
                 raise RingError(MSG_BOOLEAN_REQUIRED)
 
-            if self.existing_doorbell_type == DOORBELL_EXISTING_TYPE[2]:
+            if existing_type == DOORBELL_EXISTING_TYPE[2]:
                 msg = "In-Home chime is not present."
                 raise RingError(msg)
 
@@ -241,7 +252,12 @@ class RingDoorBell(RingGeneric):
                 "doorbot[settings][chime_settings][enable]": int_value,
             }
             url = DOORBELLS_ENDPOINT.format(self.device_api_id)
-            await self._ring.async_query(url, extra_params=params, method="PUT")
+            await self._async_query_optimistic(
+                {("settings", "chime_settings", "enable"): value},
+                url,
+                extra_params=params,
+                method="PUT",
+            )
 
     @property
     def existing_doorbell_type_duration(self) -> int | None:
@@ -255,7 +271,7 @@ class RingDoorBell(RingGeneric):
 
     async def async_set_existing_doorbell_type_duration(self, value: int) -> None:
         """Set duration for Digital chime."""
-        if self.existing_doorbell_type:
+        if existing_type := self._batched("existing_doorbell_type"):
             if not (
                 (isinstance(value, int))
                 and (
@@ -270,13 +286,18 @@ class RingDoorBell(RingGeneric):
                     )
                 )
 
-            if self.existing_doorbell_type == DOORBELL_EXISTING_TYPE[1]:
+            if existing_type == DOORBELL_EXISTING_TYPE[1]:
                 params = {
                     "doorbot[description]": self.name,
                     "doorbot[settings][chime_settings][duration]": value,
                 }
                 url = DOORBELLS_ENDPOINT.format(self.device_api_id)
-                await self._ring.async_query(url, extra_params=params, method="PUT")
+                await self._async_query_optimistic(
+                    {("settings", "chime_settings", "duration"): value},
+                    url,
+                    extra_params=params,
+                    method="PUT",
+                )
 
     async def async_get_last_recording_id(self) -> int | None:
         """Return the last recording ID."""
@@ -324,6 +345,8 @@ class RingDoorBell(RingGeneric):
                     if Path(filename).is_file() and not override:
                         raise RingError(FILE_EXISTS.format(filename))
 
+                    import aiofiles  # noqa: PLC0415
+
                     async with aiofiles.open(filename, "wb") as recording:
                         await recording.write(req.content)
                         return None
@@ -340,6 +363,24 @@ class RingDoorBell(RingGeneric):
             _LOGGER.exception(msg)
             raise RingError(msg) from error
 
+    async def async_recording_stream(
+        self,
+        recording_id: int,
+        *,
+        timeout: int = DEFAULT_VIDEO_DOWNLOAD_TIMEOUT,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Yield a recording in MP4 format in chunks as it downloads."""
+        if not self.has_subscription:
+            msg = "Your Ring account does not have an active subscription."
+            raise RingError(msg)
+
+        url = URL_RECORDING.format(recording_id)
+        async for chunk in self._ring.async_query_stream(
+            url, timeout=timeout, chunk_size=chunk_size
+        ):
+            yield chunk
+
     async def async_recording_url(self, recording_id: int) -> str | None:
         """Return HTTPS recording URL."""
         if not self.has_subscription:
@@ -347,6 +388,11 @@ class RingDoorBell(RingGeneric):
             _LOGGER.warning(msg)
             return None
 
+        return await self._ring.recording_url_cache.async_get(
+            recording_id, lambda: self._async_fetch_recording_url(recording_id)
+        )
+
+    async def _async_fetch_recording_url(self, recording_id: int) -> str | None:
         url = URL_RECORDING_SHARE_PLAY.format(recording_id)
         req = await self._ring.async_query(url)
         data = req.json()
@@ -354,6 +400,37 @@ class RingDoorBell(RingGeneric):
             return data["url"]
         return None
 
+    async def async_prefetch_recording_urls(
+        self,
+        limit: int = 10,
+        *,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_URL_FETCHES,
+    ) -> dict[int, str]:
+        """Fetch the urls of the newest ready recordings into the url cache.
+
+        Returns a dict of recording id to url for the recordings fetched.
+        """
+        if not self.has_subscription:
+            return {}
+        history = await self.async_history(limit=limit, convert_timezone=False)
+        recording_ids = [
+            entry["id"]
+            for entry in history[:limit]
+            if entry.get("recording", {}).get("status") == "ready"
+        ]
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def _fetch(recording_id: int) -> str | None:
+            async with semaphore:
+                return await self.async_recording_url(recording_id)
+
+        urls = await asyncio.gather(
+            *(_fetch(recording_id) for recording_id in recording_ids)
+        )
+        return {
+            recording_id: url for recording_id, url in zip(recording_ids, urls) if url
+        }
+
     @property
     def subscribed(self) -> bool:
         """Return if is online."""
@@ -390,7 +467,12 @@ class RingDoorBell(RingGeneric):
             "doorbot[settings][doorbell_volume]": str(value),
         }
         url = DOORBELLS_ENDPOINT.format(self.device_api_id)
-        await self._ring.async_query(url, extra_params=params, method="PUT")
+        await self._async_query_optimistic(
+            {("settings", "doorbell_volume"): value},
+            url,
+            extra_params=params,
+            method="PUT",
+        )
 
     @property
     def connection_status(self) -> str | None:
@@ -417,6 +499,8 @@ class RingDoorBell(RingGeneric):
                 )
                 snapshot = resp.content
                 if filename:
+                    import aiofiles  # noqa: PLC0415
+
                     async with aiofiles.open(filename, "wb") as jpg:
                         await jpg.write(snapshot)
                     return None
@@ -451,12 +535,19 @@ class RingDoorBell(RingGeneric):
         url = SETTINGS_ENDPOINT.format(self.device_api_id)
         payload = {"motion_settings": {"motion_detection_enabled": state}}
 
-        await self._ring.async_query(url, method="PATCH", json=payload)
+        await self._async_query_optimistic(
+            {("settings", "motion_detection_enabled"): state},
+            url,
+            method="PATCH",
+            json=payload,
+        )
 
     async def generate_webrtc_stream(
         self, sdp_offer: str, *, keep_alive_timeout: int | None = 30
     ) -> str:
         """Generate the rtc stream."""
+        from ring_doorbell.webrtcstream import RingWebRtcStream  # noqa: PLC0415
+
         if session_id := RingWebRtcStream.get_sdp_session_id(sdp_offer):
 
             async def _close_callback() -> None:
@@ -485,6 +576,7 @@ class RingDoorBell(RingGeneric):
         keep_alive_timeout: int | None = 60 * 5,
     ) -> None:
         """Generate the rtc stream. Will callback with answers and ICE candidates."""
+        from ring_doorbell.webrtcstream import RingWebRtcStream  # noqa: PLC0415
 
         async def _close_callback() -> None:
             await self.close_webrtc_stream(session_id)
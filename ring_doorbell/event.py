@@ -2,13 +2,37 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field, fields
 from typing import Any, NamedTuple
 
+# Events are created for every push and every active ding so they use slots
+# where dataclasses support them
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+class RingEventKey(NamedTuple):
+    """Class to identify an event.
+
+    Used for determining if messages are updates to events.
+    """
+
+    id: int
+    doorbot_id: int
+    kind: str
+    now: float
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class RingEvent:
-    """Class for ring events."""
+    """Class for ring events.
+
+    Events hash by their key so they can be used in sets, do not change the
+    key fields of an event while it is in one.  The key is cached as the
+    listener looks it up for every push.  The cached key is checked against
+    the key fields when it is read, so it is rebuilt after one is assigned
+    without slowing down assigning the fields.
+    """
 
     id: int
     doorbot_id: int
@@ -19,6 +43,13 @@ class RingEvent:
     kind: str
     state: str
     is_update: bool = False
+    _key: RingEventKey | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __hash__(self) -> int:
+        """Return the hash of the event key."""
+        return hash((self.id, self.doorbot_id, self.kind, self.now))
 
     def __getitem__(self, key: str) -> Any:
         """Get a value by string."""
@@ -26,20 +57,22 @@ class RingEvent:
 
     def get(self, key: str) -> Any | None:
         """Get a value by string and return None if not present."""
-        return getattr(self, key) if hasattr(self, key) else None
+        return getattr(self, key) if key in _FIELD_NAMES else None
 
     def get_key(self) -> RingEventKey:
         """Return the identificationkey for the event."""
-        return RingEventKey(self.id, self.doorbot_id, self.kind, self.now)
+        key = self._key
+        if (
+            key is None
+            or key[0] != self.id
+            or key[1] != self.doorbot_id
+            or key[2] != self.kind
+            or key[3] != self.now
+        ):
+            key = self._key = RingEventKey(
+                self.id, self.doorbot_id, self.kind, self.now
+            )
+        return key
 
 
-class RingEventKey(NamedTuple):
-    """Class to identify an event.
-
-    Used for determining if messages are updates to events.
-    """
-
-    id: int
-    doorbot_id: int
-    kind: str
-    now: float
+_FIELD_NAMES = frozenset(item.name for item in fields(RingEvent) if item.init)
@@ -0,0 +1,244 @@
+"""Module for exporting device history to files.
+
+History is paged from the api and written row by row, so memory use is
+bounded by the page size and, for parquet, the row group size rather than
+by the length of the history.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import json
+from typing import IO, TYPE_CHECKING, Any, ClassVar
+
+from ring_doorbell.const import DEFAULT_TIMELINE_PAGE_SIZE
+from ring_doorbell.exceptions import RingError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from typing_extensions import Self
+
+    from ring_doorbell.doorbot import RingDoorBell
+    from ring_doorbell.ring import Ring
+
+DEFAULT_EXPORT_FIELDS = (
+    "id",
+    "device_id",
+    "device_name",
+    "created_at",
+    "kind",
+    "answered",
+    "favorite",
+    "duration",
+    "recording.status",
+)
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+
+def flatten_history_entry(entry: dict[str, Any]) -> dict[str, Any]:
+    """Return a history entry with nested dicts flattened to dotted keys."""
+    row: dict[str, Any] = {}
+    for key, value in entry.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in flatten_history_entry(value).items():
+                row[f"{key}.{sub_key}"] = sub_value
+        else:
+            row[key] = value
+    return row
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+class RingHistoryWriter:
+    """Base class for writing history rows to a file.
+
+    Rows are the history entries with device_id and device_name added.
+    """
+
+    binary: ClassVar[bool] = False
+
+    def __init__(self, output: IO[Any], fields: Sequence[str] | None = None) -> None:
+        """Initialise the writer for an open file."""
+        self._output = output
+        self.fields = tuple(fields or DEFAULT_EXPORT_FIELDS)
+        self.rows = 0
+
+    def write(self, row: dict[str, Any]) -> None:
+        """Write a row."""
+        self._write(row)
+        self.rows += 1
+
+    def _write(self, row: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Write any buffered rows, the file is left open."""
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the writer on exit."""
+        self.close()
+
+
+class RingHistoryNdjsonWriter(RingHistoryWriter):
+    """Writes each history entry as a line of json.
+
+    Entries are written whole so fields is ignored.
+    """
+
+    def _write(self, row: dict[str, Any]) -> None:
+        self._output.write(json.dumps(row, default=_json_default))
+        self._output.write("\n")
+
+
+class RingHistoryCsvWriter(RingHistoryWriter):
+    """Writes the fields of history entries as csv.
+
+    Nested fields are selected with dotted names, e.g. recording.status.
+    """
+
+    def __init__(self, output: IO[Any], fields: Sequence[str] | None = None) -> None:
+        """Initialise the writer and write the header."""
+        super().__init__(output, fields)
+        self._writer = csv.DictWriter(
+            output, fieldnames=self.fields, extrasaction="ignore"
+        )
+        self._writer.writeheader()
+
+    def _write(self, row: dict[str, Any]) -> None:
+        flat = flatten_history_entry(row)
+        for key, value in flat.items():
+            if isinstance(value, dt.datetime):
+                flat[key] = value.isoformat()
+            elif isinstance(value, list):
+                flat[key] = json.dumps(value, default=_json_default)
+        self._writer.writerow(flat)
+
+
+class RingHistoryParquetWriter(RingHistoryWriter):
+    """Writes the fields of history entries as parquet in row groups.
+
+    Requires the optional pyarrow package.
+    """
+
+    binary = True
+
+    _TYPES: ClassVar[dict[str, str]] = {
+        "id": "int64",
+        "device_id": "int64",
+        "answered": "bool",
+        "favorite": "bool",
+        "duration": "float64",
+    }
+
+    def __init__(
+        self,
+        output: IO[Any],
+        fields: Sequence[str] | None = None,
+        *,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    ) -> None:
+        """Initialise the writer, raises RingError if pyarrow is missing."""
+        try:
+            import pyarrow as pa  # noqa: PLC0415
+            import pyarrow.parquet as pq  # noqa: PLC0415
+        except ImportError as ex:
+            msg = "Exporting to parquet requires the pyarrow package"
+            raise RingError(msg) from ex
+        super().__init__(output, fields)
+        self._pa = pa
+        self.row_group_size = row_group_size
+        self._schema = pa.schema(
+            [
+                (
+                    field,
+                    pa.timestamp("ms", tz="UTC")
+                    if field == "created_at"
+                    else pa.type_for_alias(self._TYPES.get(field, "string")),
+                )
+                for field in self.fields
+            ]
+        )
+        self._writer = pq.ParquetWriter(output, self._schema)
+        self._columns: dict[str, list[Any]] = {field: [] for field in self.fields}
+        self._buffered = 0
+
+    def _write(self, row: dict[str, Any]) -> None:
+        flat = flatten_history_entry(row)
+        for field, column in self._columns.items():
+            value = flat.get(field)
+            if self._TYPES.get(field, "string") == "string" and not (
+                value is None or isinstance(value, (str, dt.datetime))
+            ):
+                value = json.dumps(value, default=_json_default)
+            column.append(value)
+        self._buffered += 1
+        if self._buffered >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffered:
+            batch = self._pa.RecordBatch.from_pydict(self._columns, self._schema)
+            self._writer.write_batch(batch, row_group_size=self.row_group_size)
+            self._columns = {field: [] for field in self.fields}
+            self._buffered = 0
+
+    def close(self) -> None:
+        """Write the buffered row group and the parquet footer."""
+        self._flush()
+        self._writer.close()
+
+
+HISTORY_WRITERS: dict[str, type[RingHistoryWriter]] = {
+    "ndjson": RingHistoryNdjsonWriter,
+    "csv": RingHistoryCsvWriter,
+    "parquet": RingHistoryParquetWriter,
+}
+
+
+async def async_export_history(  # noqa: PLR0913
+    ring: Ring,
+    writer: RingHistoryWriter,
+    devices: Iterable[RingDoorBell] | None = None,
+    *,
+    kind: str | None = None,
+    since: dt.datetime | None = None,
+    until: dt.datetime | None = None,
+    limit: int | None = None,
+    page_size: int = DEFAULT_TIMELINE_PAGE_SIZE,
+) -> int:
+    """Write the history of devices newest first, return the rows written.
+
+    :param devices: the devices to export, defaults to all video devices
+    :param kind: only export events of this kind (ding, motion, on_demand)
+    :param limit: stop after this many rows
+    """
+    rows = 0
+    if limit is not None and limit <= 0:
+        return rows
+    timeline = ring.async_iter_timeline(
+        devices, since=since, until=until, page_size=page_size
+    )
+    try:
+        async for device, entry in timeline:
+            if kind and entry.get("kind") != kind:
+                continue
+            writer.write(
+                {"device_id": device.device_api_id, "device_name": device.name, **entry}
+            )
+            rows += 1
+            if rows == limit:
+                break
+    finally:
+        await timeline.aclose()
+    return rows
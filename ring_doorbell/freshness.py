@@ -0,0 +1,156 @@
+"""Module for tracking the age of Ring data and refreshing it when read."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    from ring_doorbell.generic import RingGeneric
+    from ring_doorbell.ring import Ring
+
+    DataSource = tuple[Any, ...]
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_REFRESHES = 2
+
+DEVICES_SOURCE = ("devices",)
+DINGS_SOURCE = ("dings",)
+GROUPS_SOURCE = ("groups",)
+
+
+def device_source(device: RingGeneric) -> DataSource:
+    """Return the data source of the device data of a device."""
+    return ("device", device.family, device.device_api_id)
+
+
+def health_source(device: RingGeneric) -> DataSource:
+    """Return the data source of the health data of a device."""
+    return ("health", device.family, device.device_api_id)
+
+
+class RingDataFreshness:
+    """Tracks when each source of data was fetched and refreshes stale ones.
+
+    Sources are the account wide devices, dings and groups data and the
+    device and health data of each device.  The device data of a device is
+    also fetched with the account wide devices data.  Reads with a max_age
+    return the cached value and, if its source is older, schedule a
+    background refresh.  Refreshes of a source are coalesced and queued
+    ones run in order of how often their source is read, so data nobody
+    reads is not fetched.
+    """
+
+    def __init__(
+        self,
+        ring: Ring,
+        *,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_REFRESHES,
+    ) -> None:
+        """Initialise the tracker for a Ring."""
+        self._ring = ring
+        self.max_concurrent = max_concurrent
+        self._updated: dict[DataSource, float] = {}
+        self._reads: dict[DataSource, int] = {}
+        self._queued: set[DataSource] = set()
+        self._running: dict[DataSource, asyncio.Task] = {}
+
+    def updated(self, source: DataSource, at: float | None = None) -> None:
+        """Record that a source was fetched, at a time.monotonic time."""
+        self._updated[source] = time.monotonic() if at is None else at
+
+    def age(self, source: DataSource) -> float | None:
+        """Return the seconds since the source was fetched or None if never."""
+        updated = self._updated.get(source)
+        if source[0] == "device" and (
+            (devices_updated := self._updated.get(DEVICES_SOURCE)) is not None
+        ):
+            updated = (
+                devices_updated if updated is None else max(updated, devices_updated)
+            )
+        if updated is None:
+            return None
+        return time.monotonic() - updated
+
+    def reads(self, source: DataSource) -> int:
+        """Return the number of reads with a max_age of the source."""
+        return self._reads.get(source, 0)
+
+    def is_stale(self, source: DataSource, max_age: float) -> bool:
+        """Return True if the source was never fetched or is older than max_age."""
+        age = self.age(source)
+        return age is None or age > max_age
+
+    def request(self, source: DataSource, max_age: float) -> bool:
+        """Count a read and schedule a refresh if the source is stale.
+
+        Return True if the source is stale.  A refresh is only scheduled
+        when called from a running event loop.
+        """
+        self._reads[source] = self._reads.get(source, 0) + 1
+        if not self.is_stale(source, max_age):
+            return False
+        if source in self._queued or source in self._running:
+            return True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            _logger.debug("Not refreshing %s outside of an event loop", source)
+            return True
+        self._queued.add(source)
+        self._start_refreshes()
+        return True
+
+    async def async_refresh(self, source: DataSource) -> None:
+        """Refresh a source now, joining a refresh of it that is running.
+
+        Errors are logged and leave the source stale.
+        """
+        self._queued.discard(source)
+        if (task := self._running.get(source)) is None:
+            task = asyncio.create_task(self._async_refresh(source))
+            self._running[source] = task
+        await asyncio.shield(task)
+
+    async def async_wait(self) -> None:
+        """Wait for the queued and running refreshes to finish."""
+        while self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    def _start_refreshes(self) -> None:
+        while self._queued and len(self._running) < self.max_concurrent:
+            source = max(self._queued, key=self.reads)
+            self._queued.discard(source)
+            task = asyncio.create_task(self._async_refresh(source))
+            self._running[source] = task
+
+    async def _async_refresh(self, source: DataSource) -> None:
+        try:
+            await self._refresh_method(source)
+        except Exception:
+            _logger.exception("Error refreshing %s", source)
+        finally:
+            del self._running[source]
+            self._start_refreshes()
+
+    def _refresh_method(self, source: DataSource) -> Awaitable[None]:
+        if source == DEVICES_SOURCE:
+            return self._ring.async_update_devices()
+        if source == DINGS_SOURCE:
+            return self._ring.async_update_dings()
+        if source == GROUPS_SOURCE:
+            return self._ring.async_update_groups()
+        kind, family, device_api_id = source
+        device = next(
+            dev
+            for dev in self._ring.devices()[family]
+            if dev.device_api_id == device_api_id
+        )
+        if kind == "device":
+            return device.async_update_device_data()
+        return device.async_update_health_data()
@@ -4,18 +4,49 @@
 # pylint: disable=useless-object-inheritance
 from __future__ import annotations
 
+import copy
 import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import TYPE_CHECKING, Any, ClassVar
 
-import pytz
-
-from ring_doorbell.const import URL_DOORBELL_HISTORY, RingCapability
+from ring_doorbell.const import (
+    DOORBELLS_ENDPOINT,
+    URL_DOORBELL_HISTORY,
+    RingCapability,
+)
+from ring_doorbell.freshness import device_source, health_source
+from ring_doorbell.optimistic import apply_changes
 from ring_doorbell.util import (
     parse_datetime,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from ring_doorbell.freshness import DataSource
+
 _LOGGER = logging.getLogger(__name__)
 
+# The open batch_settings of each device in the current context, so setters
+# called by other tasks are not merged into them
+_Batch = dict[tuple[str, str], dict[str, Any]]
+_BATCHES: ContextVar[dict[RingGeneric, _Batch] | None] = ContextVar(
+    "ring_doorbell_batches", default=None
+)
+
+# Whether a property of a device class reads the device or the health data
+_PROPERTY_DATA: dict[tuple[type, str], str] = {}
+
+
+def _merge_json(target: dict[str, Any], source: dict[str, Any]) -> None:
+    """Merge a json payload into another, later values winning."""
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_json(target[key], value)
+        else:
+            target[key] = value
+
 
 class RingGeneric:
     """Generic Implementation for Ring Chime/Doorbell."""
@@ -31,8 +62,12 @@ class RingGeneric:
         self.device_api_id = device_api_id
         self.capability = False
         self.alert = None
-        self._health_attrs: dict[str, Any] = {}
+        self._health_data: dict[str, Any] = {}
+        # The data used by properties while _data_source reads them
+        self._reading: set[str] | None = None
         self._last_history: list[dict[str, Any]] = []
+        # The attributes with the batch changes applied while _batched reads
+        self._batch_attrs: dict[str, Any] | None = None
 
         # alerts notifications
         self.alert_expires_at = None
@@ -53,11 +88,171 @@ class RingGeneric:
         """Update the health data."""
         raise NotImplementedError
 
+    # Endpoint of the device record, formatted with the device api id
+    DEVICE_ENDPOINT: ClassVar[str] = DOORBELLS_ENDPOINT
+
+    async def async_update_device_data(self) -> None:
+        """Update the data of this device without fetching every device.
+
+        Only the entry of this device in the ring devices_data is replaced.
+        """
+        resp = await self._ring.async_query(
+            self.DEVICE_ENDPOINT.format(self.device_api_id)
+        )
+        data = resp.json()
+        # Unwrap a record returned keyed by the device type
+        if "id" not in data and len(data) == 1:
+            data = next(iter(data.values()))
+        self._ring.devices_data[self.family][self.device_api_id] = data
+        self._ring.freshness.updated(device_source(self))
+        self._ring.pending_updates.confirm((self.family, self.device_api_id), data)
+
+    @property
+    def pending_updates(self) -> dict[tuple[str, ...], Any]:
+        """Return the changes made by setters that no refresh has confirmed."""
+        return self._ring.pending_updates.get((self.family, self.device_api_id))
+
+    async def _async_query_optimistic(
+        self,
+        changes: dict[tuple[str, ...], Any],
+        url: str,
+        *,
+        method: str,
+        extra_params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> None:
+        """Query the api, showing the changes in the attributes meanwhile.
+
+        Inside batch_settings the query is merged into the batch instead.
+        """
+        if self._batch is not None:
+            query = self._batch.setdefault(
+                (url, method), {"changes": {}, "extra_params": None, "json": None}
+            )
+            query["changes"].update(changes)
+            if extra_params is not None:
+                query["extra_params"] = {
+                    **(query["extra_params"] or {}),
+                    **extra_params,
+                }
+            if json is not None:
+                if query["json"] is None:
+                    query["json"] = {}
+                _merge_json(query["json"], json)
+            return
+        await self._ring.pending_updates.async_update(
+            (self.family, self.device_api_id),
+            self._attrs,
+            changes,
+            self._ring.async_query(
+                url, method=method, extra_params=extra_params, json=json
+            ),
+        )
+
+    @asynccontextmanager
+    async def batch_settings(self) -> AsyncIterator[None]:
+        """Send the settings changed in the block as one request per endpoint.
+
+        Setters called in the block, or in tasks it creates, are merged by
+        endpoint and sent when it exits, so the properties keep their values
+        until then.  Setters called by other tasks are sent as usual.  Setters
+        validate against the values the batch will set.  Nothing is sent if
+        the block raises.  The endpoints are sent in turn and if one fails
+        its error is raised, the endpoints sent before it keep their
+        changes and the ones after it are not sent.
+
+            async with device.batch_settings():
+                await device.async_set_mic_volume(5)
+                await device.async_set_voice_volume(6)
+        """
+        if self._batch is not None:
+            # Nested batches are sent with the outer one
+            yield
+            return
+        batch: _Batch = {}
+        token = _BATCHES.set({**(_BATCHES.get() or {}), self: batch})
+        try:
+            yield
+        finally:
+            _BATCHES.reset(token)
+        for (url, method), query in batch.items():
+            await self._async_query_optimistic(url=url, method=method, **query)
+
+    @property
+    def _batch(self) -> _Batch | None:
+        """Return the batch of this device open in the current context."""
+        batches = _BATCHES.get()
+        return None if batches is None else batches.get(self)
+
+    def _batched(self, name: str) -> Any:
+        """Return a property as it will be once the current batch is sent."""
+        if not self._batch:
+            return getattr(self, name)
+        attrs = copy.deepcopy(self._attrs)
+        for query in self._batch.values():
+            apply_changes(attrs, query["changes"])
+        self._batch_attrs = attrs
+        try:
+            return getattr(self, name)
+        finally:
+            self._batch_attrs = None
+
+    def _data_source(self, name: str) -> DataSource:
+        """Return the source of the data a property reads.
+
+        It is found by reading the property once and recording whether it
+        used the device or the health data.
+        """
+        key = (type(self), name)
+        if (kind := _PROPERTY_DATA.get(key)) is None:
+            self._reading = set()
+            try:
+                getattr(self, name)
+            finally:
+                used, self._reading = self._reading, None
+            kind = "health" if used == {"health"} else "device"
+            # Properties that returned before reading any data are checked
+            # again next time
+            if used:
+                _PROPERTY_DATA[key] = kind
+        if kind == "health":
+            return health_source(self)
+        return device_source(self)
+
+    def read(self, name: str, *, max_age: float | None = None) -> Any:
+        """Return a property, refreshing its data in the background if stale.
+
+        The cached value is returned straight away and if its data is older
+        than max_age seconds a refresh is scheduled for later reads.
+        """
+        if max_age is not None:
+            self._ring.freshness.request(self._data_source(name), max_age)
+        return getattr(self, name)
+
+    def data_age(self, name: str) -> float | None:
+        """Return the seconds since the data of a property was fetched."""
+        return self._ring.freshness.age(self._data_source(name))
+
     @property
     def _attrs(self) -> dict[str, Any]:
         """Return attributes."""
+        if self._reading is not None:
+            self._reading.add("device")
+        if self._batch_attrs is not None:
+            return self._batch_attrs
         return self._ring.devices_data[self.family][self.device_api_id]
 
+    @property
+    def _health_attrs(self) -> dict[str, Any]:
+        """Return health attributes."""
+        if self._reading is not None:
+            self._reading.add("health")
+        return self._health_data
+
+    @_health_attrs.setter
+    def _health_attrs(self, health_attrs: dict[str, Any]) -> None:
+        self._health_data = health_attrs
+
     @property
     def id(self) -> int:
         """Return ID."""
@@ -207,6 +402,8 @@ class RingGeneric:
             if convert_timezone:
                 # convert for specific timezone
                 if timezone:
+                    import pytz  # noqa: PLC0415
+
                     mytz = pytz.timezone(timezone)
 
                 for entry in response:
@@ -40,6 +40,14 @@ class RingLightGroup:
         resp = await self._ring.async_query(url)
         self._health_attrs = resp.json()
         self._health_attrs_fetched = True
+        self._ring.pending_updates.confirm(
+            (self.family, self.group_id), self._health_attrs
+        )
+
+    @property
+    def pending_updates(self) -> dict[tuple[str, ...], Any]:
+        """Return the changes made by setters that no update has confirmed."""
+        return self._ring.pending_updates.get((self.family, self.group_id))
 
     @property
     def _attrs(self) -> dict[str, Any]:
@@ -118,8 +126,17 @@ class RingLightGroup:
         payload: dict[str, dict[str, bool | int]] = {"lights_on": {"enabled": state}}
         if duration is not None:
             payload["lights_on"]["duration_seconds"] = duration
-        await self._ring.async_query(url, method="POST", json=payload)
-        await self.async_update()
+        request = self._ring.async_query(url, method="POST", json=payload)
+        if not self._health_attrs_fetched:
+            await request
+            await self.async_update()
+            return
+        await self._ring.pending_updates.async_update(
+            (self.family, self.group_id),
+            self._health_attrs,
+            {("lights_on",): state},
+            request,
+        )
 
     DEPRECATED_API_QUERIES: ClassVar = {
         "update",
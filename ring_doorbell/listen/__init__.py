@@ -1,13 +1,29 @@
 """Package for listener modules."""
 
+from .broker import RingEventBroker, RingEventBrokerClient
+from .dispatcher import (
+    RingEventOverflowPolicy,
+    RingEventStream,
+    RingEventSubscriberStats,
+)
 from .eventlistener import RingEventListener
+from .journal import RingEventJournal
 from .listenerconfig import RingEventListenerConfig
+from .watchdog import RingEventListenerWatchdog, RingEventListenerWatchdogStats
 
 # can_listen used to be checkable to see if the optional listen extra installed.
 # Now installed as default.
 can_listen = True
 
 __all__ = [
+    "RingEventBroker",
+    "RingEventBrokerClient",
+    "RingEventJournal",
     "RingEventListener",
     "RingEventListenerConfig",
+    "RingEventListenerWatchdog",
+    "RingEventListenerWatchdogStats",
+    "RingEventOverflowPolicy",
+    "RingEventStream",
+    "RingEventSubscriberStats",
 ]
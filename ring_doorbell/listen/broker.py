@@ -0,0 +1,212 @@
+"""Module for sharing the events of one listener with other processes.
+
+The broker republishes the events received by a RingEventListener over a
+unix domain socket so that other processes can subscribe without their own
+FCM registration.  Events are sent as length prefixed binary frames and the
+most recent frames are kept so that subscribers can replay what they missed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import struct
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ring_doorbell.exceptions import RingError
+
+from .frames import FRAME_LENGTH, decode_ring_event, encode_ring_event
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from ring_doorbell.event import RingEvent
+
+    from .eventlistener import RingEventListener
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_REPLAY_SIZE = 100
+# Subscribers with more than this many bytes unsent are disconnected
+MAX_SUBSCRIBER_BUFFER = 1024 * 1024
+
+_SINCE = struct.Struct(">q")
+
+
+class RingEventBroker:
+    """Class to republish listener events to subscribers on a unix socket."""
+
+    def __init__(
+        self,
+        listener: RingEventListener,
+        path: str | Path,
+        *,
+        replay_size: int = DEFAULT_REPLAY_SIZE,
+    ) -> None:
+        """Initialise the broker for a listener and socket path."""
+        self._listener = listener
+        self.path = Path(path)
+        self._replay: deque[tuple[int, bytes]] = deque(maxlen=replay_size)
+        self._sequence = 0
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self._subscription_id: int | None = None
+
+    @property
+    def sequence(self) -> int:
+        """Return the sequence number of the last published event."""
+        return self._sequence
+
+    @property
+    def subscriber_count(self) -> int:
+        """Return the number of connected subscribers."""
+        return len(self._writers)
+
+    async def start(self) -> None:
+        """Start serving subscribers.
+
+        Raises RingError if another broker is serving on the socket path.
+        The socket is only accessible to the user running the broker.
+        """
+        if self._server:
+            return
+        if await self._socket_in_use():
+            msg = f"An event broker is already running on {self.path}"
+            raise RingError(msg)
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            sock.bind(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        self._server = await asyncio.start_unix_server(self._on_connect, sock=sock)
+        self._subscription_id = self._listener.add_notification_callback(self.publish)
+
+    async def _socket_in_use(self) -> bool:
+        try:
+            _, writer = await asyncio.open_unix_connection(str(self.path))
+        except OSError:
+            return False
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+        return True
+
+    async def stop(self) -> None:
+        """Stop serving and disconnect all subscribers."""
+        if (sub_id := self._subscription_id) is not None:
+            self._subscription_id = None
+            with contextlib.suppress(RingError):
+                self._listener.remove_notification_callback(sub_id)
+        for writer in self._writers:
+            writer.close()
+        self._writers = set()
+        if server := self._server:
+            self._server = None
+            server.close()
+            await server.wait_closed()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+    def publish(self, ring_event: RingEvent) -> None:
+        """Publish an event to all subscribers."""
+        self._sequence += 1
+        frame = encode_ring_event(self._sequence, ring_event)
+        self._replay.append((self._sequence, frame))
+        for writer in list(self._writers):
+            self._write(writer, frame)
+
+    def _write(self, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        if writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER:
+            _logger.warning("Disconnecting event broker subscriber that is too slow")
+            self._writers.discard(writer)
+            writer.close()
+            return
+        writer.write(frame)
+
+    async def _on_connect(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            (since,) = _SINCE.unpack(await reader.readexactly(_SINCE.size))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if since >= 0:
+            for sequence, frame in self._replay:
+                if sequence > since:
+                    writer.write(frame)
+        self._writers.add(writer)
+        # Wait for the subscriber to disconnect
+        with contextlib.suppress(ConnectionError):
+            await reader.read()
+        self._writers.discard(writer)
+        writer.close()
+
+
+class RingEventBrokerClient:
+    """Async iterator of the events published by a RingEventBroker.
+
+    Pass since=None to only receive new events, otherwise buffered events
+    with a sequence number greater than since are replayed first.
+    """
+
+    def __init__(self, path: str | Path, *, since: int | None = 0) -> None:
+        """Initialise the client for the broker socket path."""
+        self.path = Path(path)
+        self.last_sequence = since
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def connect(self) -> None:
+        """Connect to the broker."""
+        self._reader, self._writer = await asyncio.open_unix_connection(str(self.path))
+        since = -1 if self.last_sequence is None else self.last_sequence
+        self._writer.write(_SINCE.pack(since))
+        await self._writer.drain()
+
+    async def close(self) -> None:
+        """Disconnect from the broker."""
+        if writer := self._writer:
+            self._writer = None
+            self._reader = None
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def __aenter__(self) -> Self:
+        """Connect on entering the context manager."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Disconnect on exit."""
+        await self.close()
+
+    def __aiter__(self) -> Self:
+        """Return the iterator."""
+        return self
+
+    async def __anext__(self) -> RingEvent:
+        """Return the next event, ending when the broker disconnects."""
+        if self._reader is None:
+            raise StopAsyncIteration
+        try:
+            header = await self._reader.readexactly(FRAME_LENGTH.size)
+            (length,) = FRAME_LENGTH.unpack(header)
+            payload = await self._reader.readexactly(length)
+        except (asyncio.IncompleteReadError, ConnectionError) as ex:
+            raise StopAsyncIteration from ex
+        sequence, ring_event = decode_ring_event(payload)
+        self.last_sequence = sequence
+        return ring_event
@@ -0,0 +1,375 @@
+"""Module for dispatching ring events to subscribers off the receive path."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from enum import Enum
+from itertools import product
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ring_doorbell.event import RingEvent
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+_logger = logging.getLogger(__name__)
+
+OnNotificationQueuedCallable = Callable[[RingEvent], Optional[Awaitable[None]]]
+SubscriberIndexKey = tuple[Optional[int], Optional[str]]
+
+DEFAULT_MAX_QUEUE_SIZE = 100
+
+
+class RingEventOverflowPolicy(Enum):
+    """Enum of policies for when a subscriber queue is full."""
+
+    #: Discard the oldest queued event to make room for the new one.
+    DROP_OLDEST = "drop_oldest"
+    #: Never discard events.  Producers wait for room in the queue, events
+    #: from the FCM receive path, which cannot be suspended, wait in the
+    #: listener until the subscriber catches up.
+    BLOCK = "block"
+    #: Replace a queued event for the same ding, i.e. updates to an event,
+    #: and otherwise discard the oldest queued event.
+    COALESCE = "coalesce"
+
+
+@dataclass
+class RingEventSubscriberStats:
+    """Class for the delivery metrics of a queued subscriber."""
+
+    queued: int = 0
+    max_queued: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+
+
+class _RingEventQueue:
+    """Bounded queue of events with an overflow policy and delivery metrics."""
+
+    def __init__(
+        self,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow: RingEventOverflowPolicy = RingEventOverflowPolicy.DROP_OLDEST,
+    ) -> None:
+        self._max_queue_size = max(1, max_queue_size)
+        self._overflow = overflow
+        # Entries are [enqueued_at, event] so coalescing can replace in place
+        self._queue: deque[list[Any]] = deque()
+        self._pending_keys: dict[tuple[int, int, str], list[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        # Events refused by put under the BLOCK policy waiting for async_put
+        self._deferred = 0
+        self._stopped = False
+        self.stats = RingEventSubscriberStats()
+
+    @property
+    def lag(self) -> float:
+        """Return the age in seconds of the oldest undelivered event."""
+        if not self._queue:
+            return 0.0
+        return time.monotonic() - self._queue[0][0]
+
+    def put(self, ring_event: RingEvent) -> bool:
+        """Queue an event for delivery without blocking the caller.
+
+        Under the BLOCK policy an event that does not fit, or would overtake
+        deferred events, is not queued and False is returned.  It must then
+        be passed to async_put with deferred=True.
+        """
+        if self._overflow is RingEventOverflowPolicy.BLOCK and (
+            self._deferred or len(self._queue) >= self._max_queue_size
+        ):
+            self._deferred += 1
+            return False
+        self._put(ring_event)
+        return True
+
+    async def async_put(self, ring_event: RingEvent, *, deferred: bool = False) -> None:
+        """Queue an event for delivery, waiting for room under the BLOCK policy.
+
+        Set deferred for an event that put returned False for.
+        """
+        if not deferred and self.put(ring_event):
+            return
+        try:
+            while not self._stopped and len(self._queue) >= self._max_queue_size:
+                self._space.clear()
+                await self._space.wait()
+        finally:
+            self._deferred -= 1
+        self._put(ring_event)
+
+    def _put(self, ring_event: RingEvent) -> None:
+        if self._stopped:
+            return
+        now = time.monotonic()
+        key = (ring_event.doorbot_id, ring_event.id, ring_event.kind)
+        if self._overflow is RingEventOverflowPolicy.COALESCE and (
+            entry := self._pending_keys.get(key)
+        ):
+            entry[1] = ring_event
+            self.stats.coalesced += 1
+            return
+
+        if len(self._queue) >= self._max_queue_size:
+            self._forget(self._queue.popleft())
+            self.stats.dropped += 1
+
+        entry = [now, ring_event]
+        self._queue.append(entry)
+        if self._overflow is RingEventOverflowPolicy.COALESCE:
+            self._pending_keys[key] = entry
+        self.stats.queued = len(self._queue)
+        self.stats.max_queued = max(self.stats.max_queued, self.stats.queued)
+        self._wakeup.set()
+
+    def _forget(self, entry: list[Any]) -> None:
+        ring_event = entry[1]
+        key = (ring_event.doorbot_id, ring_event.id, ring_event.kind)
+        if self._pending_keys.get(key) is entry:
+            del self._pending_keys[key]
+
+    def _pop(self) -> RingEvent:
+        entry = self._queue.popleft()
+        self._forget(entry)
+        self.stats.queued = len(self._queue)
+        self._space.set()
+        lag = time.monotonic() - entry[0]
+        self.stats.last_lag = lag
+        self.stats.max_lag = max(self.stats.max_lag, lag)
+        return entry[1]
+
+    def _clear(self) -> None:
+        self._queue.clear()
+        self._pending_keys = {}
+        self.stats.queued = 0
+        self._space.set()
+
+    def stop(self) -> None:
+        """Stop delivering events."""
+        raise NotImplementedError
+
+
+class RingEventSubscriber(_RingEventQueue):
+    """Class to deliver events to a callback from its own queue and task."""
+
+    def __init__(
+        self,
+        callback: OnNotificationQueuedCallable,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow: RingEventOverflowPolicy = RingEventOverflowPolicy.DROP_OLDEST,
+    ) -> None:
+        """Initialise the subscriber."""
+        super().__init__(max_queue_size=max_queue_size, overflow=overflow)
+        self._callback = callback
+        self._task: asyncio.Task | None = None
+
+    def _put(self, ring_event: RingEvent) -> None:
+        super()._put(ring_event)
+        if self._task is None and not self._stopped:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                ring_event = self._pop()
+                try:
+                    res = self._callback(ring_event)
+                    if inspect.isawaitable(res):
+                        await res
+                except Exception:
+                    self.stats.errors += 1
+                    _logger.exception("Error calling notification callback")
+                else:
+                    self.stats.delivered += 1
+
+    def stop(self) -> None:
+        """Stop delivering events and discard any that are queued."""
+        task = self._task
+        self._task = None
+        self._stopped = True
+        self._clear()
+        if task and not task.done():
+            task.cancel()
+
+
+class RingEventStream(_RingEventQueue):
+    """Async iterator of the events matching a subscription.
+
+    Iteration ends when the stream is closed or the listener is stopped.
+    """
+
+    def __init__(
+        self,
+        on_close: Callable[[RingEventStream], None],
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow: RingEventOverflowPolicy = RingEventOverflowPolicy.DROP_OLDEST,
+    ) -> None:
+        """Initialise the stream."""
+        super().__init__(max_queue_size=max_queue_size, overflow=overflow)
+        self._on_close = on_close
+        self.closed = False
+
+    def __aiter__(self) -> Self:
+        """Return the iterator."""
+        return self
+
+    async def __anext__(self) -> RingEvent:
+        """Return the next event, waiting until one is received."""
+        while not self._queue:
+            if self.closed:
+                raise StopAsyncIteration
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        self.stats.delivered += 1
+        return self._pop()
+
+    async def __aenter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the stream on exit."""
+        self.close()
+
+    def close(self) -> None:
+        """Unsubscribe and end iteration once queued events are consumed."""
+        if self.closed:
+            return
+        self.closed = True
+        self._on_close(self)
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        """End iteration, called when the listener stops."""
+        self.closed = True
+        self._stopped = True
+        self._space.set()
+        self._wakeup.set()
+
+
+class RingEventSubscriberIndex:
+    """Index of queued subscribers by (doorbot_id, kind).
+
+    A subscriber without a device or kind filter is stored under None for
+    that part of the key so dispatching an event only visits the subscribers
+    that match it.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the index."""
+        self._index: dict[SubscriberIndexKey, dict[int, _RingEventQueue]] = {}
+        self._subscribers: dict[
+            int, tuple[_RingEventQueue, list[SubscriberIndexKey]]
+        ] = {}
+
+    def __len__(self) -> int:
+        """Return the number of subscribers."""
+        return len(self._subscribers)
+
+    def add(
+        self,
+        sub_id: int,
+        subscriber: _RingEventQueue,
+        *,
+        device_ids: Iterable[int] | None = None,
+        kinds: Iterable[str] | None = None,
+    ) -> None:
+        """Add a subscriber for the devices and kinds, None matches all."""
+        device_keys: Iterable[int | None] = (
+            [None] if device_ids is None else set(device_ids)
+        )
+        kind_keys: Iterable[str | None] = [None] if kinds is None else set(kinds)
+        keys = list(product(device_keys, kind_keys))
+        for key in keys:
+            self._index.setdefault(key, {})[sub_id] = subscriber
+        self._subscribers[sub_id] = (subscriber, keys)
+
+    def pop(self, sub_id: int) -> _RingEventQueue | None:
+        """Remove a subscriber and return it, or None if not in the index."""
+        if (item := self._subscribers.pop(sub_id, None)) is None:
+            return None
+        subscriber, keys = item
+        for key in keys:
+            subscribers = self._index[key]
+            del subscribers[sub_id]
+            if not subscribers:
+                del self._index[key]
+        return subscriber
+
+    def get(self, sub_id: int) -> _RingEventQueue | None:
+        """Return a subscriber by id."""
+        if (item := self._subscribers.get(sub_id)) is None:
+            return None
+        return item[0]
+
+    def values(self) -> list[_RingEventQueue]:
+        """Return all the subscribers."""
+        return [subscriber for subscriber, _ in self._subscribers.values()]
+
+    def _matching(self, ring_event: RingEvent) -> list[_RingEventQueue]:
+        index = self._index
+        doorbot_id = ring_event.doorbot_id
+        kind = ring_event.kind
+        return [
+            subscriber
+            for key in (
+                (doorbot_id, kind),
+                (doorbot_id, None),
+                (None, kind),
+                (None, None),
+            )
+            if (subscribers := index.get(key))
+            for subscriber in subscribers.values()
+        ]
+
+    def dispatch(self, ring_event: RingEvent) -> list[_RingEventQueue]:
+        """Queue the event for every matching subscriber without waiting.
+
+        Return the BLOCK subscribers without room for the event, it must be
+        passed to their async_put with deferred=True in order of dispatch.
+        """
+        if not self._index:
+            return []
+        return [
+            subscriber
+            for subscriber in self._matching(ring_event)
+            if not subscriber.put(ring_event)
+        ]
+
+    async def async_dispatch(self, ring_event: RingEvent) -> None:
+        """Queue the event for every matching subscriber, waiting for room."""
+        if not self._index:
+            return
+        for subscriber in self._matching(ring_event):
+            await subscriber.async_put(ring_event)
+
+    def clear(self) -> None:
+        """Remove all subscribers."""
+        self._index = {}
+        self._subscribers = {}
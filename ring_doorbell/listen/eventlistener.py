@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import inspect
 import json
 import logging
 import time
-from typing import TYPE_CHECKING, Any, Callable
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Union
 
 from async_timeout import timeout as asyncio_timeout
 from firebase_messaging import FcmPushClient, FcmRegisterConfig
@@ -32,21 +35,66 @@ from ring_doorbell.event import RingEvent, RingEventKey
 from ring_doorbell.exceptions import RingError
 from ring_doorbell.util import parse_datetime
 
+from .dispatcher import (
+    DEFAULT_MAX_QUEUE_SIZE,
+    OnNotificationQueuedCallable,
+    RingEventOverflowPolicy,
+    RingEventStream,
+    RingEventSubscriber,
+    RingEventSubscriberIndex,
+    RingEventSubscriberStats,
+)
 from .listenerconfig import RingEventListenerConfig
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from ring_doorbell.const import RingEventKind
     from ring_doorbell.ring import Ring
 
+    from .dispatcher import _RingEventQueue
+
 _logger = logging.getLogger(__name__)
 
 OnNotificationCallable = Callable[[RingEvent], None]
 CredentialsUpdatedCallable = Callable[[dict[str, Any]], None]
+JsonLoadsCallable = Callable[[Union[str, bytes]], Any]
+
+
+def _default_json_loads() -> JsonLoadsCallable:
+    """Return orjson.loads if the listen extra is installed, else json.loads."""
+    try:
+        from orjson import loads  # noqa: PLC0415
+    except ImportError:
+        return json.loads
+    return loads
+
+
+# orjson is used to decode push payloads when it is installed
+DEFAULT_JSON_LOADS: JsonLoadsCallable = _default_json_loads()
+
+# The android_config of a push only varies by category so the event kind is
+# cached by the raw string to avoid decoding it for every push
+MAX_ANDROID_CONFIG_CACHE_SIZE = 64
+
+
+class _LazyJsonDumps:
+    """Serialize an object for logging only when the message is emitted."""
+
+    __slots__ = ("_obj",)
+
+    def __init__(self, obj: Any) -> None:
+        self._obj = obj
+
+    def __str__(self) -> str:
+        return json.dumps(self._obj)
 
 
 class RingEventListener:
     """Class to connect to firebase cloud messaging."""
 
     SESSION_REFRESH_INTERVAL = 60 * 60 * 12
+    SESSION_REFRESH_RETRY_INTERVAL = 60
 
     def __init__(
         self,
@@ -55,14 +103,20 @@ class RingEventListener:
         credentials_updated_callback: CredentialsUpdatedCallable | None = None,
         *,
         config: RingEventListenerConfig | None = None,
+        json_loads: JsonLoadsCallable | None = None,
     ) -> None:
         """Initialise the event listener with credentials.
 
-        Provide a callback for when credentials are updated by FCM.
+        Provide a callback for when credentials are updated by FCM and
+        optionally the function used to decode the JSON in push messages.
         """
         self._ring = ring
 
         self._callbacks: dict[int, OnNotificationCallable] = {}
+        self._subscribers = RingEventSubscriberIndex()
+        # Events waiting for room in the queue of BLOCK subscribers
+        self._blocked_events: deque[tuple[RingEvent, list[_RingEventQueue]]] = deque()
+        self._blocked_task: asyncio.Task | None = None
         self.subscribed = False
         self.started = False
         self._device_model = self._ring.auth.get_device_model()
@@ -82,6 +136,11 @@ class RingEventListener:
         self.fcm_token: str | None = None
 
         self._seen_events: set[RingEventKey] = set()
+        # Heap of (created time, key) so expired keys are purged in order
+        self._seen_expiry: list[tuple[float, RingEventKey]] = []
+
+        self._json_loads = json_loads or DEFAULT_JSON_LOADS
+        self._android_config_kinds: dict[str, str] = {}
 
     def _credentials_updated_cb(self, creds: dict[str, Any]) -> None:
         self._credentials = creds
@@ -90,8 +149,7 @@ class RingEventListener:
 
     async def add_subscription_to_ring(self, token: str) -> None:
         """Add subscription to ring."""
-        if not self._ring.session:
-            await self._ring.async_create_session()
+        await self._ring.async_ensure_session()
 
         session_patch_data = {
             "device": {
@@ -126,11 +184,31 @@ class RingEventListener:
         if not self._ring.devices_data:
             await self._ring.async_update_devices()
 
-    def add_notification_callback(self, callback: OnNotificationCallable) -> int:
-        """Add a callback to be notified on event."""
+    def add_notification_callback(
+        self,
+        callback: OnNotificationCallable | OnNotificationQueuedCallable,
+        *,
+        max_queue_size: int | None = None,
+        overflow: RingEventOverflowPolicy = RingEventOverflowPolicy.DROP_OLDEST,
+    ) -> int:
+        """Add a callback to be notified on event.
+
+        Plain callbacks are called inline as events are received.  Coroutine
+        callbacks, or any callback when max_queue_size is provided, are
+        delivered from their own bounded queue and task so that a slow
+        callback does not delay the other subscribers.
+        """
         sub_id = self._subscription_counter
 
-        self._callbacks[sub_id] = callback
+        if max_queue_size is not None or inspect.iscoroutinefunction(callback):
+            subscriber = RingEventSubscriber(
+                callback,
+                max_queue_size=max_queue_size or DEFAULT_MAX_QUEUE_SIZE,
+                overflow=overflow,
+            )
+            self._subscribers.add(sub_id, subscriber)
+        else:
+            self._callbacks[sub_id] = callback  # type: ignore[assignment]
         self._subscription_counter += 1
 
         return sub_id
@@ -141,12 +219,60 @@ class RingEventListener:
             msg = "Cannot remove the default callback for ring-doorbell with value 1"
             raise RingError(msg)
 
+        if subscriber := self._subscribers.pop(subscription_id):
+            subscriber.stop()
+            return
+
         if subscription_id not in self._callbacks:
             msg = f"ID {subscription_id} is not a valid callback id"
             raise RingError(msg)
 
         del self._callbacks[subscription_id]
 
+    def events(
+        self,
+        *,
+        device_ids: Iterable[int] | None = None,
+        kinds: Iterable[RingEventKind | str] | None = None,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow: RingEventOverflowPolicy = RingEventOverflowPolicy.DROP_OLDEST,
+    ) -> RingEventStream:
+        """Return an async iterator of events for the devices and kinds.
+
+        Omitting device_ids or kinds matches all devices or kinds.  Close the
+        stream, or use it as an async context manager, to unsubscribe.
+        """
+        sub_id = self._subscription_counter
+        self._subscription_counter += 1
+
+        def _on_close(_: RingEventStream) -> None:
+            self._subscribers.pop(sub_id)
+
+        stream = RingEventStream(
+            _on_close, max_queue_size=max_queue_size, overflow=overflow
+        )
+        kind_values = (
+            None
+            if kinds is None
+            else [kind if isinstance(kind, str) else kind.value for kind in kinds]
+        )
+        self._subscribers.add(sub_id, stream, device_ids=device_ids, kinds=kind_values)
+        return stream
+
+    def get_subscriber_stats(self, subscription_id: int) -> RingEventSubscriberStats:
+        """Return the delivery metrics for a queued callback."""
+        if (subscriber := self._subscribers.get(subscription_id)) is None:
+            msg = f"ID {subscription_id} is not a valid queued callback id"
+            raise RingError(msg)
+        return subscriber.stats
+
+    def get_subscriber_lag(self, subscription_id: int) -> float:
+        """Return the age in seconds of the oldest event queued for a callback."""
+        if (subscriber := self._subscribers.get(subscription_id)) is None:
+            msg = f"ID {subscription_id} is not a valid queued callback id"
+            raise RingError(msg)
+        return subscriber.lag
+
     async def stop(self) -> None:
         """Stop the listener."""
         self.started = False
@@ -159,7 +285,30 @@ class RingEventListener:
         if refresh_task and not refresh_task.done():
             refresh_task.cancel()
 
+        blocked_task = self._blocked_task
+        self._blocked_task = None
+        self._blocked_events.clear()
+        if blocked_task and not blocked_task.done():
+            blocked_task.cancel()
+
         self._callbacks = {}
+        subscribers = self._subscribers.values()
+        self._subscribers.clear()
+        for subscriber in subscribers:
+            subscriber.stop()
+
+    def _create_receiver(self) -> FcmPushClient:
+        fcm_config = FcmRegisterConfig(
+            FCM_PROJECT_ID, FCM_APP_ID, FCM_API_KEY, FCM_RING_SENDER_ID
+        )
+        return FcmPushClient(
+            self._on_notification,
+            fcm_config,
+            self._credentials,
+            self._credentials_updated_cb,
+            config=self._config,
+            http_client_session=self._ring.auth._session,  # noqa: SLF001
+        )
 
     async def start(
         self,
@@ -169,17 +318,7 @@ class RingEventListener:
         """Start the listener."""
         _logger.debug("Starting event listener")
         if not self._receiver:
-            fcm_config = FcmRegisterConfig(
-                FCM_PROJECT_ID, FCM_APP_ID, FCM_API_KEY, FCM_RING_SENDER_ID
-            )
-            self._receiver = FcmPushClient(
-                self._on_notification,
-                fcm_config,
-                self._credentials,
-                self._credentials_updated_cb,
-                config=self._config,
-                http_client_session=self._ring.auth._session,  # noqa: SLF001
-            )
+            self._receiver = self._create_receiver()
         self.fcm_token = await self._receiver.checkin_or_register()
         if not self.fcm_token:
             _logger.error(
@@ -201,22 +340,70 @@ class RingEventListener:
             _logger.debug("Started event listener")
         return self.started
 
+    @property
+    def last_message_time(self) -> float | None:
+        """Return the time of the last message or heartbeat from FCM."""
+        if self._receiver is None:
+            return None
+        return self._receiver.last_message_time
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the FCM connection is up."""
+        return self._receiver is not None and self._receiver.is_started()
+
+    async def restart(self, *, timeout: int = 10) -> bool:
+        """Reconnect to FCM and resubscribe keeping the registered callbacks.
+
+        Returns True if the listener is connected again.
+        """
+        if not self.started:
+            msg = "Cannot restart an event listener that is not started"
+            raise RingError(msg)
+        _logger.debug("Restarting event listener")
+        if receiver := self._receiver:
+            self._receiver = None
+            await receiver.stop()
+        self._receiver = self._create_receiver()
+        self.fcm_token = await self._receiver.checkin_or_register()
+        if not self.fcm_token:
+            _logger.error("Ring listener unable to check in to fcm on restart")
+            return False
+
+        await self.add_subscription_to_ring(self.fcm_token)
+        if not self.subscribed:
+            return False
+
+        async with asyncio_timeout(timeout):
+            await self._receiver.start()
+        return self.connected
+
     async def _periodic_session_refresh(self) -> None:
+        retry = False
         while self.started:
-            now = time.monotonic()
             if TYPE_CHECKING:
                 assert self._ring.session_refresh_time
                 assert self.fcm_token
-            since_refresh = now - self._ring.session_refresh_time
+            refresh_at = self._ring.session_refresh_time + self.SESSION_REFRESH_INTERVAL
+            if not retry and (sleep_for := refresh_at - time.monotonic()) > 0:
+                await asyncio.sleep(sleep_for)
+                continue
 
-            if since_refresh > self.SESSION_REFRESH_INTERVAL:
-                _logger.debug("Refreshing ring session")
+            _logger.debug("Refreshing ring session")
+            try:
                 await self._ring.async_create_session()
                 await self.add_subscription_to_ring(self.fcm_token)
-                break
-
-            sleep_for = 1 + time.monotonic() - self._ring.session_refresh_time
-            await asyncio.sleep(sleep_for)
+                if not self.subscribed:
+                    msg = "Ring rejected the listener subscription"
+                    raise RingError(msg)  # noqa: TRY301
+                retry = False
+            except RingError:
+                retry = True
+                _logger.exception(
+                    "Error refreshing ring session, retrying in %s seconds",
+                    self.SESSION_REFRESH_RETRY_INTERVAL,
+                )
+                await asyncio.sleep(self.SESSION_REFRESH_RETRY_INTERVAL)
 
     def _get_ding_event(self, gcm_data: dict[str, Any]) -> RingEvent:
         ding = gcm_data["ding"]
@@ -270,18 +457,17 @@ class RingEventListener:
 
         First without an image and the second with an image.
         """
-        now = time.time()
-        seen_events = {
-            key
-            for key in self._seen_events
-            if (now - key.now) < DEFAULT_LISTEN_EVENT_EXPIRES_IN
-        }
+        expired = time.time() - DEFAULT_LISTEN_EVENT_EXPIRES_IN
+        seen_events = self._seen_events
+        seen_expiry = self._seen_expiry
+        while seen_expiry and seen_expiry[0][0] <= expired:
+            seen_events.discard(heapq.heappop(seen_expiry)[1])
         event_key = ring_event.get_key()
         if event_key in seen_events:
             ring_event.is_update = True
         else:
             seen_events.add(event_key)
-        self._seen_events = seen_events
+            heapq.heappush(seen_expiry, (event_key.now, event_key))
 
     def _on_notification(
         self,
@@ -291,7 +477,7 @@ class RingEventListener:
     ) -> None:
         msg_data = notification["data"]
         if "gcmData" in msg_data:
-            gcm_data = json.loads(notification["data"]["gcmData"])
+            gcm_data = self._json_loads(msg_data["gcmData"])
             ring_event = self._get_legacy_ring_event(gcm_data)
         else:
             ring_event = self._get_ring_event(msg_data)
@@ -301,23 +487,40 @@ class RingEventListener:
             _logger.debug("Event received %s", ring_event)
             for callback in self._callbacks.values():
                 callback(ring_event)
+            self._dispatch(ring_event)
         else:
             _logger.debug("Unknown event received %s", msg_data)
 
+    def _dispatch(self, ring_event: RingEvent) -> None:
+        if blocked := self._subscribers.dispatch(ring_event):
+            self._blocked_events.append((ring_event, blocked))
+            if self._blocked_task is None:
+                self._blocked_task = asyncio.get_running_loop().create_task(
+                    self._async_put_blocked()
+                )
+
+    async def _async_put_blocked(self) -> None:
+        """Wait for BLOCK subscribers to make room for their events in order."""
+        try:
+            while self._blocked_events:
+                ring_event, subscribers = self._blocked_events.popleft()
+                for subscriber in subscribers:
+                    await subscriber.async_put(ring_event, deferred=True)
+        finally:
+            self._blocked_task = None
+
     def _get_ring_event(self, msg_data: dict) -> RingEvent | None:
         if (android_config_str := msg_data.get("android_config")) is None or (
             data_str := msg_data.get("data")
         ) is None:
             _logger.debug(
                 "Unexpected alert type in fcm message data.  Full message is:\n%s",
-                json.dumps(msg_data),
+                _LazyJsonDumps(msg_data),
             )
             return None
 
-        android_config = json.loads(android_config_str)
-        data = json.loads(data_str)
-        event_category = android_config["category"]
-        event_kind = PUSH_NOTIFICATION_KINDS.get(event_category, "Unknown")
+        event_kind = self._get_event_kind(android_config_str)
+        data = self._json_loads(data_str)
         device = data["device"]
         event = data["event"]
         event_id = int(event["ding"]["id"])
@@ -334,6 +537,15 @@ class RingEventListener:
             state=event["ding"]["subtype"],
         )
 
+    def _get_event_kind(self, android_config_str: str) -> str:
+        if (event_kind := self._android_config_kinds.get(android_config_str)) is None:
+            event_category = self._json_loads(android_config_str)["category"]
+            event_kind = PUSH_NOTIFICATION_KINDS.get(event_category, "Unknown")
+            if len(self._android_config_kinds) >= MAX_ANDROID_CONFIG_CACHE_SIZE:
+                self._android_config_kinds.clear()
+            self._android_config_kinds[android_config_str] = event_kind
+        return event_kind
+
     def _get_legacy_ring_event(self, gcm_data: dict) -> RingEvent | None:
         re: RingEvent | None = None
         if "ding" in gcm_data:
@@ -343,7 +555,7 @@ class RingEventListener:
         elif "community_alert" not in gcm_data:
             _logger.debug(
                 "Unexpected alert type in gcmData.  Full message is:\n%s",
-                json.dumps(gcm_data),
+                _LazyJsonDumps(gcm_data),
             )
             return None
         return re
@@ -0,0 +1,75 @@
+"""Module for the binary frames ring events are shared and journaled in.
+
+A frame is a 4 byte length followed by the payload, which starts with the
+8 byte sequence number of the event.  The broker and the journal both use
+these frames, the journal using its offsets as sequence numbers.
+"""
+
+from __future__ import annotations
+
+import struct
+
+from ring_doorbell.event import RingEvent
+
+FRAME_LENGTH = struct.Struct(">I")
+# sequence, id, doorbot_id, now, expires_in, is_update
+_EVENT_HEADER = struct.Struct(">Qqqdd?")
+_STR_LENGTH = struct.Struct(">H")
+_NONE_STR = 0xFFFF
+
+
+def _encode_str(value: str | None) -> bytes:
+    if value is None:
+        return _STR_LENGTH.pack(_NONE_STR)
+    encoded = value.encode()
+    return _STR_LENGTH.pack(len(encoded)) + encoded
+
+
+def encode_ring_event(sequence: int, ring_event: RingEvent) -> bytes:
+    """Encode an event as a length prefixed binary frame."""
+    payload = b"".join(
+        (
+            _EVENT_HEADER.pack(
+                sequence,
+                ring_event.id,
+                ring_event.doorbot_id,
+                ring_event.now,
+                ring_event.expires_in,
+                ring_event.is_update,
+            ),
+            _encode_str(ring_event.device_name),
+            _encode_str(ring_event.device_kind),
+            _encode_str(ring_event.kind),
+            _encode_str(ring_event.state),
+        )
+    )
+    return FRAME_LENGTH.pack(len(payload)) + payload
+
+
+def decode_ring_event(payload: bytes) -> tuple[int, RingEvent]:
+    """Decode the payload of a frame into the sequence and event."""
+    sequence, event_id, doorbot_id, now, expires_in, is_update = (
+        _EVENT_HEADER.unpack_from(payload)
+    )
+    offset = _EVENT_HEADER.size
+    strings: list[str | None] = []
+    for _ in range(4):
+        (length,) = _STR_LENGTH.unpack_from(payload, offset)
+        offset += _STR_LENGTH.size
+        if length == _NONE_STR:
+            strings.append(None)
+            continue
+        strings.append(payload[offset : offset + length].decode())
+        offset += length
+    device_name, device_kind, kind, state = strings
+    return sequence, RingEvent(
+        id=event_id,
+        doorbot_id=doorbot_id,
+        device_name=device_name,  # type: ignore[arg-type]
+        device_kind=device_kind,  # type: ignore[arg-type]
+        now=now,
+        expires_in=expires_in,
+        kind=kind,  # type: ignore[arg-type]
+        state=state,  # type: ignore[arg-type]
+        is_update=is_update,
+    )
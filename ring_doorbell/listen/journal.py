@@ -0,0 +1,251 @@
+"""Module for journaling listener events to disk.
+
+The journal is an append only sequence of segment files which are memory
+mapped for writing and replay.  Records use the same binary frames as the
+event broker with the sequence number being the journal offset, so a
+consumer that stores the offset of the last event it processed can resume
+from the next one after a restart.
+"""
+
+from __future__ import annotations
+
+import mmap
+from bisect import bisect_right
+from pathlib import Path
+from typing import TYPE_CHECKING, NoReturn
+
+from ring_doorbell.exceptions import RingError
+
+from .frames import FRAME_LENGTH, decode_ring_event, encode_ring_event
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from typing_extensions import Self
+
+    from ring_doorbell.event import RingEvent
+
+DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024
+MIN_SEGMENT_SIZE = 64 * 1024
+SEGMENT_SUFFIX = ".journal"
+
+
+class _RingEventJournalSegment:
+    """A preallocated segment file named after the offset of its first record.
+
+    Unwritten space is zero filled so a zero frame length marks the end.
+    """
+
+    def __init__(self, path: Path, base_offset: int, size: int) -> None:
+        self.path = path
+        self.base_offset = base_offset
+        self._file = path.open("r+b" if path.exists() else "w+b")
+        if self._file.seek(0, 2) < size:
+            self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self.size = len(self._mmap)
+        self.position = 0
+        self.last_offset = base_offset - 1
+
+    def recover(self) -> None:
+        """Find the end of the written records."""
+        for offset, _, end in self.frames():
+            self.position = end
+            self.last_offset = offset
+
+    def frames(self, start: int = 0) -> Iterator[tuple[int, bytes, int]]:
+        """Yield the offset, payload and end position of each record."""
+        buffer = self._mmap
+        position = start
+        size = self.size
+        header_size = FRAME_LENGTH.size
+        while position + header_size <= size:
+            (length,) = FRAME_LENGTH.unpack_from(buffer, position)
+            end = position + header_size + length
+            if length == 0 or end > size:
+                return
+            payload = buffer[position + header_size : end]
+            yield int.from_bytes(payload[:8], "big"), payload, end
+            position = end
+
+    def write(self, frame: bytes) -> bool:
+        """Write a frame, return False if the segment is full."""
+        end = self.position + len(frame)
+        # Keep room for a zero length to mark the end of the records
+        if end + FRAME_LENGTH.size > self.size:
+            return False
+        header_size = FRAME_LENGTH.size
+        # Write the length last so a torn write is never read as a record
+        self._mmap[self.position + header_size : end] = frame[header_size:]
+        self._mmap[self.position : self.position + header_size] = frame[:header_size]
+        self.position = end
+        return True
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+
+class RingEventJournal:
+    """Append only, memory mapped journal of ring events.
+
+    Register append as a notification callback to journal every event
+    received by a listener:
+
+        journal = RingEventJournal(path)
+        listener.add_notification_callback(journal.append)
+
+    Offsets start at 1 and increase by one for every appended event.
+    When max_segments is set the oldest segments are deleted on rotation.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_segments: int | None = None,
+    ) -> None:
+        """Open or create the journal in a directory."""
+        if segment_size < MIN_SEGMENT_SIZE:
+            msg = f"Journal segment size must be at least {MIN_SEGMENT_SIZE} bytes"
+            raise RingError(msg)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._segment_size = segment_size
+        self._max_segments = max_segments
+        # Incremented on every rotation so replays notice it
+        self._generation = 0
+        self._base_offsets = sorted(
+            int(path.stem) for path in self.directory.glob(f"*{SEGMENT_SUFFIX}")
+        )
+        base_offset = self._base_offsets[-1] if self._base_offsets else 1
+        self._segment = self._open_segment(base_offset)
+        self._segment.recover()
+        if not self._base_offsets:
+            self._base_offsets.append(base_offset)
+
+    @property
+    def first_offset(self) -> int:
+        """Return the offset of the oldest event in the journal."""
+        return self._base_offsets[0]
+
+    @property
+    def last_offset(self) -> int:
+        """Return the offset of the last appended event, 0 if none."""
+        return self._segment.last_offset
+
+    def _segment_path(self, base_offset: int) -> Path:
+        return self.directory / f"{base_offset:020d}{SEGMENT_SUFFIX}"
+
+    def _open_segment(self, base_offset: int) -> _RingEventJournalSegment:
+        return _RingEventJournalSegment(
+            self._segment_path(base_offset), base_offset, self._segment_size
+        )
+
+    def append(self, ring_event: RingEvent) -> int:
+        """Append an event and return its offset."""
+        offset = self._segment.last_offset + 1
+        frame = encode_ring_event(offset, ring_event)
+        if not self._segment.write(frame):
+            self._rotate(offset)
+            if not self._segment.write(frame):
+                msg = "Event is too large for the journal segment size"
+                raise RingError(msg)
+        self._segment.last_offset = offset
+        return offset
+
+    def _rotate(self, base_offset: int) -> None:
+        self._generation += 1
+        self._segment.close()
+        self._segment = self._open_segment(base_offset)
+        self._base_offsets.append(base_offset)
+        if self._max_segments:
+            while len(self._base_offsets) > self._max_segments:
+                self._segment_path(self._base_offsets.pop(0)).unlink(missing_ok=True)
+
+    def replay(self, since: int | None = None) -> Iterator[tuple[int, RingEvent]]:
+        """Yield the offset and event of every event after since.
+
+        With since=None every event still in the journal is replayed.
+        Events appended during the replay are included.  If rotation has
+        deleted, or deletes, events after since before they are replayed
+        RingError is raised.
+        """
+        if since is None:
+            since = self.first_offset - 1
+        elif since + 1 < self.first_offset:
+            self._raise_rotated(since)
+        position = since
+        index = max(0, bisect_right(self._base_offsets, since + 1) - 1)
+        base_offset: int | None = self._base_offsets[index]
+        while base_offset is not None:
+            generation = self._generation
+            live = base_offset == self._segment.base_offset
+            segment = (
+                self._segment
+                if live
+                else self._open_replay_segment(base_offset, position)
+            )
+            rotated = False
+            try:
+                for offset, payload, _ in segment.frames():
+                    if offset <= position:
+                        continue
+                    yield decode_ring_event(payload)
+                    position = offset
+                    # Rotation closes the live segment so it is reopened
+                    if live and self._generation != generation:
+                        rotated = True
+                        break
+            finally:
+                if not live:
+                    segment.close()
+            if rotated:
+                continue
+            if live and self._generation == generation:
+                return
+            base_offset = self._next_replay_base_offset(base_offset, position)
+
+    def _open_replay_segment(
+        self, base_offset: int, position: int
+    ) -> _RingEventJournalSegment:
+        if not self._segment_path(base_offset).exists():
+            self._raise_rotated(position)
+        return self._open_segment(base_offset)
+
+    def _next_replay_base_offset(self, base_offset: int, position: int) -> int | None:
+        next_index = bisect_right(self._base_offsets, base_offset)
+        if next_index == len(self._base_offsets):
+            return None
+        next_base_offset = self._base_offsets[next_index]
+        if next_base_offset > position + 1:
+            self._raise_rotated(position)
+        return next_base_offset
+
+    def _raise_rotated(self, position: int) -> NoReturn:
+        msg = (
+            f"Journal rotated past offset {position + 1}, "
+            "events were deleted before they were replayed"
+        )
+        raise RingError(msg)
+
+    def flush(self) -> None:
+        """Flush appended events to disk."""
+        self._segment.flush()
+
+    def close(self) -> None:
+        """Flush and close the journal."""
+        self._segment.flush()
+        self._segment.close()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the journal on exit."""
+        self.close()
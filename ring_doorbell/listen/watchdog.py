@@ -0,0 +1,152 @@
+"""Module for supervising the event listener connection."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from ring_doorbell.exceptions import RingError
+
+if TYPE_CHECKING:
+    from .eventlistener import RingEventListener
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 15
+DEFAULT_INITIAL_BACKOFF = 1
+DEFAULT_MAX_BACKOFF = 300
+
+
+@dataclass
+class RingEventListenerWatchdogStats:
+    """Class for the connection metrics of a supervised listener."""
+
+    checks: int = 0
+    outages: int = 0
+    reconnect_attempts: int = 0
+    failed_reconnects: int = 0
+    last_time_to_recover: float = 0.0
+    max_time_to_recover: float = 0.0
+    total_downtime: float = 0.0
+
+
+class RingEventListenerWatchdog:
+    """Class to reconnect a listener when its FCM connection dies.
+
+    The connection is considered dead when the FCM client has stopped or
+    nothing, not even a heartbeat, has been received for max_message_age
+    seconds.  Reconnect attempts back off exponentially up to max_backoff
+    and on recovery the active dings are fetched from the api to catch up
+    on any missed while disconnected.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        listener: RingEventListener,
+        *,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        max_message_age: float | None = None,
+        initial_backoff: float = DEFAULT_INITIAL_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        update_dings_on_recover: bool = True,
+    ) -> None:
+        """Initialise the watchdog for a listener."""
+        self._listener = listener
+        self.check_interval = check_interval
+        if max_message_age is None:
+            # Allow two missed server heartbeats before reconnecting
+            heartbeat = listener._config.server_heartbeat_interval or 60  # noqa: SLF001
+            max_message_age = heartbeat * 2 + check_interval
+        self.max_message_age = max_message_age
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.update_dings_on_recover = update_dings_on_recover
+        self.stats = RingEventListenerWatchdogStats()
+        self._connected_at = time.time()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def message_age(self) -> float:
+        """Return the seconds since anything was received from FCM."""
+        last_message_time = self._listener.last_message_time or 0
+        return time.time() - max(last_message_time, self._connected_at)
+
+    @property
+    def healthy(self) -> bool:
+        """Return True if the listener connection looks alive."""
+        return self._listener.connected and self.message_age <= self.max_message_age
+
+    def start(self) -> None:
+        """Start supervising the listener in a background task."""
+        if self._task is None:
+            self._connected_at = time.time()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop supervising the listener."""
+        if task := self._task:
+            self._task = None
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check()
+            except Exception:
+                _logger.exception("Unexpected error supervising the event listener")
+
+    async def check(self) -> bool:
+        """Check the listener and reconnect if needed.
+
+        Return True if the connection is healthy or has been recovered and
+        False if the listener was stopped before it could be reconnected.
+        """
+        self.stats.checks += 1
+        if not self._listener.started or self.healthy:
+            return True
+
+        _logger.warning(
+            "Event listener connection lost, last message %.0f seconds ago",
+            self.message_age,
+        )
+        self.stats.outages += 1
+        outage_start = time.monotonic()
+        backoff = self.initial_backoff
+        while not await self._reconnect():
+            self.stats.failed_reconnects += 1
+            if not self._listener.started:
+                return False
+            _logger.debug("Event listener reconnect failed, retrying in %s", backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+        self._connected_at = time.time()
+        time_to_recover = time.monotonic() - outage_start
+        self.stats.last_time_to_recover = time_to_recover
+        self.stats.max_time_to_recover = max(
+            self.stats.max_time_to_recover, time_to_recover
+        )
+        self.stats.total_downtime += time_to_recover
+        _logger.info("Event listener reconnected in %.1f seconds", time_to_recover)
+
+        if self.update_dings_on_recover:
+            try:
+                await self._listener._ring.async_update_dings()  # noqa: SLF001
+            except RingError:
+                _logger.exception("Error updating dings after reconnecting")
+        return True
+
+    async def _reconnect(self) -> bool:
+        self.stats.reconnect_attempts += 1
+        try:
+            return await self._listener.restart()
+        except (RingError, TimeoutError, asyncio.TimeoutError):
+            _logger.exception("Error reconnecting event listener")
+            return False
@@ -0,0 +1,112 @@
+"""Module for optimistic updates of cached device attributes."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Hashable, Mapping
+
+    AttrPath = tuple[str, ...]
+
+_logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _get(attrs: Mapping[str, Any], path: AttrPath) -> Any:
+    value: Any = attrs
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _set(attrs: dict[str, Any], path: AttrPath, value: Any) -> None:
+    *parents, last = path
+    for key in parents:
+        attrs = attrs.setdefault(key, {})
+    if value is _MISSING:
+        attrs.pop(last, None)
+    else:
+        attrs[last] = value
+
+
+def apply_changes(attrs: dict[str, Any], changes: Mapping[AttrPath, Any]) -> None:
+    """Write changes keyed by attribute path to attrs."""
+    for path, value in changes.items():
+        _set(attrs, path, value)
+
+
+class RingPendingUpdates:
+    """Changes applied to cached attributes before the server confirms them.
+
+    A change is written to the cached attributes when its request is sent
+    and rolled back if the request fails.  It stays pending until the
+    attributes are next fetched from the server, which then replace it.
+    Changes are keyed by the family and id of the device they apply to.
+    """
+
+    def __init__(self) -> None:
+        """Initialise with no pending changes."""
+        self._pending: dict[Hashable, dict[AttrPath, Any]] = {}
+
+    def get(self, key: Hashable) -> dict[AttrPath, Any]:
+        """Return the pending changes of a key by attribute path."""
+        return dict(self._pending.get(key, {}))
+
+    async def async_update(
+        self,
+        key: Hashable,
+        attrs: dict[str, Any],
+        changes: Mapping[AttrPath, Any],
+        request: Awaitable[Any],
+    ) -> None:
+        """Apply changes to attrs while awaiting the request that makes them.
+
+        If the request raises the attributes that still have the changed
+        values are rolled back and the error is raised.
+        """
+        previous = {path: _get(attrs, path) for path in changes}
+        apply_changes(attrs, changes)
+        if not changes:
+            await request
+            return
+        pending = self._pending.setdefault(key, {})
+        pending.update(changes)
+        try:
+            await request
+        except BaseException:
+            for path, value in changes.items():
+                if _get(attrs, path) == value:
+                    _set(attrs, path, previous[path])
+                if path in pending and pending[path] == value:
+                    del pending[path]
+            if not pending:
+                self._pending.pop(key, None)
+            raise
+
+    def confirm(self, key: Hashable, attrs: Mapping[str, Any]) -> None:
+        """Drop the pending changes of a key after attrs were fetched."""
+        if (pending := self._pending.pop(key, None)) is None:
+            return
+        for path, value in pending.items():
+            if (server_value := _get(attrs, path)) != value:
+                _logger.debug(
+                    "Server value %s of %s %s replaces pending value %s",
+                    server_value,
+                    key,
+                    ".".join(path),
+                    value,
+                )
+
+    def confirm_devices(
+        self, devices_data: Mapping[str, Mapping[int, Mapping[str, Any]]]
+    ) -> None:
+        """Drop the pending changes of devices after they were all fetched."""
+        for key in list(self._pending):
+            if isinstance(key, tuple) and key and key[0] in devices_data:
+                family, device_api_id = key
+                self.confirm(key, devices_data[family].get(device_api_id, {}))
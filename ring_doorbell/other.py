@@ -27,6 +27,7 @@ from ring_doorbell.const import (
     RingCapability,
 )
 from ring_doorbell.exceptions import RingError
+from ring_doorbell.freshness import health_source
 from ring_doorbell.generic import RingGeneric
 
 _LOGGER = logging.getLogger(__name__)
@@ -54,6 +55,7 @@ class RingOther(RingGeneric):
             HEALTH_DOORBELL_ENDPOINT.format(self.device_api_id)
         )
         self._health_attrs = resp.json().get("device_health", {})
+        self._ring.freshness.updated(health_source(self))
 
     @property
     def model(self) -> str:
@@ -136,7 +138,12 @@ class RingOther(RingGeneric):
             "doorbot[settings][doorbell_volume]": str(value),
         }
         url = DOORBELLS_ENDPOINT.format(self.device_api_id)
-        await self._ring.async_query(url, extra_params=params, method="PUT")
+        await self._async_query_optimistic(
+            {("settings", "doorbell_volume"): value},
+            url,
+            extra_params=params,
+            method="PUT",
+        )
 
     @property
     def keep_alive_auto(self) -> float | None:
@@ -150,7 +157,9 @@ class RingOther(RingGeneric):
         url = SETTINGS_ENDPOINT.format(self.device_api_id)
         payload = {"keep_alive_settings": {"keep_alive_auto": value}}
 
-        await self._ring.async_query(url, method="PATCH", json=payload)
+        await self._async_query_optimistic(
+            {("settings", "keep_alive_auto"): value}, url, method="PATCH", json=payload
+        )
 
     @property
     def mic_volume(self) -> int | None:
@@ -167,7 +176,9 @@ class RingOther(RingGeneric):
         url = SETTINGS_ENDPOINT.format(self.device_api_id)
         payload = {"volume_settings": {"mic_volume": value}}
 
-        await self._ring.async_query(url, method="PATCH", json=payload)
+        await self._async_query_optimistic(
+            {("settings", "mic_volume"): value}, url, method="PATCH", json=payload
+        )
 
     @property
     def voice_volume(self) -> int | None:
@@ -184,7 +195,9 @@ class RingOther(RingGeneric):
         url = SETTINGS_ENDPOINT.format(self.device_api_id)
         payload = {"volume_settings": {"voice_volume": value}}
 
-        await self._ring.async_query(url, method="PATCH", json=payload)
+        await self._async_query_optimistic(
+            {("settings", "voice_volume"): value}, url, method="PATCH", json=payload
+        )
 
     async def async_get_clip_length_max(self) -> int | None:
         """Get the Maximum clip length."""
@@ -201,7 +214,8 @@ class RingOther(RingGeneric):
         """
         url = SETTINGS_ENDPOINT.format(self.device_api_id)
         payload = {"video_settings": {"clip_length_max": value}}
-        await self._ring.async_query(url, method="PATCH", json=payload)
+        # Not part of the device data so there is nothing to update
+        await self._async_query_optimistic({}, url, method="PATCH", json=payload)
 
     @property
     def connection_status(self) -> str | None:
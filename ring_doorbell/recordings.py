@@ -0,0 +1,429 @@
+"""Module for fetching the recordings of listener events."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import datetime as dt
+import inspect
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Protocol
+from urllib.parse import parse_qs, urlsplit
+
+from ring_doorbell.const import KIND_DING, KIND_MOTION, RingCapability
+from ring_doorbell.doorbot import RingDoorBell
+from ring_doorbell.exceptions import RingError
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Iterable
+
+    from typing_extensions import Self
+
+    from ring_doorbell.event import RingEvent
+    from ring_doorbell.ring import Ring
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 2
+# Used when the expiry of a share url cannot be read from its query string
+DEFAULT_RECORDING_URL_TTL = 60 * 60
+# Urls are treated as expired this many seconds early so they are still
+# valid when the client uses them
+RECORDING_URL_EXPIRY_MARGIN = 60
+DEFAULT_RECORDING_URL_CACHE_SIZE = 1000
+
+
+@dataclass
+class RingRecordingPollPolicy:
+    """Class for how often to poll history for a recording to be ready."""
+
+    initial_delay: float
+    max_delay: float
+    factor: float = 1.5
+    timeout: float = 600
+    history_limit: int = 10
+
+
+# Wired devices upload while recording so clips are ready soon after the
+# event ends.  Battery devices upload afterwards and take noticeably longer.
+WIRED_POLL_POLICY = RingRecordingPollPolicy(initial_delay=10, max_delay=30)
+BATTERY_POLL_POLICY = RingRecordingPollPolicy(initial_delay=20, max_delay=60)
+
+
+@dataclass
+class RingRecording:
+    """Class for a recording downloaded for an event."""
+
+    recording_id: int
+    device_id: int
+    event: RingEvent
+    history: dict[str, Any]
+    size: int = 0
+    path: Path | None = None
+
+
+@dataclass
+class RingRecordingPipelineStats:
+    """Class for the metrics of a recording pipeline."""
+
+    events: int = 0
+    coalesced: int = 0
+    history_requests: int = 0
+    downloads: int = 0
+    errors: int = 0
+    expired: int = 0
+    last_latency: float = 0.0
+    max_latency: float = 0.0
+
+
+class RingRecordingSink(Protocol):
+    """Protocol for the destination of downloaded recordings."""
+
+    async def write(
+        self, recording: RingRecording, chunks: AsyncIterator[bytes]
+    ) -> None:
+        """Consume the chunks of a recording."""
+
+
+class RingRecordingFileSink:
+    """Sink that writes recordings to files in a directory.
+
+    Recordings are written to a temporary file and renamed when complete so
+    a partial download is never seen under the final name.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        filename_template: str = "{device_id}_{recording_id}.mp4",
+    ) -> None:
+        """Initialise the sink for a directory."""
+        self.directory = Path(directory)
+        self.filename_template = filename_template
+
+    async def write(
+        self, recording: RingRecording, chunks: AsyncIterator[bytes]
+    ) -> None:
+        """Write the recording to its file."""
+        path = self.directory / self.filename_template.format(
+            device_id=recording.device_id,
+            recording_id=recording.recording_id,
+            kind=recording.event.kind,
+        )
+        partial = path.with_name(path.name + ".part")
+        import aiofiles  # noqa: PLC0415
+
+        async with aiofiles.open(partial, "wb") as file:
+            async for chunk in chunks:
+                await file.write(chunk)
+                recording.size += len(chunk)
+        partial.replace(path)
+        recording.path = path
+
+
+class RingRecordingCallbackSink:
+    """Sink that calls a callback with each complete recording."""
+
+    def __init__(
+        self, callback: Callable[[RingRecording, bytes], Awaitable[None] | None]
+    ) -> None:
+        """Initialise the sink with the callback."""
+        self._callback = callback
+
+    async def write(
+        self, recording: RingRecording, chunks: AsyncIterator[bytes]
+    ) -> None:
+        """Download the recording and pass it to the callback."""
+        content = b"".join([chunk async for chunk in chunks])
+        recording.size = len(content)
+        res = self._callback(recording, content)
+        if inspect.isawaitable(res):
+            await res
+
+
+class RingRecordingStream:
+    """Sink that is an async iterator of complete recordings and content."""
+
+    def __init__(self) -> None:
+        """Initialise the stream."""
+        self._queue: deque[tuple[RingRecording, bytes]] = deque()
+        self._wakeup = asyncio.Event()
+        self.closed = False
+
+    async def write(
+        self, recording: RingRecording, chunks: AsyncIterator[bytes]
+    ) -> None:
+        """Download the recording and queue it for iteration."""
+        content = b"".join([chunk async for chunk in chunks])
+        recording.size = len(content)
+        self._queue.append((recording, content))
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """End iteration once queued recordings are consumed."""
+        self.closed = True
+        self._wakeup.set()
+
+    def __aiter__(self) -> Self:
+        """Return the iterator."""
+        return self
+
+    async def __anext__(self) -> tuple[RingRecording, bytes]:
+        """Return the next recording, waiting until one is downloaded."""
+        while not self._queue:
+            if self.closed:
+                raise StopAsyncIteration
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._queue.popleft()
+
+
+@dataclass
+class _DevicePoll:
+    device: RingDoorBell
+    policy: RingRecordingPollPolicy
+    delay: float
+    pending: dict[int, RingEvent] = field(default_factory=dict)
+    task: asyncio.Task | None = None
+
+
+class RingRecordingPipeline:
+    """Class to download the recording of each event as soon as it is ready.
+
+    Register on_event as a listener callback.  Each device with pending
+    events has a single task polling its history, so events on the same
+    device share history requests, with a delay that backs off according
+    to the device's poll policy.  Ready recordings are streamed to the sink.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        ring: Ring,
+        sink: RingRecordingSink,
+        *,
+        kinds: Iterable[str] = (KIND_DING, KIND_MOTION),
+        wired_policy: RingRecordingPollPolicy = WIRED_POLL_POLICY,
+        battery_policy: RingRecordingPollPolicy = BATTERY_POLL_POLICY,
+        max_concurrent_downloads: int = DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+    ) -> None:
+        """Initialise the pipeline."""
+        self._ring = ring
+        self._sink = sink
+        self._kinds = frozenset(kinds)
+        self._wired_policy = wired_policy
+        self._battery_policy = battery_policy
+        self._download_semaphore = asyncio.Semaphore(max_concurrent_downloads)
+        self._polls: dict[int, _DevicePoll] = {}
+        self._downloads: set[asyncio.Task] = set()
+        self.stats = RingRecordingPipelineStats()
+
+    def on_event(self, ring_event: RingEvent) -> None:
+        """Start fetching the recording for an event."""
+        # Updates to an event have the same recording
+        if ring_event.is_update or ring_event.kind not in self._kinds:
+            return
+
+        device_id = ring_event.doorbot_id
+        if (poll := self._polls.get(device_id)) is None:
+            device = self._ring.get_device_by_api_id(device_id)
+            if not isinstance(device, RingDoorBell):
+                _logger.debug("No recordings for device id: %s", device_id)
+                return
+            policy = (
+                self._battery_policy
+                if device.has_capability(RingCapability.BATTERY)
+                else self._wired_policy
+            )
+            poll = _DevicePoll(device, policy, policy.initial_delay)
+            self._polls[device_id] = poll
+        else:
+            self.stats.coalesced += 1
+            # Restart the backoff for the new recording
+            poll.delay = poll.policy.initial_delay
+
+        self.stats.events += 1
+        poll.pending[ring_event.id] = ring_event
+        if poll.task is None:
+            poll.task = asyncio.get_running_loop().create_task(
+                self._poll_device(device_id, poll)
+            )
+
+    async def _poll_device(self, device_id: int, poll: _DevicePoll) -> None:
+        try:
+            while poll.pending:
+                await asyncio.sleep(poll.delay)
+                poll.delay = min(poll.delay * poll.policy.factor, poll.policy.max_delay)
+                try:
+                    await self._check_history(poll)
+                except RingError:
+                    self.stats.errors += 1
+                    _logger.exception("Error polling history of device %s", device_id)
+                self._expire(poll)
+        finally:
+            self._polls.pop(device_id, None)
+
+    async def _check_history(self, poll: _DevicePoll) -> None:
+        self.stats.history_requests += 1
+        history = await poll.device.async_history(
+            limit=poll.policy.history_limit, convert_timezone=False
+        )
+        for entry in history:
+            if (ring_event := poll.pending.get(entry["id"])) is None:
+                continue
+            if entry.get("recording", {}).get("status") == "ready":
+                del poll.pending[entry["id"]]
+                recording = RingRecording(
+                    entry["id"], poll.device.device_api_id, ring_event, entry
+                )
+                task = asyncio.get_running_loop().create_task(
+                    self._download(poll.device, recording)
+                )
+                self._downloads.add(task)
+                task.add_done_callback(self._downloads.discard)
+
+    def _expire(self, poll: _DevicePoll) -> None:
+        now = time.time()
+        for ding_id, ring_event in list(poll.pending.items()):
+            if now - ring_event.now > poll.policy.timeout:
+                del poll.pending[ding_id]
+                self.stats.expired += 1
+                _logger.debug("Gave up waiting for recording %s", ding_id)
+
+    async def _download(self, device: RingDoorBell, recording: RingRecording) -> None:
+        async with self._download_semaphore:
+            try:
+                await self._sink.write(
+                    recording, device.async_recording_stream(recording.recording_id)
+                )
+            except Exception:
+                # Sinks are user code so any error only fails this recording
+                self.stats.errors += 1
+                _logger.exception(
+                    "Error downloading recording %s", recording.recording_id
+                )
+                return
+        self.stats.downloads += 1
+        latency = time.time() - recording.event.now
+        self.stats.last_latency = latency
+        self.stats.max_latency = max(self.stats.max_latency, latency)
+
+    async def stop(self) -> None:
+        """Stop polling and cancel downloads in progress."""
+        tasks = [poll.task for poll in self._polls.values() if poll.task]
+        tasks.extend(self._downloads)
+        self._polls = {}
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+def get_url_expiry(url: str) -> float | None:
+    """Return the expiry timestamp of a signed url or None if not signed.
+
+    Supports the Expires parameter of CloudFront signed urls and the
+    X-Amz-Date and X-Amz-Expires parameters of S3 presigned urls.
+    """
+    query = parse_qs(urlsplit(url).query)
+    try:
+        if expires := query.get("Expires"):
+            return float(expires[0])
+        if (amz_date := query.get("X-Amz-Date")) and (
+            amz_expires := query.get("X-Amz-Expires")
+        ):
+            signed = dt.datetime.strptime(amz_date[0], "%Y%m%dT%H%M%SZ").replace(
+                tzinfo=dt.timezone.utc
+            )
+            return signed.timestamp() + float(amz_expires[0])
+    except ValueError:
+        _logger.debug("Unable to parse expiry of recording url %s", url)
+    return None
+
+
+class RingRecordingUrlCache:
+    """Cache of recording share urls keyed by recording id.
+
+    Entries expire when the signed url does, or after ttl seconds if the
+    expiry is not in the url.  Concurrent lookups of the same recording
+    share a single request.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_RECORDING_URL_TTL,
+        max_size: int = DEFAULT_RECORDING_URL_CACHE_SIZE,
+    ) -> None:
+        """Initialise the cache."""
+        self.ttl = ttl
+        self.max_size = max_size
+        self._urls: dict[int, tuple[str, float]] = {}
+        self._pending: dict[int, asyncio.Task[str | None]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached urls."""
+        return len(self._urls)
+
+    def get(self, recording_id: int) -> str | None:
+        """Return the cached url if it has not expired."""
+        if (item := self._urls.get(recording_id)) is None:
+            return None
+        url, expires_at = item
+        if time.time() >= expires_at - RECORDING_URL_EXPIRY_MARGIN:
+            del self._urls[recording_id]
+            return None
+        return url
+
+    def set(self, recording_id: int, url: str) -> None:
+        """Cache a url for a recording."""
+        expires_at = get_url_expiry(url) or time.time() + self.ttl
+        self._urls.pop(recording_id, None)
+        while len(self._urls) >= self.max_size:
+            del self._urls[next(iter(self._urls))]
+        self._urls[recording_id] = (url, expires_at)
+
+    def invalidate(self, recording_id: int | None = None) -> None:
+        """Remove a recording from the cache, or all if not provided."""
+        if recording_id is None:
+            self._urls = {}
+        else:
+            self._urls.pop(recording_id, None)
+
+    async def async_get(
+        self,
+        recording_id: int,
+        fetch: Callable[[], Awaitable[str | None]],
+    ) -> str | None:
+        """Return the url from the cache or fetch it once for all callers.
+
+        The fetch runs in its own task so cancelling one caller does not
+        cancel it for the others.
+        """
+        if url := self.get(recording_id):
+            return url
+        if (task := self._pending.get(recording_id)) is None:
+            task = asyncio.get_running_loop().create_task(
+                self._async_fetch(recording_id, fetch)
+            )
+            # Retrieve the exception in case every caller was cancelled
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._pending[recording_id] = task
+        return await asyncio.shield(task)
+
+    async def _async_fetch(
+        self,
+        recording_id: int,
+        fetch: Callable[[], Awaitable[str | None]],
+    ) -> str | None:
+        try:
+            url = await fetch()
+        finally:
+            del self._pending[recording_id]
+        if url:
+            self.set(recording_id, url)
+        return url
@@ -3,22 +3,45 @@
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import json
 import logging
+import os
 import time
-from itertools import chain
+import zlib
+from collections import deque
+from functools import partial
+from http import HTTPStatus
+from itertools import chain, count
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar
 
+from aiohttp import ClientResponseError
+
 from ring_doorbell import RingEvent
 from ring_doorbell.chime import RingChime
 from ring_doorbell.doorbot import RingDoorBell
 from ring_doorbell.exceptions import RingError
+from ring_doorbell.freshness import (
+    DEVICES_SOURCE,
+    DINGS_SOURCE,
+    GROUPS_SOURCE,
+    RingDataFreshness,
+)
 from ring_doorbell.group import RingLightGroup
+from ring_doorbell.optimistic import RingPendingUpdates
 from ring_doorbell.other import RingOther
+from ring_doorbell.recordings import RingRecordingUrlCache
+from ring_doorbell.scheduler import RingPollScheduler
 from ring_doorbell.stickup_cam import RingStickUpCam
+from ring_doorbell.util import utc_datetime
 
 from .const import (
     API_URI,
     API_VERSION,
+    DEFAULT_STREAM_CHUNK_SIZE,
+    DEFAULT_TIMELINE_PAGE_SIZE,
     DEVICES_ENDPOINT,
     DINGS_ENDPOINT,
     GROUPS_ENDPOINT,
@@ -27,39 +50,178 @@ from .const import (
 )
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator, Mapping, Sequence
+    from collections.abc import (
+        AsyncGenerator,
+        AsyncIterator,
+        Iterable,
+        Iterator,
+        Mapping,
+        Sequence,
+    )
+    from datetime import datetime
 
     from ring_doorbell.auth import Auth
     from ring_doorbell.generic import RingGeneric
+    from ring_doorbell.session import RingSessionStore
 
 _logger = logging.getLogger(__name__)
 
+AlertKey = tuple[int, int, str]
+
+STATE_VERSION = 1
+_STATE_MAGIC = b"RING"
+
+
+class _RingAlertIndex:
+    """Index of alerts keyed by (doorbot_id, id, kind) with an expiry heap.
+
+    Only the newest event is kept for each key.  Expired entries are purged
+    lazily from the top of the heap so the cost of a purge is proportional
+    to the number of expired events rather than the number of stored ones.
+    """
+
+    def __init__(self) -> None:
+        self._alerts: dict[AlertKey, RingEvent] = {}
+        self._expiry: list[tuple[float, int, AlertKey]] = []
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def values(self) -> Iterable[RingEvent]:
+        """Return the indexed events."""
+        return self._alerts.values()
+
+    def add(self, ring_event: RingEvent) -> bool:
+        """Add an event to the index, return True if the index changed."""
+        key = (ring_event.doorbot_id, ring_event.id, ring_event.kind)
+        current = self._alerts.get(key)
+        if current is not None and ring_event.now <= current.now:
+            return False
+        self._alerts[key] = ring_event
+        heapq.heappush(
+            self._expiry,
+            (ring_event.now + ring_event.expires_in, next(self._counter), key),
+        )
+        return True
+
+    def purge(self, now: float) -> bool:
+        """Remove expired events, return True if any were removed."""
+        changed = False
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            _, _, key = heapq.heappop(expiry)
+            # Heap entries for replaced events are stale and skipped
+            if (current := self._alerts.get(key)) and (
+                current.now + current.expires_in <= now
+            ):
+                del self._alerts[key]
+                changed = True
+        return changed
+
+    def clear(self) -> None:
+        """Remove all events."""
+        self._alerts = {}
+        self._expiry = []
+
+
+def _unauthorized(ex: RingError) -> bool:
+    """Return True if the error is for a request the api rejected with a 401."""
+    cause = ex.__cause__
+    return (
+        isinstance(cause, ClientResponseError)
+        and cause.status == HTTPStatus.UNAUTHORIZED
+    )
+
+
+def _created_at(entry: dict[str, Any]) -> datetime:
+    """Return the created_at of a history entry in UTC."""
+    return utc_datetime(entry["created_at"])
+
+
+class _RingHistoryCursor:
+    """Pages through the history of a device newest first.
+
+    Entries older than since are dropped and end the history.
+    """
+
+    def __init__(
+        self, device: RingDoorBell, page_size: int, since: datetime | None
+    ) -> None:
+        self.device = device
+        self._page_size = page_size
+        self._since = None if since is None else utc_datetime(since)
+        self._entries: deque[dict[str, Any]] = deque()
+        self._older_than: int | None = None
+        self.exhausted = False
+
+    def peek(self) -> dict[str, Any] | None:
+        """Return the next entry without consuming it."""
+        return self._entries[0] if self._entries else None
+
+    def pop(self) -> dict[str, Any]:
+        """Consume the next entry."""
+        return self._entries.popleft()
+
+    @property
+    def needs_page(self) -> bool:
+        """Return True if the next page has to be fetched to continue."""
+        return not self._entries and not self.exhausted
+
+    async def async_fetch_page(self) -> None:
+        """Fetch the next page of history."""
+        page = await self.device.async_history(
+            limit=self._page_size, older_than=self._older_than
+        )
+        if len(page) < self._page_size:
+            self.exhausted = True
+        if page:
+            self._older_than = page[-1]["id"]
+        for entry in page:
+            if self._since is not None and _created_at(entry) < self._since:
+                self.exhausted = True
+                break
+            self._entries.append(entry)
+
 
 class Ring:
     """A Python Abstraction object to Ring Door Bell."""
 
-    def __init__(self, auth: Auth) -> None:
-        """Initialize the Ring object."""
+    def __init__(
+        self, auth: Auth, *, session_store: RingSessionStore | None = None
+    ) -> None:
+        """Initialize the Ring object.
+
+        :param session_store: store to share sessions with other instances
+        """
         self.auth: Auth = auth
-        self.session = None
+        self.session_store = session_store
+        self.session: dict[str, Any] | None = None
         self.subscription = None
         self.devices_data: dict[str, dict[int, dict[str, Any]]] = {}
         self._devices: RingDevices | None = None
         self.chime_health_data = None
         self.doorbell_health_data = None
-        self.dings_data: dict[Any, Any] = {}
-        self.push_dings_data: list[RingEvent] = []
+        self._dings_data: dict[Any, Any] = {}
+        self._push_alerts = _RingAlertIndex()
+        self._dings_alerts = _RingAlertIndex()
+        self._active_alerts: Sequence[RingEvent] | None = None
         self.groups_data: dict[str, dict[str, Any]] = {}
         self.init_loop = None
         self.session_refresh_time: float | None = None
+        self.recording_url_cache = RingRecordingUrlCache()
+        self.devices_update_time: float | None = None
+        self.freshness = RingDataFreshness(self)
+        self.scheduler = RingPollScheduler(self)
+        self.pending_updates = RingPendingUpdates()
+        self._background_tasks: set[asyncio.Task] = set()
 
     async def async_update_data(self) -> None:
         """Update all data."""
         await self._async_update_data()
 
     async def _async_update_data(self) -> None:
-        if self.session is None:
-            await self.async_create_session()
+        await self.async_ensure_session()
 
         await self.async_update_devices()
 
@@ -67,16 +229,94 @@ class Ring:
 
         await self.async_update_groups()
 
+    @property
+    def dings_data(self) -> dict[Any, Any]:
+        """Return the active dings returned by the api."""
+        return self._dings_data
+
+    @dings_data.setter
+    def dings_data(self, dings_data: dict[Any, Any]) -> None:
+        self._dings_data = dings_data
+        self._dings_alerts.clear()
+        for ding_data in dings_data:
+            self._dings_alerts.add(
+                RingEvent(
+                    id=ding_data["id"],
+                    doorbot_id=ding_data["doorbot_id"],
+                    device_name=ding_data["doorbot_description"],
+                    device_kind=ding_data["device_kind"],
+                    now=ding_data["now"],
+                    expires_in=ding_data["expires_in"],
+                    kind=ding_data["kind"],
+                    state=ding_data["state"],
+                )
+            )
+        self._active_alerts = None
+
+    @property
+    def push_dings_data(self) -> list[RingEvent]:
+        """Return the events received by the event listener.
+
+        This is a copy, assign a new list to replace the events.
+        """
+        return list(self._push_alerts.values())
+
+    @push_dings_data.setter
+    def push_dings_data(self, push_dings_data: list[RingEvent]) -> None:
+        self._push_alerts.clear()
+        for ring_event in push_dings_data:
+            self._push_alerts.add(ring_event)
+        self._active_alerts = None
+
     def _add_event_to_dings_data(self, ring_event: RingEvent) -> None:
         # Purge expired push_dings
-        now = time.time()
-        self.push_dings_data = [
-            re for re in self.push_dings_data if now < re.now + re.expires_in
-        ]
-        self.push_dings_data.append(ring_event)
+        self._push_alerts.purge(time.time())
+        self._push_alerts.add(ring_event)
+        self._active_alerts = None
+
+    async def async_ensure_session(self) -> None:
+        """Create a session if there is none, or reuse one from the store."""
+        if self.session is not None:
+            return
+        if self.session_store is None:
+            await self._async_create_session()
+            return
+        async with self.session_store.lock():
+            if self.session is not None:
+                return
+            key = self.session_store.session_key(self.auth)
+            if stored := await self.session_store.async_load(key):
+                self.session, created_at = stored
+                self.session_refresh_time = time.monotonic() - (
+                    time.time() - created_at
+                )
+                return
+            await self._async_create_session()
 
     async def async_create_session(self) -> None:
-        """Create a new Ring session."""
+        """Create a new Ring session, replacing the one in the store."""
+        if self.session_store is None:
+            await self._async_create_session()
+            return
+        async with self.session_store.lock():
+            await self._async_create_session()
+
+    async def _async_replace_rejected_session(self, rejected: dict[str, Any]) -> None:
+        """Discard a session the api rejected and ensure there is a new one."""
+        if self.session_store is None:
+            if self.session is rejected:
+                self.session = None
+        else:
+            async with self.session_store.lock():
+                # Another caller may already have replaced it
+                if self.session is rejected:
+                    await self.session_store.async_invalidate(
+                        self.session_store.session_key(self.auth), rejected
+                    )
+                    self.session = None
+        await self.async_ensure_session()
+
+    async def _async_create_session(self) -> None:
         session_post_data = {
             "device": {
                 "hardware_id": self.auth.get_hardware_id(),
@@ -94,11 +334,14 @@ class Ring:
         )
         self.session = resp.json()
         self.session_refresh_time = time.monotonic()
+        if self.session_store is not None:
+            await self.session_store.async_save(
+                self.session_store.session_key(self.auth), self.session, time.time()
+            )
 
     async def async_update_devices(self) -> None:
         """Update device data."""
-        if self.session is None:
-            await self.async_create_session()
+        await self.async_ensure_session()
 
         resp = await self._async_query(DEVICES_ENDPOINT)
         data: dict[Any, Any] = resp.json()
@@ -108,19 +351,21 @@ class Ring:
             device_type: {obj["id"]: obj for obj in devices}
             for device_type, devices in data.items()
         }
+        self.devices_update_time = time.time()
+        self.freshness.updated(DEVICES_SOURCE)
+        self.pending_updates.confirm_devices(self.devices_data)
 
     async def async_update_dings(self) -> None:
         """Update dings data."""
-        if self.session is None:
-            await self.async_create_session()
+        await self.async_ensure_session()
 
         resp = await self._async_query(DINGS_ENDPOINT)
         self.dings_data = resp.json()
+        self.freshness.updated(DINGS_SOURCE)
 
     async def async_update_groups(self) -> None:
         """Update groups data."""
-        if self.session is None:
-            await self.async_create_session()
+        await self.async_ensure_session()
         # Get all locations
         locations = set()
         devices = self.devices()
@@ -129,14 +374,156 @@ class Ring:
                 if dev.location_id is not None:
                     locations.add(dev.location_id)
 
-        # Query for groups
+        # Query for groups of all locations concurrently
+        responses = await asyncio.gather(
+            *(
+                self._async_query(GROUPS_ENDPOINT.format(location))
+                for location in locations
+            )
+        )
         self.groups_data = {}
-        for location in locations:
-            resp = await self._async_query(GROUPS_ENDPOINT.format(location))
+        for resp in responses:
             data = resp.json()
             if data["device_groups"]:
                 for group in data["device_groups"]:
                     self.groups_data[group["device_group_id"]] = group
+        self.freshness.updated(GROUPS_SOURCE)
+
+    def dump_state(self) -> bytes:
+        """Return the session and device data as a compressed binary blob.
+
+        Loading it with restore_state makes the data available without
+        fetching it from the api.  The blob contains the account profile
+        so it should be stored privately.
+        """
+        session_time = None
+        if self.session_refresh_time is not None:
+            session_time = time.time() - (time.monotonic() - self.session_refresh_time)
+        health = [
+            [dev.family, dev.device_api_id, dev._health_attrs]  # noqa: SLF001
+            for dev in self.get_device_list()
+            if dev._health_attrs  # noqa: SLF001
+        ]
+        state = {
+            "version": STATE_VERSION,
+            "devices_update_time": self.devices_update_time,
+            "session": self.session,
+            "session_time": session_time,
+            "devices": {
+                family: list(devices.values())
+                for family, devices in self.devices_data.items()
+            },
+            "groups": self.groups_data,
+            "dings": self.dings_data,
+            "health": health,
+        }
+        return _STATE_MAGIC + zlib.compress(
+            json.dumps(state, separators=(",", ":")).encode()
+        )
+
+    def restore_state(self, state: bytes) -> None:
+        """Restore the data from a blob returned by dump_state.
+
+        Raises RingError if the blob is invalid or from another version.
+        """
+        try:
+            if not state.startswith(_STATE_MAGIC):
+                raise ValueError  # noqa: TRY301
+            data = json.loads(zlib.decompress(state[len(_STATE_MAGIC) :]))
+        except (ValueError, zlib.error) as ex:
+            msg = "Invalid Ring state data"
+            raise RingError(msg) from ex
+        if data.get("version") != STATE_VERSION:
+            msg = f"Unsupported Ring state version {data.get('version')}"
+            raise RingError(msg)
+        self.session = data["session"]
+        self.session_refresh_time = None
+        if (session_time := data["session_time"]) is not None:
+            self.session_refresh_time = time.monotonic() - (time.time() - session_time)
+        self.devices_data = {
+            family: {obj["id"]: obj for obj in devices}
+            for family, devices in data["devices"].items()
+        }
+        self.devices_update_time = data["devices_update_time"]
+        if self.devices_update_time is not None:
+            self.freshness.updated(
+                DEVICES_SOURCE,
+                time.monotonic() - (time.time() - self.devices_update_time),
+            )
+        self.groups_data = data["groups"]
+        self.dings_data = data["dings"]
+        self._devices = None
+        health = {
+            (family, device_id): attrs for family, device_id, attrs in data["health"]
+        }
+        for dev in self.get_device_list():
+            if attrs := health.get((dev.family, dev.device_api_id)):
+                dev._health_attrs = attrs  # noqa: SLF001
+
+    def save_state(self, path: str | Path) -> None:
+        """Save the state to a file readable only by the user."""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as file:
+            file.write(self.dump_state())
+        tmp_path.replace(path)
+
+    def load_state(self, path: str | Path) -> bool:
+        """Load state saved to a file, return False if it does not exist."""
+        path = Path(path)
+        if not path.exists():
+            return False
+        self.restore_state(path.read_bytes())
+        return True
+
+    async def async_warm_start(
+        self, path: str | Path, *, max_age: float = 0
+    ) -> asyncio.Task[None] | None:
+        """Load the state saved to path and revalidate it in the background.
+
+        If the state loads the data is usable immediately and it is
+        refreshed and saved again by the returned task, unless it is less
+        than max_age seconds old.  If there is no usable state the data is
+        fetched and saved before returning None.
+        """
+        try:
+            loaded = self.load_state(path)
+        except RingError:
+            _logger.warning("Ignoring invalid Ring state in %s", path)
+            loaded = False
+        if not loaded:
+            await self._async_refresh_state(path)
+            return None
+        if (
+            self.devices_update_time is not None
+            and time.time() - self.devices_update_time < max_age
+        ):
+            return None
+        task = asyncio.create_task(self._async_revalidate_state(path))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _async_refresh_state(self, path: str | Path) -> None:
+        # Only refresh the health that was loaded, and avoid creating the
+        # devices before their data is fetched
+        health_devices = [
+            dev
+            for dev in (self.get_device_list() if self.devices_data else [])
+            if dev._health_attrs  # noqa: SLF001
+        ]
+        await self.async_update_data()
+        await asyncio.gather(
+            *(dev.async_update_health_data() for dev in health_devices)
+        )
+        self.save_state(path)
+
+    async def _async_revalidate_state(self, path: str | Path) -> None:
+        try:
+            await self._async_refresh_state(path)
+        except Exception:
+            _logger.exception("Error revalidating the Ring state, keeping stale data")
 
     async def async_query(  # noqa: PLR0913
         self,
@@ -149,8 +536,7 @@ class Ring:
         base_uri: str = API_URI,
     ) -> Auth.Response:
         """Query data from Ring API."""
-        if self.session is None:
-            await self.async_create_session()
+        await self.async_ensure_session()
         return await self._async_query(
             url, method, extra_params, data, json, timeout, base_uri
         )
@@ -173,7 +559,8 @@ class Ring:
             data,
             extra_params,
         )
-        return await self.auth.async_query(
+        query = partial(
+            self.auth.async_query,
             base_uri + url,
             method=method,
             extra_params=extra_params,
@@ -181,6 +568,32 @@ class Ring:
             json=json,
             timeout=timeout,
         )
+        session = self.session
+        try:
+            return await query()
+        except RingError as ex:
+            if session is None or url == NEW_SESSION_ENDPOINT or not _unauthorized(ex):
+                raise
+        # The api rejected the session so it is replaced, also in the store
+        _logger.debug("Session rejected, creating a new one")
+        await self._async_replace_rejected_session(session)
+        return await query()
+
+    async def async_query_stream(
+        self,
+        url: str,
+        *,
+        timeout: float | None = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+        base_uri: str = API_URI,
+    ) -> AsyncIterator[bytes]:
+        """Query the Ring API and yield the response body in chunks."""
+        await self.async_ensure_session()
+        _logger.debug("url: %s\nmethod: GET (stream)", url)
+        async for chunk in self.auth.async_query_stream(
+            base_uri + url, timeout=timeout, chunk_size=chunk_size
+        ):
+            yield chunk
 
     def devices(self) -> RingDevices:
         """Get all devices."""
@@ -240,6 +653,53 @@ class Ring:
             chain(devices.doorbots, devices.authorized_doorbots, devices.stickup_cams)
         )
 
+    async def async_iter_timeline(
+        self,
+        devices: Iterable[RingDoorBell] | None = None,
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        page_size: int = DEFAULT_TIMELINE_PAGE_SIZE,
+    ) -> AsyncGenerator[tuple[RingDoorBell, dict[str, Any]], None]:
+        """Yield the history of devices merged newest first by created_at.
+
+        The first page of every device is requested concurrently and after
+        that the next page of a device is only requested once the merge has
+        consumed its current one.  since and until bound created_at
+        inclusively, naive datetimes are taken to be in UTC.
+
+        :param devices: the devices to merge, defaults to all video devices
+        :param since: stop at entries older than this
+        :param until: skip entries newer than this
+        :param page_size: number of history entries requested per page
+        """
+        if devices is None:
+            devices = self.video_devices()
+        if until is not None:
+            until = utc_datetime(until)
+        cursors = [_RingHistoryCursor(device, page_size, since) for device in devices]
+        await asyncio.gather(*(cursor.async_fetch_page() for cursor in cursors))
+
+        # Newest first, ties broken by the device order
+        heap = [
+            (-_created_at(entry).timestamp(), index)
+            for index, cursor in enumerate(cursors)
+            if (entry := cursor.peek()) is not None
+        ]
+        heapq.heapify(heap)
+        while heap:
+            _, index = heap[0]
+            cursor = cursors[index]
+            entry = cursor.pop()
+            if until is None or _created_at(entry) <= until:
+                yield cursor.device, entry
+            if cursor.needs_page:
+                await cursor.async_fetch_page()
+            if (next_entry := cursor.peek()) is not None:
+                heapq.heapreplace(heap, (-_created_at(next_entry).timestamp(), index))
+            else:
+                heapq.heappop(heap)
+
     def groups(self) -> Mapping[str, RingLightGroup]:
         """Get all groups."""
         groups = {}
@@ -249,39 +709,24 @@ class Ring:
 
         return groups
 
-    def active_alerts(self) -> Sequence[RingEvent]:
-        """Get active alerts."""
+    def active_alerts(self) -> list[RingEvent]:
+        """Get active alerts.
+
+        A new list is returned on each call so callers can modify it.
+        """
         now = time.time()
-        # Purge expired push_dings
-        self.push_dings_data = [
-            re for re in self.push_dings_data if now < re.now + re.expires_in
-        ]
-        # Get unique id dictionary
-        alerts: dict[tuple[int, int, str], RingEvent] = {}
-        for re in self.push_dings_data:
-            key = (re.doorbot_id, re.id, re.kind)
-            if key not in alerts or re.now > alerts[key].now:
-                alerts[key] = re
-
-        for ding_data in self.dings_data:
-            expires_at = ding_data.get("now") + ding_data.get("expires_in")
-
-            if now < expires_at:
-                re = RingEvent(
-                    id=ding_data["id"],
-                    doorbot_id=ding_data["doorbot_id"],
-                    device_name=ding_data["doorbot_description"],
-                    device_kind=ding_data["device_kind"],
-                    now=ding_data["now"],
-                    expires_in=ding_data["expires_in"],
-                    kind=ding_data["kind"],
-                    state=ding_data["state"],
-                )
+        # Purge expired push_dings and dings
+        push_purged = self._push_alerts.purge(now)
+        dings_purged = self._dings_alerts.purge(now)
+        if self._active_alerts is None or push_purged or dings_purged:
+            # Get unique id dictionary
+            alerts: dict[AlertKey, RingEvent] = {}
+            for re in chain(self._push_alerts.values(), self._dings_alerts.values()):
                 key = (re.doorbot_id, re.id, re.kind)
                 if key not in alerts or re.now > alerts[key].now:
                     alerts[key] = re
-
-        return list(alerts.values())
+            self._active_alerts = tuple(alerts.values())
+        return list(self._active_alerts)
 
     DEPRECATED_API_QUERIES: ClassVar = {
         "update_devices",
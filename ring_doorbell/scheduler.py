@@ -0,0 +1,273 @@
+"""Module for polling Ring data at intervals adapted to each device."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from ring_doorbell.auth import REQUEST_LOG_WINDOW
+from ring_doorbell.const import RingCapability
+from ring_doorbell.freshness import (
+    DEVICES_SOURCE,
+    DINGS_SOURCE,
+    device_source,
+    health_source,
+)
+
+if TYPE_CHECKING:
+    from ring_doorbell.event import RingEvent
+    from ring_doorbell.freshness import DataSource
+    from ring_doorbell.generic import RingGeneric
+    from ring_doorbell.ring import Ring
+
+_logger = logging.getLogger(__name__)
+
+# Requests per hour
+DEFAULT_POLL_BUDGET = 360
+DEFAULT_POLL_INTERVAL = 300
+DEFAULT_MIN_POLL_INTERVAL = 30
+DEFAULT_MAX_POLL_INTERVAL = 60 * 60
+# Devices with an event this recently are polled at the minimum interval
+DEFAULT_ACTIVITY_WINDOW = 10 * 60
+# Battery devices report health less often so it is polled less often
+BATTERY_INTERVAL_FACTOR = 2
+# Intervals shrink when a poll finds changed data and grow when it does not
+CHANGED_INTERVAL_FACTOR = 0.5
+UNCHANGED_INTERVAL_FACTOR = 1.5
+# Failed polls are retried after min_interval, doubling with each failure
+ERROR_BACKOFF_FACTOR = 2
+# When this many devices have device data due it is fetched for the whole
+# account in one request instead of one request per device
+DEVICES_POLL_THRESHOLD = 2
+_BUDGET_WINDOW = REQUEST_LOG_WINDOW
+
+
+class _PollState:
+    __slots__ = ("changes", "errors", "interval", "last", "polls")
+
+    def __init__(self, interval: float, last: float | None) -> None:
+        self.interval = interval
+        self.last = last
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+
+
+class RingPollScheduler:
+    """Polls the dings and the data and health of each device adaptively.
+
+    Each source starts at interval seconds which shrinks towards
+    min_interval while polls find changes and grows towards max_interval
+    while they do not.  Health of battery devices is polled less often and
+    devices with recent listener events are polled at min_interval.  If
+    the intervals add up to more than budget requests an hour they are all
+    stretched to fit it, and polls wait while the auth has made budget
+    requests in the last hour, whoever made them.  When the device data of
+    several devices is due it is fetched with one request for the whole
+    account.  Failed polls are retried with a backoff that leaves the
+    interval unchanged.
+
+    Each Ring has a scheduler which is not started until asked:
+
+        ring.scheduler.budget = 120
+        listener.add_notification_callback(ring.scheduler.on_event)
+        ring.scheduler.start()
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        ring: Ring,
+        *,
+        budget: int = DEFAULT_POLL_BUDGET,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+        max_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        activity_window: float = DEFAULT_ACTIVITY_WINDOW,
+    ) -> None:
+        """Initialise the scheduler for a Ring."""
+        self._ring = ring
+        self.budget = budget
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.activity_window = activity_window
+        self._states: dict[DataSource, _PollState] = {}
+        self._activity: dict[int, float] = {}
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def _device_sources(self) -> dict[DataSource, RingGeneric | None]:
+        sources: dict[DataSource, RingGeneric | None] = {DINGS_SOURCE: None}
+        for device in self._ring.get_device_list():
+            sources[device_source(device)] = device
+            sources[health_source(device)] = device
+        return sources
+
+    def _state(self, source: DataSource, now: float) -> _PollState:
+        if (state := self._states.get(source)) is None:
+            age = self._ring.freshness.age(source)
+            last = None if age is None else now - age
+            state = self._states[source] = _PollState(self.interval, last)
+        return state
+
+    def _due(self, source: DataSource, interval: float, now: float) -> float:
+        state = self._state(source, now)
+        if state.last is None:
+            return now
+        if state.errors:
+            backoff = self.min_interval * ERROR_BACKOFF_FACTOR ** (state.errors - 1)
+            return state.last + min(backoff, self.max_interval)
+        return state.last + interval
+
+    def _is_active(self, device: RingGeneric | None, now: float) -> bool:
+        if device is None:
+            # Account wide data is needed sooner when any device is active
+            return any(
+                now - event_time < self.activity_window
+                for event_time in self._activity.values()
+            )
+        event_time = self._activity.get(device.device_api_id)
+        return event_time is not None and now - event_time < self.activity_window
+
+    def _base_interval(
+        self, source: DataSource, device: RingGeneric | None, now: float
+    ) -> float:
+        state = self._state(source, now)
+        if self._is_active(device, now):
+            return self.min_interval
+        interval = state.interval
+        if (
+            device is not None
+            and source == health_source(device)
+            and device.has_capability(RingCapability.BATTERY)
+        ):
+            interval *= BATTERY_INTERVAL_FACTOR
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def intervals(self) -> dict[DataSource, float]:
+        """Return the current poll interval of each source."""
+        now = time.monotonic()
+        intervals = {
+            source: self._base_interval(source, device, now)
+            for source, device in self._device_sources().items()
+        }
+        rate = sum(_BUDGET_WINDOW / interval for interval in intervals.values())
+        if rate > self.budget:
+            stretch = rate / self.budget
+            intervals = {
+                source: interval * stretch for source, interval in intervals.items()
+            }
+        return intervals
+
+    def on_event(self, ring_event: RingEvent) -> None:
+        """Record device activity, can be used as a listener callback."""
+        self._activity[ring_event.doorbot_id] = time.monotonic()
+        if self._wake is not None:
+            self._wake.set()
+
+    def _budget_delay(self, now: float) -> float:
+        requests = self._ring.auth.request_times
+        while requests and requests[0] <= now - _BUDGET_WINDOW:
+            requests.popleft()
+        if len(requests) < self.budget:
+            return 0
+        # Wait until enough requests are out of the window to make one more
+        return requests[len(requests) - self.budget] + _BUDGET_WINDOW - now
+
+    async def async_poll_due(self) -> float:
+        """Poll the sources that are due, return the seconds until the next."""
+        now = time.monotonic()
+        intervals = self.intervals()
+        due = [
+            source
+            for due_at, source in sorted(
+                (self._due(source, interval, now), source)
+                for source, interval in intervals.items()
+            )
+            if due_at <= now
+        ]
+        due_devices = [source for source in due if source[0] == "device"]
+        if len(due_devices) >= DEVICES_POLL_THRESHOLD:
+            due = [DEVICES_SOURCE, *(source for source in due if source[0] != "device")]
+        for source in due:
+            if delay := self._budget_delay(time.monotonic()):
+                return delay
+            if source == DEVICES_SOURCE:
+                await self._async_poll(DEVICES_SOURCE, due_devices)
+            else:
+                await self._async_poll(source, [source])
+        now = time.monotonic()
+        next_due = min(
+            self._due(source, interval, now) for source, interval in intervals.items()
+        )
+        return max(next_due - now, 0)
+
+    async def _async_poll(self, refresh: DataSource, sources: list[DataSource]) -> None:
+        before = [self._data(source) for source in sources]
+        started = time.monotonic()
+        await self._ring.freshness.async_refresh(refresh)
+        finished = time.monotonic()
+        for source, data in zip(sources, before):
+            self._record_poll(source, data, started, finished)
+
+    def _record_poll(
+        self, source: DataSource, before: Any, started: float, finished: float
+    ) -> None:
+        # Refresh errors are logged by freshness and leave the source stale
+        age = self._ring.freshness.age(source)
+        state = self._states[source]
+        state.polls += 1
+        state.last = finished
+        if age is None or age > finished - started:
+            state.errors += 1
+            return
+        state.errors = 0
+        if self._data(source) != before:
+            state.changes += 1
+            state.interval = max(
+                state.interval * CHANGED_INTERVAL_FACTOR, self.min_interval
+            )
+        else:
+            state.interval = min(
+                state.interval * UNCHANGED_INTERVAL_FACTOR, self.max_interval
+            )
+
+    def _data(self, source: DataSource) -> Any:
+        if source == DINGS_SOURCE:
+            return self._ring.dings_data
+        kind, family, device_api_id = source
+        if kind == "device":
+            return self._ring.devices_data[family].get(device_api_id)
+        for device in self._ring.devices()[family]:
+            if device.device_api_id == device_api_id:
+                return device._health_attrs  # noqa: SLF001
+        return None
+
+    async def _run(self) -> None:
+        assert self._wake is not None  # noqa: S101
+        while True:
+            try:
+                delay = await self.async_poll_due()
+            except Exception:
+                _logger.exception("Error polling Ring data")
+                delay = self.min_interval
+            self._wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), delay)
+
+    def start(self) -> None:
+        """Start polling in the background."""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
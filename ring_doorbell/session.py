@@ -0,0 +1,173 @@
+"""Module for sharing Ring sessions between Ring instances and processes."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from ring_doorbell.auth import Auth
+
+_logger = logging.getLogger(__name__)
+
+# Sessions older than this are not reused, matches how often the event
+# listener refreshes its session
+DEFAULT_SESSION_MAX_AGE = 60 * 60 * 12
+
+
+def _close_acquired_lock(future: asyncio.Future[int]) -> None:
+    if not future.cancelled() and future.exception() is None:
+        os.close(future.result())
+
+
+class RingSessionStore:
+    """Stores sessions so new Ring instances can reuse them.
+
+    Sessions are keyed by the hardware id and account id of the auth they
+    were created for, so accounts sharing a host do not get each other's
+    sessions.  This store keeps them in memory for the instances of a
+    process, subclasses can persist them by overriding _load and _save.
+    """
+
+    def __init__(self, *, max_age: float = DEFAULT_SESSION_MAX_AGE) -> None:
+        """Initialise the store."""
+        self.max_age = max_age
+        self._sessions: dict[str, dict[str, Any]] = {}
+        self._lock: asyncio.Lock | None = None
+
+    @asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        """Hold the store lock so only one holder creates a session."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            yield
+
+    @staticmethod
+    def session_key(auth: Auth) -> str:
+        """Return the key of the sessions created for an auth."""
+        return f"{auth.get_hardware_id()}:{auth.get_account_id()}"
+
+    async def async_load(self, key: str) -> tuple[dict[str, Any], float] | None:
+        """Return the session and its creation time if it has not expired."""
+        entry = (await self._load()).get(key)
+        if entry is None or time.time() - entry["created_at"] >= self.max_age:
+            return None
+        return entry["session"], entry["created_at"]
+
+    async def async_save(
+        self, key: str, session: dict[str, Any], created_at: float
+    ) -> None:
+        """Save a session, replacing the one for the key.
+
+        Expired sessions are removed, account ids change when tokens are
+        refreshed so their keys are not reused.
+        """
+        now = time.time()
+        sessions = {
+            entry_key: entry
+            for entry_key, entry in (await self._load()).items()
+            if now - entry["created_at"] < self.max_age
+        }
+        sessions[key] = {"session": session, "created_at": created_at}
+        await self._save(sessions)
+
+    async def async_invalidate(self, key: str, session: dict[str, Any]) -> None:
+        """Remove a session the api rejected, unless it has been replaced."""
+        sessions = await self._load()
+        entry = sessions.get(key)
+        if entry is not None and entry["session"] == session:
+            del sessions[key]
+            await self._save(sessions)
+
+    async def _load(self) -> dict[str, dict[str, Any]]:
+        return dict(self._sessions)
+
+    async def _save(self, sessions: dict[str, dict[str, Any]]) -> None:
+        self._sessions = sessions
+
+
+class RingSessionFileStore(RingSessionStore):
+    """Stores sessions in a json file shared by processes.
+
+    The lock is an flock on a lock file next to it, on platforms without
+    fcntl it only locks within the process.
+    """
+
+    def __init__(
+        self, path: str | Path, *, max_age: float = DEFAULT_SESSION_MAX_AGE
+    ) -> None:
+        """Initialise the store for a file."""
+        super().__init__(max_age=max_age)
+        self.path = Path(path)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+
+    @asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        """Hold the store lock and the file lock."""
+        async with super().lock():
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, self._acquire_file_lock)
+            try:
+                fd = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Release the lock as soon as the thread acquires it
+                future.add_done_callback(_close_acquired_lock)
+                raise
+            try:
+                yield
+            finally:
+                os.close(fd)
+
+    def _acquire_file_lock(self) -> int:
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                os.close(fd)
+                raise
+        return fd
+
+    async def _load(self) -> dict[str, dict[str, Any]]:
+        return await asyncio.get_running_loop().run_in_executor(None, self._read)
+
+    async def _save(self, sessions: dict[str, dict[str, Any]]) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._write, sessions)
+
+    def _read(self) -> dict[str, dict[str, Any]]:
+        try:
+            with self.path.open("rb") as file:
+                sessions = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            _logger.warning("Ignoring invalid session store %s", self.path)
+            return {}
+        if not isinstance(sessions, dict):
+            return {}
+        return {
+            key: entry
+            for key, entry in sessions.items()
+            if isinstance(entry, dict) and {"session", "created_at"} <= entry.keys()
+        }
+
+    def _write(self, sessions: dict[str, dict[str, Any]]) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(sessions, file)
+        tmp_path.replace(self.path)
@@ -0,0 +1,321 @@
+"""Module for incrementally aggregating event statistics."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ring_doorbell.const import DEFAULT_TIMELINE_PAGE_SIZE
+from ring_doorbell.exceptions import RingError
+from ring_doorbell.util import parse_datetime, utc_datetime
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from ring_doorbell.doorbot import RingDoorBell
+    from ring_doorbell.event import RingEvent
+    from ring_doorbell.ring import Ring
+
+    _StatsKey = tuple[int | None, str | None]
+
+STATISTICS_VERSION = 1
+
+
+class _DeviceWatermark:
+    """The range of history ids counted for a device.
+
+    Ring event ids increase over time so history newer than newest or
+    older than oldest has not been counted yet.  Live events newer than
+    the history are kept in live_ids so they are not counted again when
+    the history catches up.  complete is set once the history has been
+    backfilled to its end.
+    """
+
+    __slots__ = ("complete", "live_ids", "newest", "oldest")
+
+    def __init__(
+        self,
+        newest: int | None = None,
+        oldest: int | None = None,
+        live_ids: Iterable[int] = (),
+        *,
+        complete: bool = False,
+    ) -> None:
+        self.newest = newest
+        self.oldest = oldest
+        self.live_ids = set(live_ids)
+        self.complete = complete
+
+
+class RingEventStatistics:
+    """Counts and hour of day histograms of events per device and kind.
+
+    Statistics are updated from history pages and live events and lookups
+    by device, kind, both or neither are constant time.  Hours are in tz,
+    or the local timezone if not provided.
+
+        stats = RingEventStatistics.load(path)
+        await stats.async_update(ring)
+        listener.add_notification_callback(stats.add_event)
+        print(stats.count(device_id, "motion"), stats.hourly(device_id))
+        stats.save(path)
+    """
+
+    def __init__(self, tz: dt.tzinfo | None = None) -> None:
+        """Initialise empty statistics."""
+        self.tz = tz
+        self._hours: dict[_StatsKey, list[int]] = {}
+        self._counts: dict[_StatsKey, int] = {}
+        self._watermarks: dict[int, _DeviceWatermark] = {}
+
+    def count(self, device_id: int | None = None, kind: str | None = None) -> int:
+        """Return the number of events, optionally for a device and kind."""
+        return self._counts.get((device_id, kind), 0)
+
+    def hourly(
+        self, device_id: int | None = None, kind: str | None = None
+    ) -> list[int]:
+        """Return the number of events in each hour of the day."""
+        return list(self._hours.get((device_id, kind), [0] * 24))
+
+    def kinds(self, device_id: int | None = None) -> dict[str, int]:
+        """Return the number of events of each kind."""
+        return {
+            kind: count
+            for (key_device_id, kind), count in self._counts.items()
+            if key_device_id == device_id and kind is not None
+        }
+
+    @property
+    def device_ids(self) -> list[int]:
+        """Return the ids of the devices with statistics."""
+        return list(self._watermarks)
+
+    def _add(self, device_id: int, kind: str, created_at: dt.datetime) -> None:
+        hour = utc_datetime(created_at).astimezone(self.tz).hour
+        for key in ((device_id, kind), (device_id, None), (None, kind), (None, None)):
+            if (hours := self._hours.get(key)) is None:
+                hours = self._hours[key] = [0] * 24
+            hours[hour] += 1
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def add_event(self, ring_event: RingEvent) -> None:
+        """Count a live event, can be used as a listener notification callback."""
+        if ring_event.is_update:
+            return
+        watermark = self._watermarks.setdefault(
+            ring_event.doorbot_id, _DeviceWatermark()
+        )
+        if (
+            watermark.newest is not None and ring_event.id <= watermark.newest
+        ) or ring_event.id in watermark.live_ids:
+            return
+        watermark.live_ids.add(ring_event.id)
+        created_at = dt.datetime.fromtimestamp(ring_event.now, tz=dt.timezone.utc)
+        self._add(ring_event.doorbot_id, ring_event.kind, created_at)
+
+    def add_history(self, device_id: int, entries: Iterable[dict[str, Any]]) -> int:
+        """Count history entries not already counted, return the number added.
+
+        Entries can be a page from async_history with or without the
+        timezone converted, naive datetimes are taken to be in UTC.
+        """
+        watermark = self._watermarks.setdefault(device_id, _DeviceWatermark())
+        return self._add_history(device_id, entries, watermark.newest)
+
+    def _add_history(
+        self,
+        device_id: int,
+        entries: Iterable[dict[str, Any]],
+        newest: int | None,
+    ) -> int:
+        watermark = self._watermarks[device_id]
+        oldest = watermark.oldest
+        added = 0
+        for entry in entries:
+            event_id = entry["id"]
+            if (
+                newest is not None
+                and oldest is not None
+                and oldest <= event_id <= newest
+            ):
+                continue
+            if watermark.newest is None or event_id > watermark.newest:
+                watermark.newest = event_id
+            if watermark.oldest is None or event_id < watermark.oldest:
+                watermark.oldest = event_id
+            if event_id in watermark.live_ids:
+                watermark.live_ids.discard(event_id)
+                continue
+            created_at = entry["created_at"]
+            if isinstance(created_at, str):
+                created_at = parse_datetime(created_at)
+            self._add(device_id, entry["kind"], created_at)
+            added += 1
+        if watermark.live_ids and watermark.newest is not None:
+            watermark.live_ids = {
+                event_id
+                for event_id in watermark.live_ids
+                if event_id > watermark.newest
+            }
+        return added
+
+    async def async_update(
+        self,
+        ring: Ring,
+        devices: Iterable[RingDoorBell] | None = None,
+        *,
+        since: dt.datetime | None = None,
+        page_size: int = DEFAULT_TIMELINE_PAGE_SIZE,
+        limit: int | None = None,
+    ) -> int:
+        """Count the history not counted yet, return the number added.
+
+        The history newer than already counted is fetched first and then
+        older history is backfilled from where the last update stopped,
+        until it ends or reaches since.  An update that is interrupted or
+        stops at limit is continued by the next one.
+
+        :param since: do not count entries created before this
+        :param page_size: number of history entries requested per page
+        :param limit: maximum number of older entries backfilled per device
+        """
+        if devices is None:
+            devices = ring.video_devices()
+        if since is not None:
+            since = utc_datetime(since)
+        added = 0
+        for device in devices:
+            watermark = self._watermarks.setdefault(
+                device.device_api_id, _DeviceWatermark()
+            )
+            if watermark.newest is not None:
+                added += await self._async_update_newer(device, since, page_size)
+            if not watermark.complete:
+                added += await self._async_backfill(device, since, page_size, limit)
+        return added
+
+    async def _async_update_newer(
+        self, device: RingDoorBell, since: dt.datetime | None, page_size: int
+    ) -> int:
+        device_id = device.device_api_id
+        newest = self._watermarks[device_id].newest
+        # The new entries are only added once the history already counted is
+        # reached so an interrupted update does not leave a gap before it
+        newer: list[dict[str, Any]] = []
+        older_than = None
+        while True:
+            page = await device.async_history(limit=page_size, older_than=older_than)
+            entries = _created_since(page, since)
+            for entry in entries:
+                if newest is not None and entry["id"] <= newest:
+                    return self._add_history(device_id, newer, newest)
+                newer.append(entry)
+            if len(entries) < page_size:
+                return self._add_history(device_id, newer, newest)
+            older_than = page[-1]["id"]
+
+    async def _async_backfill(
+        self,
+        device: RingDoorBell,
+        since: dt.datetime | None,
+        page_size: int,
+        limit: int | None,
+    ) -> int:
+        device_id = device.device_api_id
+        watermark = self._watermarks[device_id]
+        added = backfilled = 0
+        while limit is None or backfilled < limit:
+            page = await device.async_history(
+                limit=page_size, older_than=watermark.oldest
+            )
+            entries = _created_since(page, since)
+            if limit is not None:
+                entries = entries[: limit - backfilled]
+            backfilled += len(entries)
+            added += self._add_history(device_id, entries, watermark.newest)
+            if len(entries) < len(page):
+                break
+            if len(page) < page_size:
+                watermark.complete = True
+                break
+        return added
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a json serializable dict."""
+        devices: dict[str, Any] = {}
+        for device_id, watermark in self._watermarks.items():
+            devices[str(device_id)] = {
+                "newest": watermark.newest,
+                "oldest": watermark.oldest,
+                "live_ids": sorted(watermark.live_ids),
+                "complete": watermark.complete,
+                "hours": {
+                    kind: hours
+                    for (key_device_id, kind), hours in self._hours.items()
+                    if key_device_id == device_id and kind is not None
+                },
+            }
+        return {"version": STATISTICS_VERSION, "devices": devices}
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], tz: dt.tzinfo | None = None
+    ) -> RingEventStatistics:
+        """Return statistics from the dict returned by as_dict."""
+        if data.get("version") != STATISTICS_VERSION:
+            msg = f"Unsupported event statistics version {data.get('version')}"
+            raise RingError(msg)
+        stats = cls(tz)
+        for device_key, device_data in data["devices"].items():
+            device_id = int(device_key)
+            stats._watermarks[device_id] = _DeviceWatermark(
+                device_data["newest"],
+                device_data["oldest"],
+                device_data["live_ids"],
+                complete=device_data.get("complete", False),
+            )
+            for kind, hours in device_data["hours"].items():
+                for key in (
+                    (device_id, kind),
+                    (device_id, None),
+                    (None, kind),
+                    (None, None),
+                ):
+                    totals = stats._hours.setdefault(key, [0] * 24)
+                    for hour, count in enumerate(hours):
+                        totals[hour] += count
+                    stats._counts[key] = stats._counts.get(key, 0) + sum(hours)
+        return stats
+
+    def save(self, path: str | Path) -> None:
+        """Save the statistics to a json file, replacing it atomically."""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.as_dict()))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path, tz: dt.tzinfo | None = None) -> RingEventStatistics:
+        """Load statistics saved to a file, or empty ones if it does not exist."""
+        path = Path(path)
+        if not path.exists():
+            return cls(tz)
+        return cls.from_dict(json.loads(path.read_text()), tz)
+
+
+def _created_since(
+    page: list[dict[str, Any]], since: dt.datetime | None
+) -> list[dict[str, Any]]:
+    """Return the entries of a history page created at or after since."""
+    if since is None:
+        return page
+    for index, entry in enumerate(page):
+        created_at = entry["created_at"]
+        if isinstance(created_at, str):
+            created_at = parse_datetime(created_at)
+        if utc_datetime(created_at) < since:
+            return page[:index]
+    return page
@@ -154,7 +154,7 @@ class RingStickUpCam(RingDoorBell):
             raise RingError(MSG_ALLOWED_VALUES.format(", ".join(values)))
 
         url = LIGHTS_ENDPOINT.format(self.device_api_id, state)
-        await self._ring.async_query(url, method="PUT")
+        await self._async_query_optimistic({("led_status",): state}, url, method="PUT")
 
     @property
     def light(self) -> bool:
@@ -165,7 +165,7 @@ class RingStickUpCam(RingDoorBell):
         """Control the lights."""
         state = "on" if value else "off"
         url = LIGHTS_ENDPOINT.format(self.device_api_id, state)
-        await self._ring.async_query(url, method="PUT")
+        await self._async_query_optimistic({("led_status",): state}, url, method="PUT")
 
     @property
     def siren(self) -> int:
@@ -7,10 +7,12 @@ import datetime
 import logging
 from contextlib import suppress
 from functools import update_wrapper
-from threading import Lock
+from threading import Lock, Thread, current_thread
 from typing import TYPE_CHECKING, Any, Callable
 from warnings import warn
+from weakref import finalize
 
+from aiohttp import ClientSession
 from typing_extensions import ParamSpec, TypeVar
 
 from ring_doorbell.exceptions import RingError
@@ -38,6 +40,17 @@ def parse_datetime(datetime_str: str) -> datetime.datetime:
 
     Ring api has inconsistent datetime string patterns.
     """
+    # Fast path for the common UTC patterns with 0, 3 or 6 fraction digits
+    # which fromisoformat parses on all supported python versions
+    if (
+        datetime_str.endswith("Z")
+        and len(datetime_str) in (20, 24, 27)
+        and datetime_str[10] == "T"
+    ):
+        with suppress(ValueError):
+            return datetime.datetime.fromisoformat(datetime_str[:-1]).replace(
+                tzinfo=datetime.timezone.utc
+            )
     # Check if the datetime string contains a period which precedes 'Z',
     # indicating microseconds
     if "." in datetime_str and datetime_str.endswith("Z"):
@@ -59,26 +72,105 @@ def parse_datetime(datetime_str: str) -> datetime.datetime:
     return res
 
 
+def utc_datetime(value: datetime.datetime) -> datetime.datetime:
+    """Return a datetime in UTC, naive datetimes are taken to be in UTC.
+
+    History entries can have naive or aware datetimes depending on how
+    they were parsed so they are normalised before comparing them.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
 class _DeprecatedSyncApiHandler:
+    """Runs deprecated sync calls on a background event loop thread.
+
+    The loop and its own http session are kept between calls so
+    connections are reused.  The session is not shared with the auth so
+    async calls made on the caller's loop keep working after sync calls.
+    Calls can be made from multiple threads and the loop is stopped when
+    the sync close is called, when the auth is garbage collected or at exit.
+    """
+
     def __init__(self, auth: Auth) -> None:
         self.auth = auth
-        self._sync_lock = Lock()
+        self._loop_lock = Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: Thread | None = None
+        self._finalizer: finalize | None = None
+        # Http session opened on the loop, closed when the loop is stopped
+        self._sessions: list[ClientSession] = []
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = Thread(
+                    target=loop.run_forever, name="ring-doorbell-sync", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+                # The finalizer is not passed the auth so it does not keep
+                # it alive
+                self._finalizer = finalize(
+                    self, self._stop_loop, loop, thread, self._sessions
+                )
+            return self._loop
 
-    async def run_and_close_session(
+    @staticmethod
+    def _stop_loop(
+        loop: asyncio.AbstractEventLoop,
+        thread: Thread,
+        sessions: list[ClientSession],
+    ) -> None:
+        if thread is current_thread():
+            # Collected on the loop thread which can only be told to stop
+            loop.stop()
+            return
+        if loop.is_running():
+            for session in sessions:
+                if not session.closed:
+                    future = asyncio.run_coroutine_threadsafe(session.close(), loop)
+                    with suppress(Exception):
+                        future.result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+        loop.close()
+
+    def loop_session(self) -> ClientSession | None:
+        """Return the http session of the background loop.
+
+        Returns None when not called from the background loop thread.
+        """
+        if self._thread is None or current_thread() is not self._thread:
+            return None
+        if not self._sessions:
+            self._sessions.append(ClientSession())
+        return self._sessions[0]
+
+    def stop(self) -> None:
+        """Close the http session and stop the background loop."""
+        with self._loop_lock:
+            if self._finalizer:
+                self._finalizer()
+            self._loop = None
+            self._thread = None
+            self._finalizer = None
+            self._sessions = []
+
+    def run(
         self,
         async_method: Callable[_P, Coroutine[Any, Any, _R]],
         *args: _P.args,
         **kwargs: _P.kwargs,
     ) -> _R:
-        try:
-            self._sync_lock.acquire()
-            res = await async_method(*args, **kwargs)
-        finally:
-            with suppress(Exception):
-                await self.auth.async_close()
-            self._sync_lock.release()
-
-        return res
+        """Run a coroutine function on the background loop and wait for it."""
+        future = asyncio.run_coroutine_threadsafe(
+            async_method(*args, **kwargs), self._get_loop()
+        )
+        return future.result()
 
     @staticmethod
     def check_no_loop(classname: str, method_name: str) -> None:
@@ -110,9 +202,11 @@ class _DeprecatedSyncApiHandler:
                     f"{classname}.{async_method_name}"
                 )
                 warn(msg, DeprecationWarning, stacklevel=1)
-                return asyncio.run(
-                    self.run_and_close_session(async_func, *args, **kwargs)
-                )
+                res = self.run(async_func, *args, **kwargs)
+                # Closing the auth session also stops the loop thread
+                if class_instance is self.auth and method_name == "close":
+                    self.stop()
+                return res
 
             return update_wrapper(wrapper, async_func)
 
@@ -135,7 +229,7 @@ class _DeprecatedSyncApiHandler:
         )
         warn(msg, DeprecationWarning, stacklevel=1)
         async_method = getattr(class_instance, async_method_name)
-        return asyncio.run(self.run_and_close_session(async_method))
+        return self.run(async_method)
 
     def set_api_property(
         self,
@@ -154,4 +248,4 @@ class _DeprecatedSyncApiHandler:
         )
         warn(msg, DeprecationWarning, stacklevel=1)
         async_method = getattr(class_instance, async_method_name)
-        asyncio.run(self.run_and_close_session(async_method, value))
+        self.run(async_method, value)
@@ -12,11 +12,13 @@ from unittest.mock import patch
 
 import pytest
 from aioresponses import CallbackResult, aioresponses
-from ring_doorbell import Auth, Ring
+from ring_doorbell import Auth, Ring, RingEvent
 from ring_doorbell.const import USER_AGENT
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Generator
+
+    from ring_doorbell import RingDoorBell
 
 
 # The kwargs below are useful for request assertions
@@ -158,6 +160,13 @@ def devices_fixture():
         def __init__(self) -> None:
             """Initialise the class."""
             self.updated = False
+            # Number of requests to reject as unauthorized
+            self.unauthorized = 0
+            # The fixtures reuse 987652 for a stickup cam and a doorbot, the
+            # doorbots endpoint returns the first family with the id
+            self.doorbots_families = ["doorbots", "stickup_cams", "other"]
+            # Return single device records keyed by the device type
+            self.keyed = False
 
         def devices(self) -> dict:
             """Get the devices."""
@@ -167,8 +176,23 @@ def devices_fixture():
 
         def callback(self, url, **kwargs) -> CallbackResult:  # noqa: ARG002, ANN003
             """Return the callback result."""
+            if self.unauthorized:
+                self.unauthorized -= 1
+                return CallbackResult(status=401, reason="Unauthorized")
             return CallbackResult(payload=self.devices())
 
+        def device_callback(self, url, **kwargs) -> CallbackResult:  # noqa: ARG002, ANN003
+            """Return the callback result for a single device."""
+            endpoint, device_id = url.path.rsplit("/", 2)[1:]
+            families = ["chimes"] if endpoint == "chimes" else self.doorbots_families
+            devices = self.devices()
+            for family in families:
+                for device in devices.get(family, []):
+                    if device["id"] == int(device_id):
+                        payload = {endpoint[:-1]: device} if self.keyed else device
+                        return CallbackResult(payload=payload)
+            return CallbackResult(status=404)
+
     return Devices()
 
 
@@ -307,6 +331,13 @@ def aioresponses_mock_fixture(request, devices_fixture, putpatch_status_fixture)
             callback=putpatch_status_fixture.callback,
             repeat=True,
         )
+        mock.get(
+            re.compile(
+                r"https:\/\/api\.ring\.com\/clients_api\/(doorbots|chimes)\/\d+$"
+            ),
+            callback=devices_fixture.device_callback,
+            repeat=True,
+        )
         mock.put(
             re.compile(r"https:\/\/api\.ring\.com\/clients_api\/doorbots\/.*$"),
             status=204,
@@ -345,3 +376,91 @@ def aioresponses_mock_fixture(request, devices_fixture, putpatch_status_fixture)
             repeat=True,
         )
         yield mock
+
+
+@pytest.fixture
+def api_requests(aioresponses_mock) -> Callable[[str, str | re.Pattern], list[str]]:
+    """Return a function listing the paths of the requests made to the api.
+
+    Requests match on their method and either a pattern matching the url or
+    the end of the url path.
+    """
+
+    def _api_requests(method: str, url: str | re.Pattern) -> list[str]:
+        return [
+            request_url.path
+            for (request_method, request_url), calls in (
+                aioresponses_mock.requests.items()
+            )
+            for _ in calls
+            if request_method == method
+            and (
+                url.match(str(request_url))
+                if isinstance(url, re.Pattern)
+                else request_url.path.endswith(url)
+            )
+        ]
+
+    return _api_requests
+
+
+@pytest.fixture
+def make_ring_event() -> Callable[..., RingEvent]:
+    """Return a function creating events for the fixture doorbot."""
+
+    def _make_ring_event(
+        ding_id: int,
+        kind: str = "motion",
+        *,
+        now: float | None = None,
+        age: float = 0.0,
+        is_update: bool = False,
+    ) -> RingEvent:
+        return RingEvent(
+            id=ding_id,
+            doorbot_id=987653,
+            device_name="Front Door",
+            device_kind="lpd_v1",
+            now=(time() if now is None else now) - age,
+            expires_in=180,
+            kind=kind,
+            state="human",
+            is_update=is_update,
+        )
+
+    return _make_ring_event
+
+
+@pytest.fixture
+def mock_histories(mocker) -> Callable[..., list[tuple[RingDoorBell, int | None]]]:
+    """Return a function serving device histories from async_history.
+
+    It takes the devices and a history for each, newest first, and returns
+    the list that the device and older_than of each request are added to.
+    """
+    from ring_doorbell import RingDoorBell  # noqa: PLC0415
+
+    def _mock_histories(
+        devices: list[RingDoorBell], histories: list[list[dict]]
+    ) -> list[tuple[RingDoorBell, int | None]]:
+        requests: list[tuple[RingDoorBell, int | None]] = []
+
+        async def _history(
+            device: RingDoorBell,
+            *,
+            limit: int = 30,
+            older_than: int | None = None,
+            **_: object,
+        ) -> list[dict]:
+            requests.append((device, older_than))
+            history = histories[devices.index(device)]
+            if older_than:
+                history = [entry for entry in history if entry["id"] < older_than]
+            return history[:limit]
+
+        mocker.patch.object(
+            RingDoorBell, "async_history", autospec=True, side_effect=_history
+        )
+        return requests
+
+    return _mock_histories
@@ -0,0 +1,276 @@
+"""Load generator and benchmark for the event listener notification path.
+
+Builds realistic FCM messages from the listen fixtures and feeds them to
+RingEventListener._on_notification through a local stand-in for
+FcmPushClient.  Run directly for a report:
+
+    python -m tests.listen_benchmark --count 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from ring_doorbell import Auth, Ring
+from ring_doorbell.const import USER_AGENT
+from ring_doorbell.listen import RingEventListener
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Relative weights of the generated message shapes
+DEFAULT_MIX = {
+    "ding_v2": 2,
+    "motion_v2": 5,
+    "ding_legacy": 1,
+    "motion_legacy": 2,
+    "intercom_unlock_legacy": 1,
+}
+
+
+def _load(*parts: str) -> Any:
+    return json.loads(FIXTURES.joinpath(*parts).read_text(encoding="utf-8"))
+
+
+def _timestamp(created: float) -> str:
+    created_at = dt.datetime.fromtimestamp(created, dt.timezone.utc)
+    return created_at.replace(tzinfo=None).isoformat(timespec="milliseconds") + "Z"
+
+
+class FcmLoadGenerator:
+    """Deterministic generator of FCM messages shaped like the fixtures.
+
+    The same seed always produces the same sequence of message shapes,
+    devices and ding ids.  created_at values are offsets from start_time
+    at the configured rate, so messages look live when start_time is now.
+    """
+
+    def __init__(
+        self,
+        *,
+        seed: int = 0,
+        rate: float = 0,
+        mix: dict[str, int] | None = None,
+        device_ids: list[int] | None = None,
+        intercom_ids: list[int] | None = None,
+        start_time: float | None = None,
+    ) -> None:
+        """Initialise the generator, a rate of 0 means as fast as possible."""
+        self._random = random.Random(seed)  # noqa: S311
+        self.rate = rate
+        mix = mix or DEFAULT_MIX
+        self._shapes = list(mix)
+        self._weights = [mix[shape] for shape in self._shapes]
+        self._device_ids = device_ids or [987652, 987653, 987654, 987655]
+        self._intercom_ids = intercom_ids or [185036587]
+        self._start_time = time.time() if start_time is None else start_time
+        self._ding_id = 7000000000000000000
+
+        self._v1 = _load("listen", "fcmdata_v1.json")
+        self._v2 = _load("listen", "fcmdata_v2.json")
+        self._gcmdata = {
+            "ding_legacy": _load("listen", "doorbot_ding_gcmdata.json"),
+            "motion_legacy": _load("listen", "camera_motion_gcmdata.json"),
+            "intercom_unlock_legacy": _load("listen", "intercom_unlock_gcmdata.json"),
+        }
+        self._v2_parts = {
+            shape: (
+                _load("listen", f"{fixture}_data.json"),
+                _load("listen", f"{fixture}_android_config.json"),
+                _load("listen", f"{fixture}_analytics.json"),
+            )
+            for shape, fixture in (
+                ("ding_v2", "intercom_ding"),
+                ("motion_v2", "camera_motion"),
+            )
+        }
+
+    def message(self, index: int) -> dict[str, Any]:
+        """Return the message for an index in the sequence."""
+        shape = self._random.choices(self._shapes, self._weights)[0]
+        self._ding_id += 1
+        offset = index / self.rate if self.rate else 0
+        created_at = _timestamp(self._start_time + offset)
+
+        if shape in self._v2_parts:
+            data, android_config, analytics = self._v2_parts[shape]
+            data = {**data, "device": {**data["device"]}}
+            data["event"] = {**data["event"], "ding": {**data["event"]["ding"]}}
+            data["device"]["id"] = self._random.choice(self._device_ids)
+            data["event"]["ding"]["id"] = str(self._ding_id)
+            data["event"]["ding"]["created_at"] = created_at
+            msg = {**self._v2, "data": {**self._v2["data"]}}
+            msg["data"]["data"] = json.dumps(data)
+            msg["data"]["android_config"] = json.dumps(android_config)
+            msg["data"]["analytics"] = json.dumps(analytics)
+            return msg
+
+        gcmdata = dict(self._gcmdata[shape])
+        if "ding" in gcmdata:
+            gcmdata["ding"] = {
+                **gcmdata["ding"],
+                "id": self._ding_id,
+                "doorbot_id": self._random.choice(self._device_ids),
+                "created_at": created_at,
+            }
+        else:
+            gcmdata["alarm_meta"] = {
+                **gcmdata["alarm_meta"],
+                "device_zid": self._random.choice(self._intercom_ids),
+            }
+        return {**self._v1, "data": {"gcmData": json.dumps(gcmdata)}}
+
+    def messages(self, count: int) -> Iterator[tuple[dict[str, Any], str]]:
+        """Yield count messages with their persistent ids."""
+        for index in range(count):
+            yield self.message(index), f"0:{index}%{self._ding_id:x}"
+
+
+class FakeFcmPushClient:
+    """Local stand-in for FcmPushClient that replays generated messages."""
+
+    def __init__(
+        self,
+        callback: Callable[[dict, str, Any | None], None],
+        messages: list[tuple[dict[str, Any], str]],
+        *,
+        rate: float = 0,
+    ) -> None:
+        """Initialise with the notification callback and messages to send."""
+        self.callback = callback
+        self.messages = messages
+        self.rate = rate
+        self.latencies: list[float] = []
+
+    async def start(self) -> None:
+        """Deliver the messages, pacing them when a rate is set."""
+        perf_counter = time.perf_counter
+        latencies = self.latencies
+        started = perf_counter()
+        for index, (notification, persistent_id) in enumerate(self.messages):
+            if self.rate:
+                delay = started + index / self.rate - perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            sent = perf_counter()
+            self.callback(notification, persistent_id, None)
+            latencies.append(perf_counter() - sent)
+
+
+@dataclass
+class ListenerBenchmarkResult:
+    """Class for the results of a listener benchmark run."""
+
+    events: int
+    received: int
+    events_per_second: float
+    p50_latency_us: float
+    p99_latency_us: float
+    allocated_bytes_per_event: float
+    retained_blocks_per_event: float
+
+    def __str__(self) -> str:
+        """Return the report."""
+        return (
+            f"events:             {self.events}\n"
+            f"received:           {self.received}\n"
+            f"events/sec:         {self.events_per_second:,.0f}\n"
+            f"p50 dispatch:       {self.p50_latency_us:.1f} us\n"
+            f"p99 dispatch:       {self.p99_latency_us:.1f} us\n"
+            f"alloc bytes/event:  {self.allocated_bytes_per_event:,.0f}\n"
+            f"retained blk/event: {self.retained_blocks_per_event:.2f}"
+        )
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def _listener(ring: Ring) -> tuple[RingEventListener, list]:
+    listener = RingEventListener(ring)
+    received: list = []
+    listener.add_notification_callback(ring._add_event_to_dings_data)
+    listener.add_notification_callback(received.append)
+    return listener, received
+
+
+async def run_listener_benchmark(
+    count: int = 10000, *, rate: float = 0, seed: int = 0
+) -> ListenerBenchmarkResult:
+    """Run the generated load through a listener and measure it."""
+    ring = Ring(Auth(USER_AGENT))
+    ring.devices_data = {
+        device_type: {obj["id"]: obj for obj in devices}
+        for device_type, devices in _load("ring_devices.json").items()
+    }
+    messages = list(FcmLoadGenerator(seed=seed, rate=rate).messages(count))
+
+    listener, received = _listener(ring)
+    client = FakeFcmPushClient(listener._on_notification, messages, rate=rate)
+    started = time.perf_counter()
+    await client.start()
+    elapsed = time.perf_counter() - started
+
+    # Measure allocations on a separate pass so tracing does not skew timing
+    listener, _ = _listener(ring)
+    allocated = 0
+
+    def _traced_notification(
+        notification: dict, persistent_id: str, obj: Any | None
+    ) -> None:
+        # The peak above the memory in use before the event is what handling
+        # the event allocated, including memory it freed again
+        nonlocal allocated
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        listener._on_notification(notification, persistent_id, obj)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+
+    traced = FakeFcmPushClient(_traced_notification, messages)
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    await traced.start()
+    tracemalloc.stop()
+    retained = sys.getallocatedblocks() - blocks
+
+    return ListenerBenchmarkResult(
+        events=count,
+        received=len(received),
+        events_per_second=count / elapsed,
+        p50_latency_us=_percentile(client.latencies, 50) * 1e6,
+        p99_latency_us=_percentile(client.latencies, 99) * 1e6,
+        allocated_bytes_per_event=allocated / count,
+        retained_blocks_per_event=retained / count,
+    )
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--rate", type=float, default=0, help="Messages per second")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    result = asyncio.run(
+        run_listener_benchmark(args.count, rate=args.rate, seed=args.seed)
+    )
+    print(result)  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import re
+import signal
+import socket
 from pathlib import Path
 from typing import Any
 from unittest.mock import DEFAULT, MagicMock, call, patch
 
 import aiofiles
+import asyncclick as click
 import pytest
 from asyncclick.testing import CliRunner
 from ring_doorbell import AuthenticationError, Requires2FAError, Ring
 from ring_doorbell.cli import (
+    _CliDaemon,
     _event_handler,
+    _run_in_daemon,
     cli,
+    daemon,
     devices_command,
+    export_command,
     in_home_chime,
     list_command,
     listen,
@@ -116,12 +126,22 @@ async def test_videos(ring, mocker):
         assert "Downloading 3 videos" in res.output
 
 
+async def test_videos_count(ring):
+    runner = CliRunner()
+    res = await runner.invoke(
+        videos, ["--count", "--max-count", "2", "--device-name", "Front Door"], obj=ring
+    )
+    assert res.exit_code == 0
+    assert "Total videos: 2" in res.output
+    assert "Motion triggered: 2" in res.output
+
+
 @pytest.mark.parametrize(
     ("affect_method", "exception", "file_exists"),
     [
         (None, None, False),
         ("ring_doorbell.auth.Auth.async_fetch_token", Requires2FAError, False),
-        ("ring_doorbell.ring.Ring.async_update_data", AuthenticationError, True),
+        ("ring_doorbell.ring.Ring.async_update_devices", AuthenticationError, True),
     ],
     ids=("No 2FA", "Require 2FA", "Invalid Grant"),
 )
@@ -168,6 +188,62 @@ async def test_auth(mocker, affect_method, exception, file_exists):
         assert res.exit_code == 0
 
 
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        ([], {"devices", "health"}),
+        (["list"], {"devices"}),
+        (["dings"], {"dings"}),
+        (["groups", "--json"], {"devices", "groups"}),
+        (["raw-query", "--url", "/clients_api/doorbots/987652/history"], set()),
+    ],
+    ids=("default", "list", "dings", "groups", "raw-query"),
+)
+async def test_command_data(aioresponses_mock, args, expected):
+    """Test commands only load the data they declare."""
+    data_urls = {
+        "devices": re.compile(r"/clients_api/ring_devices$"),
+        "dings": re.compile(r"/clients_api/dings/active$"),
+        "groups": re.compile(r"/groups/v1/locations/[^/]+/groups$"),
+        "health": re.compile(r"/health$"),
+    }
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        res = await runner.invoke(
+            cli, ["--username", "foo", "--password", "foo", "--no-daemon", *args]
+        )
+
+    assert res.exit_code == 0, res.output
+    loaded = {
+        data
+        for data, pattern in data_urls.items()
+        for _, url in aioresponses_mock.requests
+        if pattern.search(url.path)
+    }
+    assert loaded == expected
+
+
+async def test_show_device_health(aioresponses_mock):
+    """Test show only loads the health of the printed device."""
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        res = await runner.invoke(
+            cli,
+            [
+                *("--username", "foo", "--password", "foo", "--no-daemon"),
+                *("show", "--device-name", "Downstairs"),
+            ],
+        )
+
+    assert res.exit_code == 0, res.output
+    health_paths = [
+        url.path
+        for _, url in aioresponses_mock.requests
+        if url.path.endswith("/health")
+    ]
+    assert health_paths == ["/clients_api/chimes/999999/health"]
+
+
 async def test_motion_detection(ring, aioresponses_mock, devices_fixture):
     runner = CliRunner()
     with runner.isolated_filesystem():
@@ -191,6 +267,7 @@ async def test_motion_detection(ring, aioresponses_mock, devices_fixture):
 
         # Changes the return to indicate that the siren is now on.
         devices_fixture.updated = True
+        devices_fixture.doorbots_families = ["stickup_cams"]
         aioresponses_mock.get(
             "https://api.ring.com/clients_api/ring_devices",
             payload=load_fixture_as_dict("ring_devices_updated.json"),
@@ -395,3 +472,140 @@ async def test_get_device(ring, aioresponses_mock, devices_fixture):
     )
     assert res.exit_code == 1
     assert "Cannot find intercom with name Frontx" in res.output
+
+
+@pytest.mark.parametrize(
+    ("export_format", "expected"),
+    [
+        pytest.param("ndjson", '"id": 987654321', id="ndjson"),
+        pytest.param("csv", "987654321,987652,Front,", id="csv"),
+    ],
+)
+async def test_export(ring, export_format, expected):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        res = await runner.invoke(
+            export_command,
+            ["--device-name", "Front", "--format", export_format, "-o", "history"],
+            obj=ring,
+        )
+        assert res.exit_code == 0
+        assert "Exported 3 events to history" in res.output
+        assert expected in Path("history").read_text()  # noqa: ASYNC240
+
+
+async def test_daemon_client(ring, tmp_path):
+    socket_path = str(tmp_path / "ring.sock")
+    server = await _CliDaemon(ring).start(socket_path)
+    runner = CliRunner()
+    try:
+        res = await runner.invoke(cli, ["--daemon-socket", socket_path, "list"])
+        assert res.exit_code == 0
+        assert "Ring CLI" in res.output
+        assert "Front Door" in res.output
+
+        res = await runner.invoke(
+            cli,
+            ["--daemon-socket", socket_path, "open-door", "--device-name", "Missing"],
+        )
+        assert res.exit_code == 1
+        assert "Cannot find intercom with name Missing" in res.output
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    # Without a daemon the command runs locally
+    assert await _run_in_daemon(socket_path, ["list"]) is None
+
+
+async def test_daemon_socket(ring, tmp_path):
+    socket_path = tmp_path / "ring.sock"
+    # A socket left behind by a daemon that is not running is replaced
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path))
+    stale.close()
+    server = await _CliDaemon(ring).start(socket_path)
+    try:
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+        with pytest.raises(click.ClickException, match="already running"):
+            await _CliDaemon(ring).start(socket_path)
+        assert await _run_in_daemon(str(socket_path), ["list"]) == 0
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [b"", b'{"exit_code": 0, "out', b'{"exit_code": 0}\n'],
+    ids=("empty", "truncated", "incomplete"),
+)
+async def test_daemon_bad_reply(tmp_path, reply):
+    socket_path = str(tmp_path / "ring.sock")
+
+    async def _reply(reader, writer) -> None:
+        await reader.readline()
+        writer.write(reply)
+        writer.close()
+
+    server = await asyncio.start_unix_server(_reply, path=socket_path)
+    runner = CliRunner()
+    try:
+        res = await runner.invoke(cli, ["--daemon-socket", socket_path, "list"])
+    finally:
+        server.close()
+        await server.wait_closed()
+    assert res.exit_code == 1
+    assert "did not reply to the command" in res.output
+
+
+async def test_daemon_local_commands(ring, tmp_path, mocker):
+    socket_path = str(tmp_path / "ring.sock")
+    server = await _CliDaemon(ring).start(socket_path)
+    run_in_daemon = mocker.patch(
+        "ring_doorbell.cli._run_in_daemon", side_effect=_run_in_daemon
+    )
+    mocker.patch("ring_doorbell.cli._get_ring", return_value=ring)
+    update_dings = mocker.spy(ring, "async_update_dings")
+    runner = CliRunner()
+    try:
+        # Files are written relative to the working directory of the client
+        with runner.isolated_filesystem():
+            res = await runner.invoke(
+                cli,
+                ["--daemon-socket", socket_path, "export", "-o", "history"],
+            )
+            assert res.exit_code == 0
+            assert Path("history").exists()  # noqa: ASYNC240
+        run_in_daemon.assert_not_called()
+
+        # Dings are refreshed by the daemon before they are shown
+        res = await runner.invoke(cli, ["--daemon-socket", socket_path, "dings"])
+        assert res.exit_code == 0
+        run_in_daemon.assert_called_once()
+        update_dings.assert_called_once()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+async def test_daemon(ring, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    task = asyncio.create_task(
+        daemon.main(["--no-listen"], obj=ring, standalone_mode=False)
+    )
+    socket_path = tmp_path / "ring_doorbell.sock"
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        await asyncio.sleep(0.01)
+    assert socket_path.stat().st_mode & 0o777 == 0o600
+
+    runner = CliRunner()
+    res = await runner.invoke(cli, ["devices", "--device-name", "Front Door"])
+    assert res.exit_code == 0
+    assert "Front Door" in res.output
+
+    os.kill(os.getpid(), signal.SIGTERM)
+    await task
+    assert not socket_path.exists()
@@ -0,0 +1,67 @@
+"""The tests for the history exporter."""
+
+import csv
+import io
+import json
+
+import pytest
+from ring_doorbell.export import (
+    RingHistoryCsvWriter,
+    RingHistoryNdjsonWriter,
+    RingHistoryParquetWriter,
+    async_export_history,
+    flatten_history_entry,
+)
+
+
+def test_flatten_history_entry():
+    entry = {"id": 1, "recording": {"status": "ready"}, "events": []}
+    assert flatten_history_entry(entry) == {
+        "id": 1,
+        "recording.status": "ready",
+        "events": [],
+    }
+
+
+async def test_export_ndjson(ring):
+    output = io.StringIO()
+    devices = ring.video_devices()[:1]
+    with RingHistoryNdjsonWriter(output) as writer:
+        rows = await async_export_history(ring, writer, devices)
+    assert rows == writer.rows == 3
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line["id"] for line in lines] == [987654321, 9876543212, 1234567890123456]
+    assert lines[0]["device_id"] == devices[0].device_api_id
+    assert lines[0]["created_at"] == "2017-03-05T15:03:40+00:00"
+    assert lines[0]["recording"] == {"status": "ready"}
+
+
+async def test_export_csv(ring):
+    output = io.StringIO()
+    with RingHistoryCsvWriter(output, ["id", "kind", "recording.status"]) as writer:
+        rows = await async_export_history(
+            ring, writer, ring.video_devices()[:1], kind="motion", limit=1
+        )
+    assert rows == 1
+    assert list(csv.DictReader(io.StringIO(output.getvalue()))) == [
+        {"id": "987654321", "kind": "motion", "recording.status": "ready"}
+    ]
+
+
+async def test_export_parquet(ring, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "history.parquet"
+    with path.open("wb") as file:  # noqa: SIM117
+        with RingHistoryParquetWriter(file, row_group_size=2) as writer:
+            await async_export_history(ring, writer, ring.video_devices()[:1])
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 2
+    table = parquet_file.read()
+    assert table.column("id").to_pylist() == [
+        987654321,
+        9876543212,
+        1234567890123456,
+    ]
+    assert table.column("recording.status").to_pylist() == ["ready"] * 3
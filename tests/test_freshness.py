@@ -0,0 +1,81 @@
+"""The tests for the freshness of Ring data."""
+
+from ring_doorbell.freshness import device_source, health_source
+
+
+async def test_read_fresh(ring, aioresponses_mock):
+    """Test reads of fresh data do not refresh it."""
+    chime = ring.devices()["chimes"][0]
+    aioresponses_mock.requests.clear()
+
+    assert chime.read("name", max_age=60) == "Downstairs"
+    assert chime.data_age("name") < 60
+    await ring.freshness.async_wait()
+    assert not aioresponses_mock.requests
+
+
+async def test_read_stale_coalesced(ring, aioresponses_mock, api_requests):
+    """Test stale reads return cached data and refresh it once."""
+    chime = ring.devices()["chimes"][0]
+    aioresponses_mock.requests.clear()
+
+    assert chime.read("name", max_age=0) == "Downstairs"
+    assert chime.read("volume", max_age=0) == 2
+    await ring.freshness.async_wait()
+
+    # Only the data of the device is fetched
+    assert api_requests("GET", "/chimes/999999") == ["/clients_api/chimes/999999"]
+    assert not api_requests("GET", "/ring_devices")
+    assert ring.freshness.reads(device_source(chime)) == 2
+
+
+async def test_read_sources(freezer, ring):
+    """Test the data a property reads is found from the data it uses."""
+    devices = ring.devices()
+    chime = devices["chimes"][0]
+    doorbell = devices["doorbots"][0]
+    assert chime.read("wifi_signal_strength") is None
+    assert chime.data_age("wifi_signal_strength") is None
+    assert doorbell.data_age("volume") < 1
+
+    # Updating all the devices also updates the data of each device
+    freezer.tick(60)
+    await doorbell.async_update_device_data()
+    assert doorbell.data_age("volume") == 0
+    assert chime.data_age("volume") == 60
+    await ring.async_update_devices()
+    assert chime.data_age("volume") == 0
+
+
+async def test_read_health(ring, aioresponses_mock, api_requests):
+    """Test health data is fetched in the background on first read."""
+    chime = ring.devices()["chimes"][0]
+    assert chime.data_age("wifi_name") is None
+
+    assert chime.read("wifi_name", max_age=60) is None
+    await ring.freshness.async_wait()
+    assert chime.read("wifi_name", max_age=60) == "ring_mock_wifi"
+    assert chime.data_age("wifi_name") < 60
+    assert len(api_requests("GET", "/health")) == 1
+
+
+async def test_refresh_priority(ring, aioresponses_mock, api_requests):
+    """Test queued refreshes run in order of how often they are read."""
+    ring.freshness.max_concurrent = 1
+    devices = ring.devices()
+    chime = devices["chimes"][0]
+    doorbell = devices["doorbots"][0]
+    aioresponses_mock.requests.clear()
+
+    # The devices refresh runs while the health refreshes are queued
+    chime.read("name", max_age=0)
+    chime.read("wifi_name", max_age=60)
+    for _ in range(3):
+        doorbell.read("wifi_name", max_age=60)
+    assert ring.freshness.reads(health_source(doorbell)) == 3
+    await ring.freshness.async_wait()
+
+    assert api_requests("GET", "/health") == [
+        "/clients_api/doorbots/987652/health",
+        "/clients_api/chimes/999999/health",
+    ]
@@ -1,15 +1,33 @@
 """The tests for the Ring platform."""
 
+import asyncio
+import dataclasses
 import datetime
 import json
+import logging
+import pickle
+import socket
+import sys
+import time
 
 import pytest
 from freezegun.api import FrozenDateTimeFactory
-from ring_doorbell import Ring
+from ring_doorbell import Ring, RingEvent, RingEventKind
+from ring_doorbell.event import RingEventKey
 from ring_doorbell.exceptions import RingError
-from ring_doorbell.listen import RingEventListener
+from ring_doorbell.listen import (
+    RingEventBroker,
+    RingEventBrokerClient,
+    RingEventJournal,
+    RingEventListener,
+    RingEventListenerWatchdog,
+    RingEventOverflowPolicy,
+    eventlistener,
+)
+from ring_doorbell.listen.journal import MIN_SEGMENT_SIZE
 
 from tests.conftest import load_alert_v1, load_alert_v2, load_fixture
+from tests.listen_benchmark import FcmLoadGenerator, run_listener_benchmark
 
 
 async def test_listen(auth, mocker):
@@ -193,3 +211,543 @@ async def test_listen_fcm_fail(auth, mocker, caplog):
         )
         == 1
     )
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+async def test_listen_default_json_loads(auth, monkeypatch, backend):
+    if backend == "orjson":
+        orjson = pytest.importorskip("orjson")
+        expected = orjson.loads
+    else:
+        # An import of a module set to None in sys.modules raises ImportError
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        expected = json.loads
+    json_loads = eventlistener._default_json_loads()
+    assert json_loads is expected
+
+    ring = Ring(auth)
+    listener = RingEventListener(ring, json_loads=json_loads)
+    received = []
+    listener.add_notification_callback(received.append)
+    listener._on_notification(load_alert_v2("camera_motion", 123456782), "1")
+    listener._on_notification(load_alert_v1("doorbot_ding", 123456781), "2")
+    assert [event.doorbot_id for event in received] == [123456782, 123456781]
+    assert received[0].kind == RingEventKind.MOTION.value
+
+
+async def test_listen_json_backend(auth, mocker, caplog):
+    ring = Ring(auth)
+    json_loads = mocker.Mock(side_effect=json.loads)
+    listener = RingEventListener(ring, json_loads=json_loads)
+    received = []
+    listener.add_notification_callback(received.append)
+
+    for i in range(3):
+        msg = load_alert_v2("camera_motion", 123456782, ding_id_inc=i)
+        listener._on_notification(msg, "1234567" + str(i))
+    # android_config is only decoded for the first push
+    assert json_loads.call_count == 4
+    assert [event.kind for event in received] == [RingEventKind.MOTION.value] * 3
+
+    msg = load_alert_v1("doorbot_ding", 123456781)
+    listener._on_notification(msg, "12345678")
+    assert json_loads.call_count == 5
+    assert received[-1].doorbot_id == 123456781
+
+    dumps = mocker.spy(json, "dumps")
+    listener._on_notification({"data": {"foo": "bar"}}, "12345679")
+    assert dumps.call_count == 0
+
+    caplog.set_level(logging.DEBUG, "ring_doorbell.listen.eventlistener")
+    listener._on_notification({"data": {"foo": "bar"}}, "12345679")
+    assert 'Full message is:\n{"foo": "bar"}' in caplog.text
+
+
+def test_ring_event():
+    event = RingEvent(1, 2, "Front Door", "lpd_v1", 3.0, 180, "motion", "human")
+    assert event.get_key() == RingEventKey(1, 2, "motion", 3.0)
+    assert hash(event) == hash(event.get_key())
+    assert event["kind"] == "motion"
+    assert event.get("state") == "human"
+    assert event.get("foo") is None
+    assert repr(event) == (
+        "RingEvent(id=1, doorbot_id=2, device_name='Front Door', "
+        "device_kind='lpd_v1', now=3.0, expires_in=180, kind='motion', "
+        "state='human', is_update=False)"
+    )
+    # The dataclass api is supported
+    assert dataclasses.asdict(event)["kind"] == "motion"
+    assert dataclasses.replace(event, kind="ding").get_key().kind == "ding"
+    event.state = "package"
+    assert event.get("state") == "package"
+    assert event.get("_key") is None
+    # The cached key follows changes to the key fields
+    key = event.get_key()
+    assert event.get_key() is key
+    event.now = 4.0
+    assert event.get_key() == RingEventKey(1, 2, "motion", 4.0)
+    assert hash(event) == hash(event.get_key())
+    event.now = 3.0
+
+    copied = pickle.loads(pickle.dumps(event))  # noqa: S301
+    assert copied == event
+    copied.is_update = True
+    assert copied != event
+    assert hash(copied) == hash(event)
+
+
+async def test_active_alerts_index(ring, freezer: FrozenDateTimeFactory):
+    listener = RingEventListener(ring)
+    await listener.start()
+
+    # Active dings from the api are indexed when dings_data is updated
+    alerts = ring.active_alerts()
+    assert len(alerts) == 3
+    # Repeated calls return copies of the cached alerts
+    alerts.pop()
+    assert len(ring.active_alerts()) == 3
+
+    msg = load_alert_v1("doorbot_ding", 123456781)
+    listener._on_notification(msg, "12345671")
+    alerts = ring.active_alerts()
+    assert len(alerts) == 4
+    assert ring.active_alerts() == alerts
+
+    # The dings from the api with the shortest expires_in expire first
+    freezer.tick(datetime.timedelta(seconds=170))
+    assert len(ring.active_alerts()) == 2
+    freezer.tick(datetime.timedelta(minutes=5))
+    assert len(ring.active_alerts()) == 0
+    await listener.stop()
+
+
+async def test_queued_callbacks(auth):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+
+    received = []
+    release = asyncio.Event()
+
+    async def _slow_callback(event: RingEvent) -> None:
+        await release.wait()
+        received.append(event)
+
+    inline = []
+    slow_id = listener.add_notification_callback(_slow_callback)
+    inline_id = listener.add_notification_callback(inline.append)
+    queued = []
+    queued_id = listener.add_notification_callback(queued.append, max_queue_size=10)
+
+    for i in range(3):
+        msg = load_alert_v1("doorbot_ding", 123456781, ding_id_inc=i)
+        listener._on_notification(msg, "1234567" + str(i))
+
+    # Inline callbacks are called as the event is received
+    assert len(inline) == 3
+    await asyncio.sleep(0)
+    # The slow callback does not hold up other queued callbacks
+    assert len(queued) == 3
+    assert received == []
+    assert listener.get_subscriber_stats(slow_id).queued == 2
+    assert listener.get_subscriber_lag(slow_id) >= 0
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert len(received) == 3
+    stats = listener.get_subscriber_stats(slow_id)
+    assert stats.delivered == 3
+    assert stats.queued == 0
+    assert stats.dropped == 0
+
+    with pytest.raises(RingError, match=f"ID {inline_id} is not a valid queued"):
+        listener.get_subscriber_stats(inline_id)
+    listener.remove_notification_callback(queued_id)
+    await listener.stop()
+
+
+@pytest.mark.parametrize(
+    ("overflow", "expected_delivered", "dropped", "coalesced"),
+    [
+        pytest.param(RingEventOverflowPolicy.DROP_OLDEST, 2, 2, 0, id="drop_oldest"),
+        pytest.param(RingEventOverflowPolicy.BLOCK, 4, 0, 0, id="block"),
+        pytest.param(RingEventOverflowPolicy.COALESCE, 2, 0, 2, id="coalesce"),
+    ],
+)
+async def test_queued_callback_overflow(
+    auth, overflow, expected_delivered, dropped, coalesced
+):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+
+    received = []
+    sub_id = listener.add_notification_callback(
+        received.append, max_queue_size=2, overflow=overflow
+    )
+    created_at = (
+        datetime.datetime.now(datetime.timezone.utc)
+        .replace(tzinfo=None)
+        .isoformat(timespec="milliseconds")
+        + "Z"
+    )
+    # Each ding is sent twice like battery doorbells sending an update
+    for i in range(2):
+        for _ in range(2):
+            msg = load_alert_v1(
+                "doorbot_ding", 123456781, ding_id_inc=i, created_at=created_at
+            )
+            listener._on_notification(msg, "1234567" + str(i))
+
+    await asyncio.sleep(0.01)
+    stats = listener.get_subscriber_stats(sub_id)
+    # Blocked events wait for room rather than overfilling the queue
+    assert stats.max_queued <= 2
+    assert len(received) == expected_delivered
+    assert stats.delivered == expected_delivered
+    assert stats.dropped == dropped
+    assert stats.coalesced == coalesced
+    if overflow is RingEventOverflowPolicy.COALESCE:
+        assert all(event.is_update for event in received)
+    await listener.stop()
+
+
+async def test_block_backpressure(auth):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+
+    stream = listener.events(max_queue_size=2, overflow=RingEventOverflowPolicy.BLOCK)
+    for i in range(4):
+        listener._on_notification(
+            load_alert_v1("doorbot_ding", 123456781, ding_id_inc=i), str(i)
+        )
+    await asyncio.sleep(0)
+    assert stream.stats.queued == 2
+
+    # Async producers wait until the subscriber makes room
+    event = RingEvent(1, 123456781, "Front", "doorbell", time.time(), 180, "ding", "")
+    put = asyncio.create_task(listener._subscribers.async_dispatch(event))
+    await asyncio.sleep(0)
+    assert not put.done()
+
+    received = [await stream.__anext__() for _ in range(5)]
+    await put
+    assert event in received
+    assert len({ring_event.id for ring_event in received}) == 5
+    assert stream.stats.max_queued == 2
+    await listener.stop()
+
+
+async def test_event_streams(auth):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+
+    all_events = listener.events()
+    device_events = listener.events(device_ids=[123456781])
+    ding_events = listener.events(kinds=[RingEventKind.DING])
+    device_motion = listener.events(device_ids=[123456782], kinds=["motion"])
+
+    listener._on_notification(load_alert_v2("intercom_ding", 123456781), "1")
+    listener._on_notification(load_alert_v2("camera_motion", 123456782), "2")
+    listener._on_notification(load_alert_v2("intercom_ding", 123456783), "3")
+
+    async with device_motion:
+        event = await device_motion.__anext__()
+        assert (event.doorbot_id, event.kind) == (123456782, "motion")
+    assert [event async for event in device_motion] == []
+
+    device_events.close()
+    assert [event.doorbot_id async for event in device_events] == [123456781]
+    ding_events.close()
+    assert [event.doorbot_id async for event in ding_events] == [
+        123456781,
+        123456783,
+    ]
+
+    # Closed streams no longer receive events
+    listener._on_notification(load_alert_v1("doorbot_ding", 123456781), "4")
+    assert device_events.stats.delivered == 1
+    assert len(listener._subscribers) == 1
+
+    # Stopping the listener ends iteration once queued events are consumed
+    await listener.stop()
+    assert len([event async for event in all_events]) == 4
+
+
+async def test_event_broker(auth, tmp_path):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+
+    path = tmp_path / "ring.sock"
+    broker = RingEventBroker(listener, path, replay_size=2)
+    await broker.start()
+    assert path.stat().st_mode & 0o777 == 0o600
+
+    # A second broker does not take over the socket of a running one
+    with pytest.raises(RingError, match="already running"):
+        await RingEventBroker(listener, path).start()
+
+    for i in range(3):
+        msg = load_alert_v2("camera_motion", 123456782, ding_id_inc=i)
+        listener._on_notification(msg, "1234567" + str(i))
+    assert broker.sequence == 3
+
+    # Only the last two events are available to replay
+    client = RingEventBrokerClient(path)
+    await client.connect()
+    replayed = [await client.__anext__() for _ in range(2)]
+    assert replayed == ring.push_dings_data[1:]
+    assert client.last_sequence == 3
+
+    live = RingEventBrokerClient(path, since=None)
+    async with live:
+        for _ in range(100):
+            if broker.subscriber_count == 2:
+                break
+            await asyncio.sleep(0)
+        msg = load_alert_v1("intercom_unlock", 185036587)
+        listener._on_notification(msg, "12345673")
+        event = await live.__anext__()
+        assert event.kind == "intercom_unlock"
+        assert event == await client.__anext__()
+        assert live.last_sequence == client.last_sequence == 4
+
+    await broker.stop()
+    assert [event async for event in client] == []
+    await client.close()
+    assert not path.exists()
+
+    # A stale socket left by a broker that did not stop is replaced
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    await broker.start()
+    await broker.stop()
+    await listener.stop()
+
+
+async def test_event_journal(auth, tmp_path):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    received = []
+    listener.add_notification_callback(received.append)
+
+    journal = RingEventJournal(tmp_path)
+    cb_id = listener.add_notification_callback(journal.append)
+    for i in range(3):
+        msg = load_alert_v2("camera_motion", 123456782, ding_id_inc=i)
+        listener._on_notification(msg, "1234567" + str(i))
+    assert journal.last_offset == 3
+    assert [offset for offset, _ in journal.replay()] == [1, 2, 3]
+    assert [event for _, event in journal.replay(1)] == received[1:]
+    listener.remove_notification_callback(cb_id)
+    journal.close()
+
+    # Reopening finds the end of the journal and continues the offsets
+    with RingEventJournal(tmp_path) as journal:
+        assert journal.last_offset == 3
+        listener.add_notification_callback(journal.append)
+        msg = load_alert_v1("doorbot_ding", 123456781)
+        listener._on_notification(msg, "12345673")
+        assert journal.last_offset == 4
+        assert [event for _, event in journal.replay(2)] == received[2:]
+
+    with pytest.raises(RingError, match="segment size must be at least"):
+        RingEventJournal(tmp_path, segment_size=1024)
+
+
+def test_event_journal_rotation(tmp_path):
+    event = RingEvent(1, 2, "Front Door", "lpd_v1", 3.0, 180, "motion", "human")
+    with RingEventJournal(
+        tmp_path, segment_size=MIN_SEGMENT_SIZE, max_segments=2
+    ) as journal:
+        for _ in range(3000):
+            journal.append(event)
+        assert len(list(tmp_path.glob("*.journal"))) == 2
+        first = journal.first_offset
+        assert first > 1
+        offsets = [offset for offset, _ in journal.replay()]
+        assert offsets == list(range(first, 3001))
+        assert [offset for offset, _ in journal.replay(2990)] == list(range(2991, 3001))
+        # Replaying from an offset that has been deleted is an error
+        assert next(journal.replay(first - 1))[0] == first
+        with pytest.raises(RingError, match=f"Journal rotated past offset {first - 1}"):
+            list(journal.replay(first - 2))
+
+    with RingEventJournal(tmp_path, segment_size=MIN_SEGMENT_SIZE) as journal:
+        assert journal.first_offset == first
+        assert journal.append(event) == 3001
+
+
+def test_event_journal_replay_rotation(tmp_path):
+    event = RingEvent(1, 2, "Front Door", "lpd_v1", 3.0, 180, "motion", "human")
+    with RingEventJournal(tmp_path, segment_size=MIN_SEGMENT_SIZE) as journal:
+        journal.append(event)
+        # Events appended while replaying are replayed across rotations
+        offsets = []
+        for offset, _ in journal.replay():
+            offsets.append(offset)
+            if offset < 2500:
+                journal.append(event)
+        assert len(list(tmp_path.glob("*.journal"))) > 1
+        assert offsets == list(range(1, 2501))
+
+    with RingEventJournal(
+        tmp_path / "deleted", segment_size=MIN_SEGMENT_SIZE, max_segments=2
+    ) as journal:
+        for _ in range(1200):
+            journal.append(event)
+        replay = journal.replay()
+        assert next(replay)[0] == 1
+        # Rotation deletes the segments before the replay reaches them
+        for _ in range(2400):
+            journal.append(event)
+        with pytest.raises(RingError, match="Journal rotated past offset"):
+            list(replay)
+
+
+async def test_periodic_session_refresh(auth, mocker, freezer):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+    listener.session_refresh_task.cancel()
+    subscribe = mocker.patch.object(
+        listener, "add_subscription_to_ring", side_effect=[None, RingError, None]
+    )
+    sleeps = []
+
+    async def _sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        freezer.tick(seconds)
+        if len(sleeps) == 4:
+            listener.started = False
+
+    mocker.patch("ring_doorbell.listen.eventlistener.asyncio.sleep", _sleep)
+    create_session = mocker.spy(ring, "async_create_session")
+    freezer.tick(listener.SESSION_REFRESH_INTERVAL - 100)
+    await listener._periodic_session_refresh()
+
+    # Sleeps until each refresh is due, retrying a failed refresh sooner
+    interval = listener.SESSION_REFRESH_INTERVAL
+    assert sleeps == [100, interval, listener.SESSION_REFRESH_RETRY_INTERVAL, interval]
+    assert create_session.call_count == 3
+    assert subscribe.call_count == 3
+
+
+async def test_periodic_session_refresh_rejected(
+    auth, mocker, freezer, putpatch_status_fixture
+):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+    listener.session_refresh_task.cancel()
+    url = "https://api.ring.com/clients_api/device"
+    putpatch_status_fixture.overrides[url] = 500
+    sleeps = []
+
+    async def _sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        freezer.tick(seconds)
+        putpatch_status_fixture.overrides.pop(url, None)
+        if len(sleeps) == 2:
+            listener.started = False
+
+    mocker.patch("ring_doorbell.listen.eventlistener.asyncio.sleep", _sleep)
+    freezer.tick(listener.SESSION_REFRESH_INTERVAL)
+    await listener._periodic_session_refresh()
+
+    # A rejected subscription is retried sooner rather than left unsubscribed
+    assert sleeps == [
+        listener.SESSION_REFRESH_RETRY_INTERVAL,
+        listener.SESSION_REFRESH_INTERVAL,
+    ]
+    assert listener.subscribed is True
+
+
+async def test_listener_watchdog(auth, mocker, freezer):
+    ring = Ring(auth)
+    listener = RingEventListener(ring)
+    await listener.start()
+    watchdog = RingEventListenerWatchdog(listener, max_message_age=30)
+    watchdog.start()
+    await watchdog.stop()
+
+    assert await watchdog.check() is True
+    assert watchdog.healthy is True
+
+    # Nothing received from FCM for too long
+    freezer.tick(31)
+    receiver = listener._receiver
+    assert watchdog.healthy is False
+    assert await watchdog.check() is True
+    assert listener._receiver is not receiver
+    assert watchdog.healthy is True
+    assert watchdog.stats.outages == 1
+    assert watchdog.stats.reconnect_attempts == 1
+    # Missed dings are fetched on recovery
+    assert len(ring.dings_data) == 3
+
+    # Reconnects back off until one succeeds
+    mocker.patch("firebase_messaging.FcmPushClient.is_started", return_value=False)
+    restart = mocker.patch.object(
+        listener, "restart", side_effect=[RingError("Fail"), False, True]
+    )
+    sleep = mocker.patch("ring_doorbell.listen.watchdog.asyncio.sleep")
+    assert await watchdog.check() is True
+    assert restart.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [1, 2]
+    assert watchdog.stats.outages == 2
+    assert watchdog.stats.failed_reconnects == 2
+    assert watchdog.stats.max_time_to_recover >= watchdog.stats.last_time_to_recover
+
+    # Stopping the listener while reconnecting gives up
+    def _stopped() -> bool:
+        listener.started = False
+        return False
+
+    restart.side_effect = _stopped
+    assert await watchdog.check() is False
+    listener.started = True
+
+    await listener.stop()
+    assert await watchdog.check() is True
+
+
+async def test_listener_watchdog_errors(auth, mocker, caplog):
+    """Test the watchdog keeps supervising after an unexpected error."""
+    listener = RingEventListener(Ring(auth))
+    watchdog = RingEventListenerWatchdog(listener, check_interval=0)
+    checked = asyncio.Event()
+    calls = []
+
+    async def _check() -> bool:
+        calls.append(None)
+        if len(calls) == 1:
+            msg = "Boom"
+            raise ValueError(msg)
+        checked.set()
+        return True
+
+    mocker.patch.object(watchdog, "check", side_effect=_check)
+    watchdog.start()
+    await asyncio.wait_for(checked.wait(), 5)
+    await watchdog.stop()
+    assert "Unexpected error supervising the event listener" in caplog.text
+
+
+async def test_listener_benchmark():
+    first = [msg for msg, _ in FcmLoadGenerator(seed=1, start_time=0).messages(20)]
+    second = [msg for msg, _ in FcmLoadGenerator(seed=1, start_time=0).messages(20)]
+    assert first == second
+    assert any("gcmData" in msg["data"] for msg in first)
+    assert any("android_config" in msg["data"] for msg in first)
+
+    result = await run_listener_benchmark(200, seed=1)
+    assert result.events == 200
+    assert result.received == 200
+    assert result.events_per_second > 0
+    assert result.p99_latency_us >= result.p50_latency_us > 0
+    assert result.allocated_bytes_per_event > 0
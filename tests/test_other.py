@@ -142,3 +142,29 @@ async def test_other_open_door(ring, aioresponses_mock, mocker):
         method="PUT",
         **kwargs,
     )
+
+
+async def test_other_batch_settings(ring, aioresponses_mock):
+    dev = ring.devices()["other"][0]
+    aioresponses_mock.requests.clear()
+
+    async with dev.batch_settings():
+        await dev.async_set_mic_volume(10)
+        await dev.async_set_voice_volume(9)
+        await dev.async_set_clip_length_max(30)
+        await dev.async_set_keep_alive_auto(32.2)
+
+    kwargs = json_request_kwargs()
+    kwargs["json"] = {
+        "volume_settings": {"mic_volume": 10, "voice_volume": 9},
+        "video_settings": {"clip_length_max": 30},
+        "keep_alive_settings": {"keep_alive_auto": 32.2},
+    }
+    aioresponses_mock.assert_called_once_with(
+        "https://api.ring.com/devices/v1/devices/185036587/settings",
+        method="PATCH",
+        **kwargs,
+    )
+    assert dev.mic_volume == 10
+    assert dev.voice_volume == 9
+    assert dev.keep_alive_auto == 32.2
@@ -0,0 +1,203 @@
+"""The tests for the recording pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+from ring_doorbell.recordings import (
+    RingRecordingCallbackSink,
+    RingRecordingFileSink,
+    RingRecordingPipeline,
+    RingRecordingPollPolicy,
+    RingRecordingStream,
+    RingRecordingUrlCache,
+    get_url_expiry,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+NO_DELAY = RingRecordingPollPolicy(initial_delay=0, max_delay=0, timeout=60)
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    pytest.fail("Condition not met")
+
+
+async def test_recording_pipeline_file_sink(ring, tmp_path, make_ring_event):
+    pipeline = RingRecordingPipeline(
+        ring,
+        RingRecordingFileSink(tmp_path),
+        wired_policy=NO_DELAY,
+        battery_policy=NO_DELAY,
+    )
+    pipeline.on_event(make_ring_event(987654321))
+    pipeline.on_event(make_ring_event(987654321, is_update=True))
+    pipeline.on_event(make_ring_event(9876543212))
+    await _wait_for(lambda: pipeline.stats.downloads == 2)
+
+    # Both events on the device are found with one history request
+    assert pipeline.stats.events == 2
+    assert pipeline.stats.coalesced == 1
+    assert pipeline.stats.history_requests == 1
+    assert (tmp_path / "987653_987654321.mp4").read_bytes() == b"123456"
+    assert (tmp_path / "987653_9876543212.mp4").read_bytes() == b"123456"
+    assert not list(tmp_path.glob("*.part"))
+    await pipeline.stop()
+
+
+async def test_recording_pipeline_expiry(ring, make_ring_event):
+    received = []
+    pipeline = RingRecordingPipeline(
+        ring,
+        RingRecordingCallbackSink(lambda rec, content: received.append((rec, content))),
+        wired_policy=NO_DELAY,
+        battery_policy=NO_DELAY,
+    )
+    # Not in the history and too old to wait for
+    pipeline.on_event(make_ring_event(11111, age=120))
+    pipeline.on_event(make_ring_event(1234567890123456))
+    await _wait_for(lambda: pipeline.stats.expired == 1 and received)
+
+    recording, content = received[0]
+    assert recording.recording_id == 1234567890123456
+    assert recording.size == len(content) == 6
+    await pipeline.stop()
+
+
+async def test_recording_pipeline_sink_error(ring, make_ring_event, caplog):
+    def _fail(recording, content) -> None:
+        if recording.recording_id == 987654321:
+            msg = "Sink failed"
+            raise ValueError(msg)
+
+    pipeline = RingRecordingPipeline(
+        ring,
+        RingRecordingCallbackSink(_fail),
+        wired_policy=NO_DELAY,
+        battery_policy=NO_DELAY,
+    )
+    pipeline.on_event(make_ring_event(987654321))
+    pipeline.on_event(make_ring_event(9876543212))
+    await _wait_for(lambda: pipeline.stats.errors == pipeline.stats.downloads == 1)
+    assert "Error downloading recording 987654321" in caplog.text
+    await pipeline.stop()
+
+
+async def test_recording_pipeline_stream(ring, make_ring_event):
+    stream = RingRecordingStream()
+    pipeline = RingRecordingPipeline(
+        ring, stream, wired_policy=NO_DELAY, battery_policy=NO_DELAY
+    )
+    pipeline.on_event(make_ring_event(987654321))
+    recording, content = await stream.__anext__()
+    assert recording.device_id == 987653
+    assert content == b"123456"
+    assert pipeline.stats.last_latency >= 0
+
+    stream.close()
+    assert [item async for item in stream] == []
+    await pipeline.stop()
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        pytest.param(
+            "https://cdn.example.com/1.mp4?Expires=1700000000&Signature=x",
+            1700000000,
+            id="CloudFront",
+        ),
+        pytest.param(
+            "https://s3.example.com/1.mp4?X-Amz-Date=20231114T221320Z"
+            "&X-Amz-Expires=3600&X-Amz-Signature=x",
+            1700000000 + 3600,
+            id="S3",
+        ),
+        pytest.param("https://example.com/1.mp4", None, id="Unsigned"),
+        pytest.param("https://example.com/1.mp4?Expires=soon", None, id="Invalid"),
+    ],
+)
+def test_get_url_expiry(url, expected):
+    assert get_url_expiry(url) == expected
+
+
+def test_recording_url_cache_expiry(freezer):
+    cache = RingRecordingUrlCache(ttl=600, max_size=2)
+    expires = int(time.time()) + 300
+    cache.set(1, f"https://example.com/1.mp4?Expires={expires}")
+    cache.set(2, "https://example.com/2.mp4")
+    assert cache.get(1)
+    assert cache.get(2)
+
+    # Signed urls expire early by the safety margin
+    freezer.tick(250)
+    assert cache.get(1) is None
+    assert cache.get(2)
+
+    freezer.tick(300)
+    assert cache.get(2) is None
+
+    # The oldest url is evicted when full
+    for recording_id in (3, 4, 5):
+        cache.set(recording_id, f"https://example.com/{recording_id}.mp4")
+    assert len(cache) == 2
+    assert cache.get(3) is None
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+async def test_recording_url_coalesced(ring, aioresponses_mock, api_requests):
+    share_url = re.compile(
+        r"https:\/\/api\.ring\.com\/clients_api\/dings\/\d+\/share\/play"
+    )
+    aioresponses_mock.get(
+        share_url,
+        payload={"url": "https://example.com/recording.mp4?Expires=9999999999"},
+        repeat=True,
+    )
+    await ring.async_update_data()
+    doorbell = ring.devices()["authorized_doorbots"][0]
+
+    urls = await asyncio.gather(
+        *(doorbell.async_recording_url(987654321) for _ in range(5))
+    )
+    assert set(urls) == {"https://example.com/recording.mp4?Expires=9999999999"}
+    assert await doorbell.async_recording_url(987654321) == urls[0]
+
+    assert len(api_requests("GET", share_url)) == 1
+
+    prefetched = await doorbell.async_prefetch_recording_urls(limit=3)
+    assert set(prefetched) == {987654321, 9876543212, 1234567890123456}
+    assert len(api_requests("GET", share_url)) == 3
+
+
+async def test_recording_url_cancelled_caller():
+    cache = RingRecordingUrlCache()
+    release = asyncio.Event()
+    fetches = []
+
+    async def _fetch() -> str:
+        fetches.append(1)
+        await release.wait()
+        return "https://example.com/1.mp4"
+
+    first = asyncio.create_task(cache.async_get(1, _fetch))
+    second = asyncio.create_task(cache.async_get(1, _fetch))
+    await asyncio.sleep(0)
+    # Cancelling the caller that started the fetch leaves the others waiting
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == "https://example.com/1.mp4"
+    assert first.cancelled()
+    assert fetches == [1]
+    assert cache.get(1) == "https://example.com/1.mp4"
@@ -1,13 +1,24 @@
 """The tests for the Ring platform."""
 
 import asyncio
+import gc
+import json
+import subprocess
+import sys
+import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 import pytest
+import ring_doorbell
 from freezegun.api import FrozenDateTimeFactory
-from ring_doorbell import Auth, Ring, RingError
+from ring_doorbell import Auth, Ring, RingError, RingSessionFileStore
 from ring_doorbell.const import MSG_EXISTING_TYPE, USER_AGENT
+from ring_doorbell.listen import RingEventListener
 from ring_doorbell.util import parse_datetime
+from ring_doorbell.webrtcstream import RingWebRtcStream
+from yarl import URL
 
 from .conftest import json_request_kwargs, load_fixture_as_dict
 
@@ -221,6 +232,18 @@ async def test_motion_detection_enable(ring, aioresponses_mock):
             False,
             id="Micros",
         ),
+        pytest.param(
+            "2012-01-15T06:01:01.123Z",
+            datetime(2012, 1, 15, 6, 1, 1, 123 * 1_000, tzinfo=timezone.utc),
+            False,
+            id="Three digit millis",
+        ),
+        pytest.param(
+            "2012-01-15 06:01:01.123Z",
+            datetime(2012, 1, 14, 5, 5, 5, 123 * 1_000, tzinfo=timezone.utc),
+            True,
+            id="No T separator",
+        ),
         pytest.param(
             "2012-01-15T06:01:01Z",
             datetime(2012, 1, 15, 6, 1, 1, 0, tzinfo=timezone.utc),
@@ -292,6 +315,70 @@ def test_sync_queries_with_no_event_loop():
         auth.close()
 
 
+def test_sync_queries_reuse_session():
+    auth = Auth(USER_AGENT, token=load_fixture_as_dict("ring_oauth.json"))
+    ring = Ring(auth)
+
+    with pytest.deprecated_call():
+        ring.update_devices()
+    session = auth._dep_handler._sessions[0]
+    loop_thread = auth._dep_handler._thread
+    assert auth._local_session is None
+    assert not session.closed
+    assert loop_thread.is_alive()
+
+    # Calls from multiple threads share the loop and session
+    with ThreadPoolExecutor(max_workers=4) as executor, warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        list(executor.map(lambda _: ring.update_dings(), range(8)))
+    assert auth._dep_handler._sessions == [session]
+    assert auth._dep_handler._thread is loop_thread
+
+    with pytest.deprecated_call():
+        auth.close()
+    assert session.closed
+    assert not loop_thread.is_alive()
+
+
+async def test_sync_and_async_queries_mixed():
+    auth = Auth(USER_AGENT, token=load_fixture_as_dict("ring_oauth.json"))
+    ring = Ring(auth)
+
+    # Sync calls must be made outside of the running loop
+    def _sync_update() -> None:
+        with pytest.deprecated_call():
+            ring.update_devices()
+
+    await asyncio.get_running_loop().run_in_executor(None, _sync_update)
+    await ring.async_update_devices()
+    assert auth._local_session
+    assert auth._local_session not in auth._dep_handler._sessions
+
+    await asyncio.get_running_loop().run_in_executor(None, _sync_update)
+    await ring.async_update_dings()
+
+    await auth.async_close()
+    auth._dep_handler.stop()
+
+
+def test_sync_queries_loop_stopped_on_collect():
+    auth = Auth(USER_AGENT, token=load_fixture_as_dict("ring_oauth.json"))
+    ring = Ring(auth)
+
+    with pytest.deprecated_call():
+        ring.update_devices()
+    loop_thread = auth._dep_handler._thread
+    assert loop_thread.is_alive()
+
+    # The loop thread does not keep the auth alive and stops when it is collected
+    auth_ref = weakref.ref(auth)
+    del auth, ring
+    gc.collect()
+    assert auth_ref() is None
+    loop_thread.join(timeout=5)
+    assert not loop_thread.is_alive()
+
+
 async def test_set_existing_doorbell_type(ring, aioresponses_mock):
     data = ring.devices()
     dev = data["doorbots"][0]
@@ -370,3 +457,428 @@ async def test_set_existing_doorbell_type(ring, aioresponses_mock):
     # Attempting to set the doorbell duration to an invalid value
     with pytest.raises(RingError, match=f"Must be within the {0}-{1}."):
         await dev.async_set_existing_doorbell_type_duration(11)
+
+
+async def test_update_device_data(ring, aioresponses_mock, devices_fixture):
+    """Test a single device is updated without fetching every device."""
+    devices = ring.devices()
+    stickup_cam = devices["stickup_cams"][0]
+    chime = devices["chimes"][0]
+    devices_data = ring.devices_data
+    doorbell_data = devices_data["doorbots"][987652]
+    assert stickup_cam.motion_detection is False
+
+    devices_fixture.updated = True
+    devices_fixture.doorbots_families = ["stickup_cams"]
+    aioresponses_mock.requests.clear()
+    await stickup_cam.async_update_device_data()
+    await chime.async_update_device_data()
+
+    assert stickup_cam.motion_detection is True
+    assert chime.name == "Downstairs"
+    assert ring.devices_data is devices_data
+    assert ring.devices_data["doorbots"][987652] is doorbell_data
+    assert [url.path for _, url in aioresponses_mock.requests] == [
+        "/clients_api/doorbots/987652",
+        "/clients_api/chimes/999999",
+    ]
+
+
+async def test_update_device_data_keyed(ring, devices_fixture):
+    """Test a device record returned keyed by the device type is unwrapped."""
+    doorbell = ring.devices()["doorbots"][0]
+    chime = ring.devices()["chimes"][0]
+    devices_fixture.keyed = True
+    devices_fixture.updated = True
+
+    await doorbell.async_update_device_data()
+    await chime.async_update_device_data()
+    assert ring.devices_data["doorbots"][987652]["description"] == "Front Door"
+    assert doorbell.volume == 1
+    assert ring.devices_data["chimes"][999999]["id"] == 999999
+    assert chime.name == "Downstairs"
+
+
+async def test_optimistic_updates(ring, aioresponses_mock, mocker):
+    """Test setters update cached attributes until the next refresh."""
+    devices = ring.devices()
+    doorbell = devices["doorbots"][0]
+    intercom = devices["other"][0]
+    assert doorbell.volume == 1
+
+    await doorbell.async_set_volume(7)
+    await intercom.async_set_mic_volume(5)
+    assert doorbell.volume == 7
+    assert doorbell.pending_updates == {("settings", "doorbell_volume"): 7}
+    assert intercom.mic_volume == 5
+
+    await ring.async_update_devices()
+    assert doorbell.volume == 1
+    assert intercom.mic_volume == 11
+    assert not doorbell.pending_updates
+    assert not intercom.pending_updates
+
+    assert doorbell.motion_detection is True
+    mocker.patch.object(ring, "async_query", side_effect=RingError("Failed"))
+    with pytest.raises(RingError, match="Failed"):
+        await doorbell.async_set_motion_detection(state=False)
+    assert doorbell.motion_detection is True
+    assert not doorbell.pending_updates
+
+
+async def test_optimistic_group_lights(ring, aioresponses_mock):
+    """Test group lights are updated without fetching the group again."""
+    group = ring.groups()["mock-group-id"]
+    await group.async_update()
+    assert group.lights is False
+
+    aioresponses_mock.requests.clear()
+    await group.async_set_lights(state=True)
+    assert group.lights is True
+    assert group.pending_updates == {("lights_on",): True}
+    assert [method for method, _ in aioresponses_mock.requests] == ["POST"]
+
+    await group.async_update()
+    assert group.lights is False
+    assert not group.pending_updates
+
+
+async def test_batch_settings(ring, aioresponses_mock):
+    """Test settings changed in a batch are sent in one request."""
+    dev = ring.devices()["doorbots"][0]
+    aioresponses_mock.requests.clear()
+
+    async with dev.batch_settings():
+        await dev.async_set_volume(7)
+        await dev.async_set_existing_doorbell_type_enabled(value=False)
+        await dev.async_set_existing_doorbell_type(1)
+        assert not aioresponses_mock.requests
+        assert dev.volume == 1
+
+    kwargs = json_request_kwargs()
+    kwargs["json"] = None
+    kwargs["params"] = {
+        "doorbot[description]": dev.name,
+        "doorbot[settings][doorbell_volume]": "7",
+        "doorbot[settings][chime_settings][enable]": 0,
+        "doorbot[settings][chime_settings][type]": 1,
+    }
+    aioresponses_mock.assert_called_once_with(
+        url="https://api.ring.com/clients_api/doorbots/987652",
+        method="PUT",
+        **kwargs,
+    )
+    assert dev.volume == 7
+    assert dev.existing_doorbell_type == "Digital"
+
+    aioresponses_mock.requests.clear()
+    with pytest.raises(RingError):  # noqa: PT012
+        async with dev.batch_settings():
+            await dev.async_set_volume(3)
+            await dev.async_set_volume(100)
+    assert not aioresponses_mock.requests
+    assert dev.volume == 7
+
+
+async def test_batch_settings_validation(ring, aioresponses_mock):
+    """Test setters in a batch validate against the changes before them."""
+    dev = ring.devices()["doorbots"][0]
+    aioresponses_mock.requests.clear()
+
+    # The duration is only sent for a digital chime
+    async with dev.batch_settings():
+        await dev.async_set_existing_doorbell_type(1)
+        await dev.async_set_existing_doorbell_type_duration(5)
+    kwargs = json_request_kwargs()
+    kwargs["json"] = None
+    kwargs["params"] = {
+        "doorbot[description]": dev.name,
+        "doorbot[settings][chime_settings][type]": 1,
+        "doorbot[settings][chime_settings][duration]": 5,
+    }
+    aioresponses_mock.assert_called_once_with(
+        url="https://api.ring.com/clients_api/doorbots/987652",
+        method="PUT",
+        **kwargs,
+    )
+    assert dev.existing_doorbell_type_duration == 5
+
+    # A chime that is not present can be enabled with the type that adds it
+    dev._attrs["settings"]["chime_settings"]["type"] = 2
+    aioresponses_mock.requests.clear()
+    async with dev.batch_settings():
+        await dev.async_set_existing_doorbell_type(0)
+        await dev.async_set_existing_doorbell_type_enabled(value=True)
+    assert dev.existing_doorbell_type == "Mechanical"
+    assert dev.existing_doorbell_type_enabled is True
+
+    with pytest.raises(RingError, match="In-Home chime is not present"):  # noqa: PT012
+        async with dev.batch_settings():
+            await dev.async_set_existing_doorbell_type(2)
+            await dev.async_set_existing_doorbell_type_enabled(value=False)
+    assert dev.existing_doorbell_type == "Mechanical"
+
+
+async def test_batch_settings_other_tasks(ring, aioresponses_mock, api_requests):
+    """Test setters called by other tasks are not merged into a batch."""
+    intercom = ring.devices()["other"][0]
+    aioresponses_mock.requests.clear()
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _batch() -> None:
+        async with intercom.batch_settings():
+            await intercom.async_set_voice_volume(6)
+            entered.set()
+            await release.wait()
+            msg = "Abandon the batch"
+            raise RingError(msg)
+
+    task = asyncio.create_task(_batch())
+    await entered.wait()
+    await intercom.async_set_mic_volume(3)
+    assert len(api_requests("PATCH", "/settings")) == 1
+    assert intercom.mic_volume == 3
+    release.set()
+    with pytest.raises(RingError, match="Abandon the batch"):
+        await task
+    assert len(api_requests("PATCH", "/settings")) == 1
+    assert intercom.mic_volume == 3
+
+
+async def test_iter_timeline(ring, mock_histories):
+    """Test the merged history of multiple devices."""
+    await ring.async_update_data()
+    devices = ring.video_devices()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    # Ten events per device, newest first, spaced differently per device
+    # Keyed by position as the fixture doorbot and stickup cam share an id
+    histories = [
+        [
+            {
+                "id": (index + 1) * 100 + 9 - count,
+                "kind": "motion",
+                "created_at": datetime.fromtimestamp(
+                    start - count * 60 * (index + 2), tz=timezone.utc
+                ),
+            }
+            for count in range(10)
+        ]
+        for index in range(len(devices))
+    ]
+    requests = mock_histories(devices, histories)
+    timeline = ring.async_iter_timeline(page_size=3)
+    # One round of requests is enough for the first screen
+    first = [await timeline.__anext__() for _ in range(3)]
+    assert len(requests) == len(devices)
+    assert {entry["id"] for _, entry in first} == {109, 209, 309}
+    rest = [item async for item in timeline]
+
+    entries = [entry for _, entry in first + rest]
+    assert len(entries) == 10 * len(devices)
+    created = [entry["created_at"] for entry in entries]
+    assert created == sorted(created, reverse=True)
+    # Four pages of three per device, the last one short
+    assert len(requests) == 4 * len(devices)
+
+    since = datetime.fromtimestamp(start - 600, tz=timezone.utc)
+    until = datetime.fromtimestamp(start - 120, tz=timezone.utc)
+    requests.clear()
+    bounded = [
+        entry
+        async for _, entry in ring.async_iter_timeline(
+            devices[:1], since=since, until=until, page_size=3
+        )
+    ]
+    # The device spaced two minutes apart has events at 2, 4, 6, 8 and 10
+    assert len(bounded) == 5
+    assert all(since <= entry["created_at"] <= until for entry in bounded)
+    # Paging stops at the page with the first event older than since
+    assert len(requests) == 3
+
+
+# Generous so it only fails when a slow dependency is imported eagerly again
+IMPORT_TIME_BUDGET_US = 2_000_000
+LAZY_IMPORTED_MODULES = (
+    "firebase_messaging",
+    "websockets",
+    "pytz",
+    "aiofiles",
+    "importlib.metadata",
+    "ring_doorbell.listen",
+    "ring_doorbell.webrtcstream",
+)
+
+
+async def test_state_snapshot(ring, auth, aioresponses_mock, tmp_path):
+    """Test the state can be saved and restored without api requests."""
+    chime = ring.devices()["chimes"][0]
+    await chime.async_update_health_data()
+    path = tmp_path / "ring.state"
+    ring.save_state(path)
+    assert path.stat().st_mode & 0o777 == 0o600
+
+    aioresponses_mock.requests.clear()
+    restored = Ring(auth)
+    assert restored.load_state(path)
+    assert not aioresponses_mock.requests
+    assert restored.session == ring.session
+    assert restored.session_refresh_time == pytest.approx(
+        ring.session_refresh_time, abs=1
+    )
+    assert restored.devices_data == ring.devices_data
+    assert restored.groups_data == ring.groups_data
+    assert [dev.name for dev in restored.get_device_list()] == [
+        dev.name for dev in ring.get_device_list()
+    ]
+    assert restored.devices()["chimes"][0].wifi_name == "ring_mock_wifi"
+    assert len(restored.active_alerts()) == len(ring.active_alerts())
+
+    assert not Ring(auth).load_state(tmp_path / "missing")
+    with pytest.raises(RingError, match="Invalid Ring state data"):
+        Ring(auth).restore_state(b"invalid")
+
+
+async def test_warm_start(ring, auth, aioresponses_mock, tmp_path):
+    """Test a warm start serves saved data while it is revalidated."""
+    path = tmp_path / "ring.state"
+    cold = Ring(auth)
+    assert await cold.async_warm_start(path) is None
+    assert path.exists()
+    assert cold.devices()["chimes"][0].name == "Downstairs"
+
+    aioresponses_mock.requests.clear()
+    warm = Ring(auth)
+    task = await warm.async_warm_start(path)
+    assert task is not None
+    assert warm.devices()["chimes"][0].name == "Downstairs"
+    assert not aioresponses_mock.requests
+
+    await task
+    assert ("GET", URL("https://api.ring.com/clients_api/ring_devices")) in (
+        aioresponses_mock.requests
+    )
+
+    aioresponses_mock.requests.clear()
+    assert await Ring(auth).async_warm_start(path, max_age=60) is None
+    assert not aioresponses_mock.requests
+
+
+async def test_session_store(auth, api_requests, tmp_path):
+    """Test sessions are reused from the store until they expire."""
+    path = tmp_path / "session.cache"
+    first = Ring(auth, session_store=RingSessionFileStore(path))
+    await first.async_update_dings()
+    assert len(api_requests("POST", "/clients_api/session")) == 1
+    assert path.stat().st_mode & 0o777 == 0o600
+
+    # Another process with its own store reuses the saved session
+    second = Ring(auth, session_store=RingSessionFileStore(path))
+    await second.async_update_dings()
+    assert len(api_requests("POST", "/clients_api/session")) == 1
+    assert second.session == first.session
+    assert second.session_refresh_time == pytest.approx(
+        first.session_refresh_time, abs=1
+    )
+
+    expired = Ring(auth, session_store=RingSessionFileStore(path, max_age=0))
+    await expired.async_update_dings()
+    assert len(api_requests("POST", "/clients_api/session")) == 2
+
+    # Creating a session explicitly always replaces the stored one
+    await second.async_create_session()
+    assert len(api_requests("POST", "/clients_api/session")) == 3
+
+
+async def test_session_store_rejected(
+    auth, api_requests, devices_fixture, tmp_path, freezer
+):
+    """Test a session the api rejects is replaced, also in the store."""
+    path = tmp_path / "session.cache"
+    ring = Ring(auth, session_store=RingSessionFileStore(path))
+    await ring.async_update_devices()
+    key = RingSessionFileStore.session_key(auth)
+    created_at = json.loads(path.read_text())[key]["created_at"]
+
+    freezer.tick(60)
+    devices_fixture.unauthorized = 1
+    await ring.async_update_devices()
+    assert len(api_requests("POST", "/clients_api/session")) == 2
+    assert len(api_requests("GET", "/ring_devices")) == 3
+    assert ring.devices_data
+    stored = json.loads(path.read_text())[key]
+    assert stored["created_at"] == created_at + 60
+
+    # Only one retry with a new session
+    devices_fixture.unauthorized = 2
+    with pytest.raises(RingError, match="status code 401"):
+        await ring.async_update_devices()
+    assert len(api_requests("POST", "/clients_api/session")) == 3
+
+    # A session replaced by another process is not removed from the store
+    store = RingSessionFileStore(path)
+    await store.async_invalidate(key, {"profile": {}})
+    assert await store.async_load(key)
+
+
+async def test_session_store_accounts(auth, api_requests, tmp_path):
+    """Test accounts sharing a hardware id do not share stored sessions."""
+    path = tmp_path / "session.cache"
+    await Ring(auth, session_store=RingSessionFileStore(path)).async_update_dings()
+
+    other_auth = Auth(
+        USER_AGENT,
+        token={**load_fixture_as_dict("ring_oauth.json"), "refresh_token": "other"},
+    )
+    assert other_auth.get_hardware_id() == auth.get_hardware_id()
+    other = Ring(other_auth, session_store=RingSessionFileStore(path))
+    await other.async_update_dings()
+    assert len(api_requests("POST", "/clients_api/session")) == 2
+    assert len(json.loads(path.read_text())) == 2
+
+    # Expired sessions of refreshed tokens are removed when saving
+    expired = Ring(auth, session_store=RingSessionFileStore(path, max_age=0))
+    await expired.async_update_dings()
+    assert list(json.loads(path.read_text())) == [
+        RingSessionFileStore.session_key(auth)
+    ]
+    await other_auth.async_close()
+
+
+async def test_session_file_store_lock(tmp_path):
+    """Test the session file store lock excludes other processes."""
+    fcntl = pytest.importorskip("fcntl")
+    store = RingSessionFileStore(tmp_path / "session.cache")
+    async with store.lock():
+        lock_file = (tmp_path / "session.cache.lock").open("rb")
+        with lock_file, pytest.raises(BlockingIOError):
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    with (tmp_path / "session.cache.lock").open("rb") as file:
+        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def test_import_time():
+    """Test importing the package does not import the heavy dependencies."""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ring_doorbell"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {}
+    for line in res.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line[len("import time:") :].split("|")
+            if cumulative.strip().isdigit():
+                imported[module.strip()] = int(cumulative)
+    assert imported["ring_doorbell"] < IMPORT_TIME_BUDGET_US
+    assert not [module for module in LAZY_IMPORTED_MODULES if module in imported]
+
+
+def test_lazy_imports():
+    assert ring_doorbell.RingEventListener is RingEventListener
+    assert ring_doorbell.RingWebRtcStream is RingWebRtcStream
+    assert ring_doorbell.__version__
+    assert "RingEventListener" in dir(ring_doorbell)
+    with pytest.raises(AttributeError, match="has no attribute 'Missing'"):
+        ring_doorbell.Missing  # noqa: B018
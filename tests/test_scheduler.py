@@ -0,0 +1,155 @@
+"""The tests for the adaptive poll scheduler."""
+
+import asyncio
+import time
+
+import pytest
+from ring_doorbell import RingError, RingEvent
+from ring_doorbell.freshness import DINGS_SOURCE, device_source, health_source
+from ring_doorbell.scheduler import (
+    BATTERY_INTERVAL_FACTOR,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    ERROR_BACKOFF_FACTOR,
+    RingPollScheduler,
+)
+
+
+async def test_intervals(ring):
+    """Test intervals adapt to battery devices and activity."""
+    ring.devices_data["doorbots"][987652]["kind"] = "doorbell"
+    devices = ring.devices()
+    doorbell = devices["doorbots"][0]
+    chime = devices["chimes"][0]
+    scheduler = RingPollScheduler(ring, budget=10000)
+
+    intervals = scheduler.intervals()
+    assert intervals[device_source(doorbell)] == DEFAULT_POLL_INTERVAL
+    assert intervals[health_source(chime)] == DEFAULT_POLL_INTERVAL
+    assert (
+        intervals[health_source(doorbell)]
+        == DEFAULT_POLL_INTERVAL * BATTERY_INTERVAL_FACTOR
+    )
+
+    scheduler.on_event(
+        RingEvent(
+            1, doorbell.id, doorbell.name, "doorbell", time.time(), 180, "ding", ""
+        )
+    )
+    intervals = scheduler.intervals()
+    assert intervals[health_source(doorbell)] == DEFAULT_MIN_POLL_INTERVAL
+    assert intervals[device_source(doorbell)] == DEFAULT_MIN_POLL_INTERVAL
+    assert intervals[DINGS_SOURCE] == DEFAULT_MIN_POLL_INTERVAL
+    assert intervals[health_source(chime)] == DEFAULT_POLL_INTERVAL
+
+
+async def test_intervals_budget(ring):
+    """Test intervals are stretched to fit the request budget."""
+    scheduler = RingPollScheduler(ring, budget=12)
+    intervals = scheduler.intervals()
+    # Dings and the data and health of five devices
+    assert len(intervals) == 11
+    assert sum(3600 / interval for interval in intervals.values()) == pytest.approx(12)
+
+
+async def test_poll_due(ring, aioresponses_mock, api_requests):
+    """Test only stale sources are polled and changes shorten intervals."""
+    scheduler = RingPollScheduler(ring, budget=10000)
+    aioresponses_mock.requests.clear()
+
+    delay = await scheduler.async_poll_due()
+    # Devices and dings were just fetched, health never was
+    assert not api_requests("GET", "/ring_devices")
+    assert not api_requests("GET", "/chimes/999999")
+    assert len(api_requests("GET", "/health")) == 5
+    assert 0 < delay <= DEFAULT_POLL_INTERVAL
+    chime = ring.devices()["chimes"][0]
+    assert chime.wifi_name == "ring_mock_wifi"
+    assert scheduler.intervals()[health_source(chime)] == DEFAULT_POLL_INTERVAL / 2
+
+    aioresponses_mock.requests.clear()
+    await scheduler.async_poll_due()
+    assert not aioresponses_mock.requests
+
+
+async def test_poll_devices(freezer, ring, aioresponses_mock, api_requests):
+    """Test due device data is fetched for the whole account in one request."""
+    scheduler = ring.scheduler
+    scheduler.budget = 10000
+    chime = ring.devices()["chimes"][0]
+    await scheduler.async_poll_due()
+
+    freezer.tick(DEFAULT_POLL_INTERVAL)
+    aioresponses_mock.requests.clear()
+    await scheduler.async_poll_due()
+    assert len(api_requests("GET", "/ring_devices")) == 1
+    assert not api_requests("GET", "/chimes/999999")
+    state = scheduler._states[device_source(chime)]
+    assert state.polls == 1
+    assert state.errors == 0
+
+    # A single due device is fetched on its own
+    scheduler._states[device_source(chime)].last -= DEFAULT_POLL_INTERVAL * 2
+    aioresponses_mock.requests.clear()
+    await scheduler.async_poll_due()
+    assert not api_requests("GET", "/ring_devices")
+    assert len(api_requests("GET", "/chimes/999999")) == 1
+    assert state.polls == 2
+
+
+async def test_poll_budget(ring, aioresponses_mock, api_requests):
+    """Test polls stop when the hourly request budget is used."""
+    # The requests made loading the data count towards the budget
+    made = len(ring.auth.request_times)
+    assert made > 0
+    scheduler = RingPollScheduler(ring, budget=made + 2)
+    aioresponses_mock.requests.clear()
+
+    delay = await scheduler.async_poll_due()
+    assert len(api_requests("GET", "/health")) == 2
+    assert delay > 3500
+
+    # Requests made outside of the scheduler count too
+    scheduler.budget = made + 3
+    await ring.async_update_dings()
+    delay = await scheduler.async_poll_due()
+    assert len(api_requests("GET", "/health")) == 2
+    assert delay > 3500
+
+
+async def test_poll_errors(ring, mocker, freezer):
+    """Test failed polls back off without changing the interval."""
+    scheduler = RingPollScheduler(ring, budget=10000)
+    chime = ring.devices()["chimes"][0]
+    mocker.patch.object(
+        type(chime), "async_update_health_data", side_effect=RingError("Failed")
+    )
+    source = health_source(chime)
+    await scheduler.async_poll_due()
+    state = scheduler._states[source]
+    assert state.errors == 1
+    assert scheduler.intervals()[source] == DEFAULT_POLL_INTERVAL
+
+    freezer.tick(DEFAULT_MIN_POLL_INTERVAL)
+    await scheduler.async_poll_due()
+    assert state.errors == 2
+    freezer.tick(DEFAULT_MIN_POLL_INTERVAL)
+    await scheduler.async_poll_due()
+    assert state.errors == 2
+    freezer.tick(DEFAULT_MIN_POLL_INTERVAL * (ERROR_BACKOFF_FACTOR - 1))
+    await scheduler.async_poll_due()
+    assert state.errors == 3
+    assert scheduler.intervals()[source] == DEFAULT_POLL_INTERVAL
+
+
+async def test_start_stop(ring, aioresponses_mock, api_requests):
+    """Test the scheduler polls in the background until stopped."""
+    scheduler = RingPollScheduler(ring, budget=10000)
+    aioresponses_mock.requests.clear()
+    scheduler.start()
+    for _ in range(100):
+        if len(api_requests("GET", "/health")) == 5:
+            break
+        await asyncio.sleep(0)
+    await scheduler.stop()
+    assert len(api_requests("GET", "/health")) == 5
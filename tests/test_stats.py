@@ -0,0 +1,134 @@
+"""The tests for the event statistics."""
+
+import datetime as dt
+
+import pytest
+from ring_doorbell import RingError
+from ring_doorbell.stats import RingEventStatistics
+
+UTC = dt.timezone.utc
+
+
+async def test_event_statistics(ring, tmp_path):
+    devices = ring.video_devices()[:1]
+    device_id = devices[0].device_api_id
+    stats = RingEventStatistics(UTC)
+    assert await stats.async_update(ring, devices) == 3
+    assert stats.count() == 3
+    assert stats.count(device_id) == 3
+    assert stats.count(device_id, "motion") == 2
+    assert stats.kinds(device_id) == {"motion": 2, "ding": 1}
+    hourly = stats.hourly(device_id, "motion")
+    assert hourly[15] == hourly[16] == 1
+    assert sum(hourly) == 2
+
+    # Nothing new in the history
+    assert await stats.async_update(ring, devices) == 0
+    assert stats.add_history(device_id, await devices[0].async_history()) == 0
+    assert stats.count() == 3
+
+    path = tmp_path / "stats.json"
+    stats.save(path)
+    loaded = RingEventStatistics.load(path, UTC)
+    assert loaded.count(None, "ding") == 1
+    assert loaded.hourly() == stats.hourly()
+    assert loaded.device_ids == [device_id]
+    assert RingEventStatistics.load(tmp_path / "missing.json").count() == 0
+
+    with pytest.raises(RingError, match="Unsupported event statistics version"):
+        RingEventStatistics.from_dict({"version": 0})
+
+
+def test_event_statistics_live_events(make_ring_event):
+    stats = RingEventStatistics(UTC)
+    stats.add_history(
+        987653,
+        [
+            {"id": 200, "kind": "ding", "created_at": "2024-01-01T10:00:00.000Z"},
+            {"id": 100, "kind": "motion", "created_at": "2024-01-01T09:00:00.000Z"},
+        ],
+    )
+    now = dt.datetime(2024, 1, 1, 12, tzinfo=UTC).timestamp()
+    stats.add_event(make_ring_event(300, now=now))
+    stats.add_event(make_ring_event(300, now=now, is_update=True))
+    stats.add_event(make_ring_event(300, now=now))
+    # Already counted from the history
+    stats.add_event(make_ring_event(200, "ding"))
+    assert stats.count(987653) == 3
+    assert stats.hourly(987653, "motion")[12] == 1
+
+    # The live event is not counted again when the history catches up
+    added = stats.add_history(
+        987653,
+        [
+            {"id": 400, "kind": "ding", "created_at": "2024-01-01T13:00:00.000Z"},
+            {"id": 300, "kind": "motion", "created_at": "2024-01-01T12:00:00.000Z"},
+            {"id": 200, "kind": "ding", "created_at": "2024-01-01T10:00:00.000Z"},
+        ],
+    )
+    assert added == 1
+    assert stats.count(987653) == 4
+    assert stats.as_dict()["devices"]["987653"]["live_ids"] == []
+
+    # Older pages are backfilled
+    assert (
+        stats.add_history(
+            987653,
+            [{"id": 50, "kind": "on_demand", "created_at": "2023-12-31T23:00:00Z"}],
+        )
+        == 1
+    )
+    assert stats.kinds(987653) == {"ding": 2, "motion": 2, "on_demand": 1}
+
+
+async def test_event_statistics_backfill(ring, mock_histories, tmp_path):
+    devices = ring.video_devices()[:1]
+    device_id = devices[0].device_api_id
+    history = [
+        {
+            "id": event_id,
+            "kind": "motion",
+            "created_at": dt.datetime(2024, 1, 1, event_id, tzinfo=UTC),
+        }
+        for event_id in range(9, 0, -1)
+    ]
+    mock_histories(devices, [history])
+    stats = RingEventStatistics(UTC)
+
+    # A first pass that stops early is continued by the next update
+    assert await stats.async_update(ring, devices, page_size=3, limit=4) == 4
+    path = tmp_path / "stats.json"
+    stats.save(path)
+    stats = RingEventStatistics.load(path, UTC)
+    history.insert(
+        0,
+        {
+            "id": 10,
+            "kind": "ding",
+            "created_at": dt.datetime(2024, 1, 1, 10, tzinfo=UTC),
+        },
+    )
+    assert await stats.async_update(ring, devices, page_size=3) == 6
+    assert stats.count(device_id) == 10
+    assert stats.hourly(device_id, "motion")[1:10] == [1] * 9
+    assert stats.as_dict()["devices"][str(device_id)]["complete"]
+    assert await stats.async_update(ring, devices, page_size=3) == 0
+
+
+def test_event_statistics_naive_datetimes():
+    stats = RingEventStatistics(UTC)
+    stats.add_history(
+        987653,
+        [
+            {"id": 2, "kind": "ding", "created_at": dt.datetime(2024, 1, 1, 10)},  # noqa: DTZ001
+            {
+                "id": 1,
+                "kind": "ding",
+                "created_at": dt.datetime(
+                    2024, 1, 1, 11, tzinfo=dt.timezone(dt.timedelta(hours=2))
+                ),
+            },
+        ],
+    )
+    # Naive datetimes are in UTC and aware ones are converted to it
+    assert stats.hourly(987653, "ding")[9:11] == [1, 1]